@@ -1,26 +1,29 @@
 import sys
 import os
-import pandas as pd
+import time
 import webbrowser
-import requests
 import warnings
 from PyQt5.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QMessageBox, QFileDialog, QInputDialog, QLineEdit, QTextEdit, QComboBox
+    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QMessageBox, QFileDialog, QInputDialog, QLineEdit, QTextEdit, QComboBox, QCheckBox
 )
-from PyQt5.QtGui import QPixmap, QGuiApplication
-from PyQt5.QtCore import Qt
-from PIL import Image
-import io
-import openai
-import shutil
-import re
-
-# Try to import BeautifulSoup for favicon parsing
-try:
-    from bs4 import BeautifulSoup
-    BEAUTIFULSOUP_AVAILABLE = True
-except ImportError:
-    BEAUTIFULSOUP_AVAILABLE = False
+from PyQt5.QtGui import QGuiApplication
+from PyQt5.QtCore import Qt, QBuffer, QByteArray, QFileSystemWatcher, QIODevice, QTimer
+
+# Heavy dependencies (pandas, openai, requests, bs4, PIL) are imported by the
+# reflinks modules on first use, not here, so the window comes up quickly
+from reflinks.config import CSV_FILE, LOGO_DIR, FAVICON_DIR, safe_platform_name
+from reflinks import enrich, favicons, images, linkcheck, llm, metrics
+from reflinks.catalog import LockTimeout
+from reflinks.grid import CatalogGrid
+from reflinks.clean import MAX_CAPSULES, clean_tags, clean_value, tag_count
+from reflinks.review import ReviewQueue, ReviewState, ROW, WEBSITE
+from reflinks.store import open_catalog
+from reflinks.http_cache import make_cached_session
+from reflinks.jobs import JobQueue
+from reflinks.pixmaps import PixmapCache
+from reflinks.stats_panel import StatsPanel
+
+if not favicons.BEAUTIFULSOUP_AVAILABLE:
     print("BeautifulSoup not installed. Favicon parsing from HTML will be limited.")
 
 # Suppress warnings
@@ -30,16 +33,26 @@ warnings.filterwarnings("ignore", category=DeprecationWarning)
 # Suppress libpng warnings
 os.environ['QT_LOGGING_RULES'] = '*.debug=false;qt.qpa.*=false'
 
-WORKSPACE_DIR = r"C:\Users\alexa\Downloads\crypto-glass-beacon-66-main"
-CSV_FILE = os.path.join(WORKSPACE_DIR, "public", "ref_links.csv")
-LOGO_DIR = os.path.join(WORKSPACE_DIR, "public", "logos")
-FAVICON_DIR = os.path.join(WORKSPACE_DIR, "public", "favicons")
-os.makedirs(os.path.dirname(CSV_FILE), exist_ok=True)
-os.makedirs(LOGO_DIR, exist_ok=True)
-os.makedirs(FAVICON_DIR, exist_ok=True)
+LOGO_SIZE = (100, 100)
+FAVICON_SIZE = (32, 32)
+
+def qimage_to_png(image):
+    data = QByteArray()
+    buf = QBuffer(data)
+    buf.open(QIODevice.WriteOnly)
+    image.save(buf, "PNG")
+    return bytes(data)
+
+def validate_api_key(key):
+    llm.get_client(key).validate()
+
+def run_generation(api_key, model, field, platform_name, website, prompt, fresh=False):
+    client = llm.get_client(api_key)
+    return enrich.generate_field(client, model, field, platform_name, website, prompt=prompt, fresh=fresh)
 
-def safe_platform_name(name):
-    return "".join(c if c.isalnum() else "_" for c in name)
+def run_combined_generation(api_key, model, platform_name, website, fresh=False):
+    client = llm.get_client(api_key)
+    return enrich.generate_combined(client, model, platform_name, website, fresh=fresh)
 
 class RefLinksApp(QWidget):
     def __init__(self):
@@ -58,22 +71,46 @@ class RefLinksApp(QWidget):
         self.move(x, y)
         
         try:
-            self.df = pd.read_csv(CSV_FILE)
-            # Ensure favicon column exists and is string type
-            if 'favicon' not in self.df.columns:
-                self.df['favicon'] = ''
-            else:
-                self.df['favicon'] = self.df['favicon'].astype(str)
+            # The SQLite working store once imported, otherwise the CSV kept in memory
+            self.catalog = open_catalog(CSV_FILE)
         except FileNotFoundError:
             QMessageBox.critical(self, "Error", f"Could not find input CSV file at: {CSV_FILE}")
             sys.exit(1)
-        self.current_index = 0
-        self.logo_paths = ["" for _ in range(len(self.df))]
+        # Review marks and the last position survive restarts; resume where the last session stopped
+        self.review = ReviewState()
+        self.review_queue = ReviewQueue(self.catalog, self.review)
+        last_key, last_index = self.review.last_position()
+        resumed = self.catalog.locate(last_key, hint=last_index) if last_key else None
+        self.current_index = resumed if resumed is not None else 0
+        self.logo_paths = ["" for _ in range(len(self.catalog))]
         self.api_key = ""
-        self.verified = [{"website": False, "referral": False, "logo": False, "desc": False, "features": False, "capsules": False, "favicon": False} for _ in range(len(self.df))]
-        self.website_verified = [False for _ in range(len(self.df))]
+        self.jobs = JobQueue(parent=self)
+        self.pixmaps = PixmapCache()
+        self._http = None
+        self._link_health = None
+        self.stats_panel = None
+        self.grid = None
+        # The position is written once navigation settles, not on every step
+        self.position_timer = QTimer(self)
+        self.position_timer.setSingleShot(True)
+        self.position_timer.timeout.connect(self.save_position)
         self.init_ui()
         self.show_entry()
+        self.watch_catalog()
+
+    @property
+    def http(self):
+        """Shared HTTP session; favicon and logo downloads revalidate against the on-disk cache."""
+        if self._http is None:
+            self._http = make_cached_session()
+        return self._http
+
+    @property
+    def link_health(self):
+        """Stored results of the link checks, by row key."""
+        if self._link_health is None:
+            self._link_health = linkcheck.LinkHealth()
+        return self._link_health
 
     def init_ui(self):
         layout = QVBoxLayout()
@@ -113,6 +150,7 @@ class RefLinksApp(QWidget):
         self.website_open_btn.clicked.connect(self.open_website)
         web_layout.addWidget(self.website_open_btn)
         self.website_verify_btn = QPushButton("Verify")
+        self.website_verify_btn.setToolTip("Check the website and referral link, following redirects")
         self.website_verify_btn.clicked.connect(self.website_verify_action)
         web_layout.addWidget(self.website_verify_btn)
         self.website_check = QLabel("")
@@ -172,6 +210,13 @@ class RefLinksApp(QWidget):
         self.prompt_edit = QLineEdit()
         self.prompt_edit.setPlaceholderText("Custom prompt (optional)")
         prompt_layout.addWidget(self.prompt_edit)
+        self.gen_all_btn = QPushButton("Generate All (OpenAI)")
+        self.gen_all_btn.setToolTip("Description, features and capsules in a single request (ignores the custom prompt)")
+        self.gen_all_btn.clicked.connect(self.generate_all)
+        prompt_layout.addWidget(self.gen_all_btn)
+        self.fresh_check = QCheckBox("Fresh variant")
+        self.fresh_check.setToolTip("Ask OpenAI again instead of reusing the cached result for this row")
+        prompt_layout.addWidget(self.fresh_check)
         layout.addLayout(prompt_layout)
         # OpenAI API key and model selection
         api_layout = QHBoxLayout()
@@ -179,8 +224,8 @@ class RefLinksApp(QWidget):
         self.api_btn.clicked.connect(self.set_api_key)
         api_layout.addWidget(self.api_btn)
         self.model_box = QComboBox()
-        self.model_box.addItems(["gpt-4", "gpt-4o", "o4-mini", "gpt-3.5-turbo"])
-        self.model_box.setCurrentText("o4-mini")
+        self.model_box.addItems(enrich.MODELS)
+        self.model_box.setCurrentText(enrich.DEFAULT_MODEL)
         api_layout.addWidget(QLabel("Model:"))
         api_layout.addWidget(self.model_box)
         layout.addLayout(api_layout)
@@ -195,56 +240,96 @@ class RefLinksApp(QWidget):
         self.next_btn = QPushButton("Next")
         self.next_btn.clicked.connect(self.next_entry)
         nav_layout.addWidget(self.next_btn)
+        self.next_unreviewed_btn = QPushButton("Next Unreviewed")
+        self.next_unreviewed_btn.setToolTip("Jump to the next row that was never saved, or saved too long ago")
+        self.next_unreviewed_btn.clicked.connect(self.next_unreviewed)
+        nav_layout.addWidget(self.next_unreviewed_btn)
+        self.grid_btn = QPushButton("Catalog Grid")
+        self.grid_btn.setToolTip("Browse, sort and filter every row; click one to open it here")
+        self.grid_btn.clicked.connect(self.show_grid)
+        nav_layout.addWidget(self.grid_btn)
         layout.addLayout(nav_layout)
+        # Background jobs (OpenAI, downloads)
+        jobs_layout = QHBoxLayout()
+        self.jobs_label = QLabel("")
+        jobs_layout.addWidget(self.jobs_label)
+        self.cancel_jobs_btn = QPushButton("Cancel Jobs")
+        self.cancel_jobs_btn.setEnabled(False)
+        self.cancel_jobs_btn.clicked.connect(self.cancel_jobs)
+        jobs_layout.addWidget(self.cancel_jobs_btn)
+        self.stats_btn = QPushButton("Stats")
+        self.stats_btn.setToolTip("Time spent on CSV, images, HTTP and OpenAI calls this session, with token counts")
+        self.stats_btn.clicked.connect(self.show_stats)
+        jobs_layout.addWidget(self.stats_btn)
+        layout.addLayout(jobs_layout)
+        self.jobs.active_changed.connect(self.on_jobs_changed)
         self.setLayout(layout)
 
+    @metrics.timed("ui.show_entry")
     def show_entry(self):
-        row = self.df.iloc[self.current_index]
+        row = self.catalog.row(self.current_index)
+        # Edits made on this screen are saved back to the row with this key
+        self.current_key = self.catalog.row_key(self.current_index)
+        self.position_timer.start(2000)
+        self.show_entry_label(row)
+        # Handle logo: if CSV has a logo filename, set self.logo_paths
+        self.logo_paths[self.current_index] = self.logo_path_for(self.current_index)
+        self.display_logo()
+        for column, edit in self.row_edits().items():
+            edit.setText(str(row.get(column, "")))
+        self.show_link_health()
+        # Show favicon for current platform
+        pixmap = self.pixmaps.get(self.favicon_path_for(self.current_index), FAVICON_SIZE)
+        if pixmap is not None:
+            self.favicon_label.setPixmap(pixmap)
+        else:
+            self.favicon_label.clear()
+        self.prefetch_neighbours()
+
+    def show_entry_label(self, row):
         text = (
-            f"<b>Row {self.current_index+1} of {len(self.df)}</b><br>"
+            f"<b>Row {self.current_index+1} of {len(self.catalog)}</b><br>"
             f"<b>Category:</b> {row.get('Category', '')}<br>"
             f"<b>Platform Name:</b> {row.get('Platform Name', '')}<br>"
             f"<b>Official Website:</b> {row.get('Official Website', '')}<br>"
             f"<b>Referral Link:</b> {row.get('Referral Link', '')}<br>"
             f"<b>Notes:</b> {row.get('Notes', '')}<br>"
             f"<b>Status:</b> {row.get('Status', '')}<br>"
+            f"<b>Reviewed:</b> {self.review_text()}<br>"
         )
         self.entry_label.setText(text)
-        # Handle logo: if CSV has a logo filename, set self.logo_paths
-        logo_filename = str(row.get('Logo', '')).strip()
-        if logo_filename:
-            logo_path = os.path.join(LOGO_DIR, logo_filename)
-            if os.path.exists(logo_path):
-                self.logo_paths[self.current_index] = logo_path
-            else:
-                self.logo_paths[self.current_index] = ''
-        else:
-            self.logo_paths[self.current_index] = ''
-        self.display_logo()
-        self.website_edit.setText(str(row.get('Official Website', "")))
-        self.referral_edit.setText(str(row.get('Referral Link', "")))
-        self.desc_edit.setText(str(row.get('Description', "")))
-        self.features_edit.setText(str(row.get('Features', "")))
-        self.capsules_edit.setText(str(row.get('capsules', "")))
-        # Show favicon for current platform
-        favicon_filename = str(row.get('favicon', '')).strip()
-        if favicon_filename and os.path.exists(os.path.join(FAVICON_DIR, favicon_filename)):
-            pixmap = QPixmap()
-            pixmap.load(os.path.join(FAVICON_DIR, favicon_filename))
-            self.favicon_label.setPixmap(pixmap.scaled(32, 32, Qt.KeepAspectRatio, Qt.SmoothTransformation))
-        else:
-            self.favicon_label.clear()
+
+    def row_edits(self):
+        """The editable widgets, by the CSV column they show."""
+        return {'Official Website': self.website_edit, 'Referral Link': self.referral_edit,
+                'Description': self.desc_edit, 'Features': self.features_edit, 'capsules': self.capsules_edit}
+
+    def logo_path_for(self, index):
+        logo_filename = str(self.catalog.row(index).get('Logo', '')).strip()
+        return os.path.join(LOGO_DIR, logo_filename) if logo_filename else ''
+
+    def favicon_path_for(self, index):
+        favicon_filename = str(self.catalog.row(index).get(favicons.favicon_column(self.catalog.columns), '')).strip()
+        return os.path.join(FAVICON_DIR, favicon_filename) if favicon_filename else ''
+
+    def prefetch_neighbours(self, radius=2):
+        # Decode the rows around the current one in the background so Previous/Next is instant
+        items = []
+        for index in range(self.current_index - radius, self.current_index + radius + 1):
+            if index != self.current_index and 0 <= index < len(self.catalog):
+                items.append((self.logo_path_for(index), LOGO_SIZE))
+                items.append((self.favicon_path_for(index), FAVICON_SIZE))
+        self.pixmaps.prefetch(items)
 
     def display_logo(self):
-        logo_path = self.logo_paths[self.current_index]
-        if logo_path and os.path.exists(logo_path):
-            pixmap = QPixmap(logo_path)
-            self.logo_label.setPixmap(pixmap.scaled(100, 100, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        pixmap = self.pixmaps.get(self.logo_paths[self.current_index], LOGO_SIZE)
+        if pixmap is not None:
+            self.logo_label.setPixmap(pixmap)
         else:
             self.logo_label.setText("No logo")
 
     def search_logo_online(self):
-        row = self.df.iloc[self.current_index]
+        row = self.catalog.row(self.current_index)
         platform_name = row.get('Platform Name', '')
         query = f"{platform_name} logo"
         url = f"https://www.google.com/search?tbm=isch&q={query.replace(' ', '+')}"
@@ -256,12 +341,11 @@ class RefLinksApp(QWidget):
         if mime.hasImage():
             image = clipboard.image()
             if not image.isNull():
-                row = self.df.iloc[self.current_index]
+                row = self.catalog.row(self.current_index)
                 platform_name = safe_platform_name(row.get('Platform Name', ''))
                 logo_filename = f"logo_{platform_name}.png"
                 save_path = os.path.join(LOGO_DIR, logo_filename)
-                os.makedirs(LOGO_DIR, exist_ok=True)
-                image.save(save_path, "PNG")
+                images.ingest(qimage_to_png(image), save_path, kind="logo")
                 self.logo_paths[self.current_index] = save_path
                 self.display_logo()
                 self.logo_status.setText(f"Logo pasted and saved as {logo_filename}")
@@ -271,33 +355,48 @@ class RefLinksApp(QWidget):
     def download_logo_from_url(self):
         url, ok = QInputDialog.getText(self, "Download Logo", "Paste image URL:")
         if ok and url:
-            try:
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
-                img = Image.open(io.BytesIO(response.content))
-                row = self.df.iloc[self.current_index]
-                platform_name = safe_platform_name(row.get('Platform Name', ''))
-                logo_filename = f"logo_{platform_name}.png"
-                save_path = os.path.join(LOGO_DIR, logo_filename)
-                os.makedirs(LOGO_DIR, exist_ok=True)
-                img.save(save_path)
-                self.logo_paths[self.current_index] = save_path
-                self.display_logo()
-                self.logo_status.setText(f"Logo downloaded and saved as {logo_filename}")
-            except Exception as e:
-                self.logo_status.setText(f"Failed to download image: {e}")
+            row = self.catalog.row(self.current_index)
+            key = self.current_key
+            platform_name = safe_platform_name(row.get('Platform Name', ''))
+            logo_filename = f"logo_{platform_name}.png"
+            save_path = os.path.join(LOGO_DIR, logo_filename)
+            self.logo_status.setText("Downloading logo...")
+            self.jobs.submit(
+                f"logo: {row.get('Platform Name', '')}", self.fetch_logo, url, save_path,
+                on_done=lambda _: self.on_logo_downloaded(key, save_path),
+                on_error=lambda e: self.logo_status.setText(f"Failed to download image: {e}"),
+            )
+
+    def fetch_logo(self, url, save_path):
+        # Runs on a worker thread
+        response = self.http.get(url, timeout=10)
+        response.raise_for_status()
+        images.ingest(response.content, save_path, kind="logo")
+
+    def on_logo_downloaded(self, key, save_path):
+        logo_filename = os.path.basename(save_path)
+        idx = self.catalog.locate(key, hint=self.current_index)
+        if idx is None:
+            return
+        if idx == self.current_index:
+            self.logo_paths[idx] = save_path
+            self.display_logo()
+        else:
+            self.catalog.set(idx, 'Logo', logo_filename)
+            self.refresh_grid_row(idx)
+        self.logo_status.setText(f"Logo downloaded and saved as {logo_filename}")
 
     def upload_logo(self):
-        row = self.df.iloc[self.current_index]
+        row = self.catalog.row(self.current_index)
         platform_name = safe_platform_name(row.get('Platform Name', ''))
         file_path, _ = QFileDialog.getOpenFileName(self, "Select Logo Image", "", "Image Files (*.png *.jpg *.jpeg *.bmp)")
         if file_path:
-            ext = os.path.splitext(file_path)[1]
+            ext = os.path.splitext(file_path)[1].lower()
+            if ext not in ('.png', '.jpg', '.jpeg'):
+                ext = '.png'
             logo_filename = f"logo_{platform_name}{ext}"
             save_path = os.path.join(LOGO_DIR, logo_filename)
-            os.makedirs(LOGO_DIR, exist_ok=True)
-            with open(file_path, "rb") as src, open(save_path, "wb") as dst:
-                dst.write(src.read())
+            images.ingest(file_path, save_path, kind="logo")
             self.logo_paths[self.current_index] = save_path
             self.display_logo()
             self.logo_status.setText(f"Logo saved as {logo_filename}")
@@ -320,180 +419,188 @@ class RefLinksApp(QWidget):
         key, ok = QInputDialog.getText(self, "OpenAI API Key", "Enter your OpenAI API key:", QLineEdit.Password)
         if ok and key:
             self.api_key = key
-            if openai:
-                try:
-                    client = openai.OpenAI(api_key=key)
-                    client.models.list()
-                    self.logo_status.setText("OpenAI API key set and validated.")
-                except Exception as e:
-                    self.logo_status.setText(f"Key set, but validation failed: {e}")
+            if llm.OPENAI_AVAILABLE:
+                self.logo_status.setText("Validating OpenAI API key...")
+                self.jobs.submit(
+                    "validate key", validate_api_key, key,
+                    on_done=lambda _: self.logo_status.setText("OpenAI API key set and validated."),
+                    on_error=lambda e: self.logo_status.setText(f"Key set, but validation failed: {e}"),
+                )
 
     def generate_description(self):
-        if not self.api_key or not openai:
-            self.logo_status.setText("Set your OpenAI API key first.")
-            return
-        row = self.df.iloc[self.current_index]
-        prompt = self.prompt_edit.text().strip()
-        if not prompt:
-            prompt = (
-                f"Write a single, concise sentence (max 25 words) summarizing the crypto platform: "
-                f"{row.get('Platform Name', '')}. Website: {self.website_edit.text().strip()}"
-            )
-        try:
-            model = self.model_box.currentText()
-            client = openai.OpenAI(api_key=self.api_key)
-            params = dict(
-                model=model,
-                messages=[{"role": "user", "content": prompt}],
-            )
-            if model == 'o4-mini':
-                pass  # do not send temperature
-            else:
-                params['temperature'] = 0.7
-            if model == 'o4-mini':
-                params['max_completion_tokens'] = 60
-            else:
-                params['max_tokens'] = 60
-            response = client.chat.completions.create(**params)
-            summary = response.choices[0].message.content.strip()
-            self.desc_edit.setText(summary)
-        except Exception as e:
-            self.logo_status.setText(f"OpenAI Error: {e}")
+        self.generate_field('description')
 
     def generate_features(self):
-        if not self.api_key or not openai:
+        self.generate_field('features')
+
+    def generate_capsules(self):
+        self.generate_field('capsules')
+
+    def generate_field(self, field):
+        if not self.api_key or not llm.OPENAI_AVAILABLE:
             self.logo_status.setText("Set your OpenAI API key first.")
             return
-        row = self.df.iloc[self.current_index]
-        prompt = self.prompt_edit.text().strip()
-        if not prompt:
-            prompt = (
-                f"List 4 to 6 key features of the crypto platform: "
-                f"{row.get('Platform Name', '')}. Website: {self.website_edit.text().strip()}. "
-                f"Each feature should be 3-8 words, comma-separated, and describe a real capability or benefit. "
-                f"Do NOT use numbers, bullets, or single-word tags."
-            )
-        try:
-            model = self.model_box.currentText()
-            client = openai.OpenAI(api_key=self.api_key)
-            params = dict(
-                model=model,
-                messages=[{"role": "user", "content": prompt}],
-            )
-            if model == 'o4-mini':
-                pass  # do not send temperature
-            else:
-                params['temperature'] = 0.7
-            if model == 'o4-mini':
-                params['max_completion_tokens'] = 80
-            else:
-                params['max_tokens'] = 80
-            response = client.chat.completions.create(**params)
-            features = response.choices[0].message.content.strip().replace('"', '')
-            features = features.replace('\n', ',').replace('•', '').replace('-', '')
-            features = ','.join(f.strip().lstrip('0123456789. ') for f in features.split(',') if f.strip())
-            self.features_edit.setText(features)
-        except Exception as e:
-            self.logo_status.setText(f"OpenAI Error: {e}")
+        row = self.catalog.row(self.current_index)
+        key = self.current_key
+        platform_name = row.get('Platform Name', '')
+        self.jobs.submit(
+            f"{field}: {platform_name}", run_generation,
+            self.api_key, self.model_box.currentText(), field, platform_name,
+            self.website_edit.text().strip(), self.prompt_edit.text().strip(), self.fresh_check.isChecked(),
+            on_done=lambda value: self.apply_generated(key, field, value),
+            on_error=lambda e: self.logo_status.setText(f"OpenAI Error: {e}"),
+        )
 
-    def generate_capsules(self):
-        import random
-        if not self.api_key or not openai:
+    def generate_all(self):
+        if not self.api_key or not llm.OPENAI_AVAILABLE:
             self.logo_status.setText("Set your OpenAI API key first.")
             return
-        row = self.df.iloc[self.current_index]
-        n_capsules = random.choices([2, 3], weights=[0.7, 0.3])[0]
-        prompt = self.prompt_edit.text().strip()
-        if not prompt:
-            prompt = (
-                f"Generate {n_capsules} extremely concise, unique feature tags for the crypto platform: "
-                f"{row.get('Platform Name', '')}. Website: {self.website_edit.text().strip()}. "
-                f"Each tag should be 1-3 words (prefer 1-2), comma-separated, and highlight distinctive or main features. "
-                f"DO NOT include numbers or bullet points, just comma-separated text."
-            )
+        row = self.catalog.row(self.current_index)
+        key = self.current_key
+        platform_name = row.get('Platform Name', '')
+        self.jobs.submit(
+            f"all fields: {platform_name}", run_combined_generation,
+            self.api_key, self.model_box.currentText(), platform_name, self.website_edit.text().strip(),
+            self.fresh_check.isChecked(),
+            on_done=lambda values: self.apply_generated_fields(key, values),
+            on_error=lambda e: self.logo_status.setText(f"OpenAI Error: {e}"),
+        )
+
+    def apply_generated_fields(self, key, values):
+        if key == self.current_key:
+            for field, value in values.items():
+                self.field_edits()[field].setText(value)
+            return
+        idx = self.catalog.locate(key)
+        if idx is not None:
+            self.catalog.update(idx, {enrich.FIELDS[field][0]: value for field, value in values.items()})
+            self.refresh_grid_row(idx)
+            self.logo_status.setText(f"Saved generated fields for {self.catalog.row(idx).get('Platform Name', '')}")
+
+    def apply_generated(self, key, field, value):
+        if key == self.current_key:
+            self.field_edits()[field].setText(value)
+            return
+        # The user has moved on; write the result straight to the row it was generated for
+        idx = self.catalog.locate(key)
+        if idx is not None:
+            self.catalog.set(idx, enrich.FIELDS[field][0], value)
+            self.refresh_grid_row(idx)
+            self.logo_status.setText(f"Saved generated {field} for {self.catalog.row(idx).get('Platform Name', '')}")
+
+    def field_edits(self):
+        return {'description': self.desc_edit, 'features': self.features_edit, 'capsules': self.capsules_edit}
+
+    def watch_catalog(self):
+        # ref_links.csv is replaced by rename on every write, so the directory is watched as well
+        self.watcher = QFileSystemWatcher([CSV_FILE, os.path.dirname(CSV_FILE)], self)
+        self.sync_timer = QTimer(self)
+        self.sync_timer.setSingleShot(True)
+        self.sync_timer.timeout.connect(self.sync_catalog)
+        self.watcher.fileChanged.connect(lambda _: self.sync_timer.start(300))
+        self.watcher.directoryChanged.connect(lambda _: self.sync_timer.start(300))
+
+    def sync_catalog(self):
+        """Merge changes other programs made to ref_links.csv into the open catalog."""
+        if os.path.exists(CSV_FILE) and CSV_FILE not in self.watcher.files():
+            self.watcher.addPath(CSV_FILE)
+        before = self.catalog.row(self.current_index) if self.current_index < len(self.catalog) else {}
         try:
-            model = self.model_box.currentText()
-            client = openai.OpenAI(api_key=self.api_key)
-            params = dict(
-                model=model,
-                messages=[{"role": "user", "content": prompt}],
-            )
-            if model == 'o4-mini':
-                pass  # do not send temperature
-            else:
-                params['temperature'] = 0.8
-            if model == 'o4-mini':
-                params['max_completion_tokens'] = 32
-            else:
-                params['max_tokens'] = 32
-            response = client.chat.completions.create(**params)
-            capsules = response.choices[0].message.content.strip().replace('"', '')
-            capsules = capsules.replace('\n', ',').replace('•', '').replace('-', '')
-            capsules = ','.join(c.strip().lstrip('0123456789. ') for c in capsules.split(',') if c.strip())
-            self.capsules_edit.setText(capsules)
-        except Exception as e:
-            self.logo_status.setText(f"OpenAI Error: {e}")
+            conflicts = self.catalog.sync()
+        except LockTimeout:
+            self.sync_timer.start(1000)
+            return
+        if conflicts is None:
+            return
+        idx = self.catalog.locate(self.current_key, hint=self.current_index)
+        logo_path = self.logo_paths[self.current_index] if self.current_index < len(self.logo_paths) else ''
+        self.logo_paths = ["" for _ in range(len(self.catalog))]
+        self.review_queue.rebuild()
+        if not len(self.catalog):
+            # Every row is gone; the next merge that brings rows back shows the first one
+            self.current_index = 0
+            self.entry_label.setText("<b>ref_links.csv has no rows</b>")
+            for edit in self.row_edits().values():
+                edit.clear()
+            self.logo_label.setText("No logo")
+            self.favicon_label.clear()
+        elif idx is None:
+            # The row on screen is gone
+            self.current_index = min(self.current_index, len(self.catalog) - 1)
+            self.show_entry()
+        else:
+            self.current_index = idx
+            self.logo_paths[idx] = logo_path
+            row = self.catalog.row(idx)
+            self.show_entry_label(row)
+            # Show the other writer's values, except in fields with unsaved edits
+            for column, edit in self.row_edits().items():
+                shown = edit.toPlainText() if isinstance(edit, QTextEdit) else edit.text()
+                if shown == str(before.get(column, "")) and shown != str(row.get(column, "")):
+                    edit.setText(str(row.get(column, "")))
+        if self.grid is not None:
+            self.grid.model.reload()
+        message = "ref_links.csv was changed by another program; merged"
+        if conflicts:
+            fields = ', '.join(sorted({f"{c['platform']} {c['column'] or '(row)'}" for c in conflicts}))
+            message += f"; kept your edits over theirs for {fields}"
+        self.logo_status.setText(message)
+
+    def on_jobs_changed(self, names):
+        self.jobs_label.setText(f"Running: {', '.join(names)}" if names else "")
+        self.cancel_jobs_btn.setEnabled(bool(names))
+
+    def cancel_jobs(self):
+        self.jobs.cancel_all()
+        self.logo_status.setText("Background jobs cancelled.")
+
+    def show_stats(self):
+        if self.stats_panel is None:
+            self.stats_panel = StatsPanel(parent=self)
+        self.stats_panel.show()
+        self.stats_panel.raise_()
+
+    def show_grid(self):
+        if self.grid is None:
+            self.grid = CatalogGrid(self.catalog, self.review, self.link_health, self.review_queue, parent=self)
+            self.grid.row_activated.connect(self.open_row)
+        self.grid.show()
+        self.grid.raise_()
+        self.grid.select_position(self.current_index)
+
+    def open_row(self, pos):
+        self.current_index = pos
+        self.show_entry()
+        self.raise_()
+        self.activateWindow()
 
+    def refresh_grid_row(self, idx):
+        if self.grid is not None:
+            self.grid.model.refresh_row(idx)
+
+    def save_position(self):
+        self.position_timer.stop()
+        self.review.save_position(self.current_key, self.current_index)
+
+    def closeEvent(self, event):
+        self.jobs.cancel_all()
+        self.save_position()
+        # Exports ref_links.csv for the frontend when the store has unexported edits
+        self.catalog.close()
+        super().closeEvent(event)
+
+    @metrics.timed("ui.save")
     def save_to_csv(self):
+        # Pick up changes other programs made first, so the save merges into the current file
+        self.sync_catalog()
+        row = self.catalog.row(self.current_index)
+        platform_name = row.get('Platform Name', '')
         try:
-            df_full = pd.read_csv(CSV_FILE)
-            row = self.df.iloc[self.current_index]
-            platform_name = row.get('Platform Name', '')
             website = self.website_edit.text().strip()
             referral = self.referral_edit.text().strip()
-            
-            # Try multiple matching strategies
-            # First try: match by platform name only (most reliable)
-            match = df_full['Platform Name'] == platform_name
-            idxs = df_full.index[match].tolist()
-            
-            # If multiple matches, try to narrow down by original website
-            if len(idxs) > 1:
-                original_website = row.get('Official Website', '')
-                # Handle empty website fields properly
-                if original_website and not pd.isna(original_website) and original_website.strip():
-                    match = (df_full['Platform Name'] == platform_name) & (df_full['Official Website'] == original_website)
-                else:
-                    # If original website is empty, use the first match by platform name
-                    match = df_full['Platform Name'] == platform_name
-                idxs = df_full.index[match].tolist()
-            
-            # If still no match, try by index position (fallback)
-            if not idxs and self.current_index < len(df_full):
-                idxs = [self.current_index]
-            
-            if not idxs:
-                # Last resort: find by platform name and use first match
-                match = df_full['Platform Name'] == platform_name
-                idxs = df_full.index[match].tolist()
-                if not idxs:
-                    raise Exception(f'Could not find matching row for platform: {platform_name}')
-            
-            idx = idxs[0]
-            
-            # Clean up fields
-            def clean(val):
-                if pd.isna(val) or val == 'nan' or val == '""':
-                    return ''
-                if isinstance(val, str) and val.startswith('"') and val.endswith('"'):
-                    return val[1:-1]
-                return val
-            
-            df_full.at[idx, 'Official Website'] = clean(website)
-            df_full.at[idx, 'Referral Link'] = clean(referral)
-            df_full.at[idx, 'Description'] = clean(self.desc_edit.toPlainText())
-            
-            # Properly clean features/capsules: split on commas, preserve all spaces inside tags
-            def clean_commas(val):
-                if not isinstance(val, str):
-                    return ''
-                tags = [t.strip().replace('"', '').replace("'", '') for t in re.split(r',', val) if t.strip()]
-                return ','.join(tags)
-            
-            features = clean_commas(self.features_edit.text())
-            capsules = clean_commas(self.capsules_edit.text())
-            df_full.at[idx, 'Features'] = features
-            df_full.at[idx, 'capsules'] = capsules
+            idx = self.catalog.locate(self.current_key, hint=self.current_index)
+            if idx is None:
+                raise Exception(f'Could not find matching row for platform: {platform_name}')
             
             # Handle logo: if no new logo, use existing CSV value
             logo_path = self.logo_paths[self.current_index]
@@ -501,14 +608,32 @@ class RefLinksApp(QWidget):
                 logo_filename = os.path.basename(logo_path)
             else:
                 logo_filename = str(row.get('Logo', '')).strip()
-            df_full.at[idx, 'Logo'] = clean(logo_filename)
             
-            df_full.to_csv(CSV_FILE, index=False)
-            self.logo_status.setText("Saved to CSV!")
+            self.catalog.update(idx, {
+                'Official Website': clean_value(website),
+                'Referral Link': clean_value(referral),
+                'Description': clean_value(self.desc_edit.toPlainText()),
+                'Features': clean_tags(self.features_edit.text()),
+                'capsules': clean_tags(self.capsules_edit.text()),
+                'Logo': clean_value(logo_filename),
+            })
+            # The website is part of the row key; review marks follow the row
+            old_key, self.current_key = self.current_key, self.catalog.row_key(idx)
+            self.review.rekey(old_key, self.current_key)
+            self.review.mark(self.current_key, ROW)
+            self.review_queue.update(idx)
+            self.refresh_grid_row(idx)
+            self.logo_status.setText(f"Saved to CSV! {len(self.review_queue)} rows still need review.")
+            if tag_count(self.catalog.get(idx, 'capsules')) > MAX_CAPSULES:
+                self.logo_status.setText(f"Saved, but the site only shows the first {MAX_CAPSULES} capsules.")
+            if self.catalog.conflicts:
+                # The CSV had been changed by another program; the merge kept these edits over theirs
+                fields = ', '.join(sorted({c['column'] or '(row)' for c in self.catalog.conflicts}))
+                self.catalog.conflicts.clear()
+                self.logo_status.setText(f"Saved to CSV, overriding another program's changes to: {fields}")
             
         except Exception as e:
-            self.logo_status.setText(f"Failed to save: {str(e)}")
-            print(f"Debug - Platform: {platform_name}, Index: {self.current_index}, Error: {e}")
+            self.logo_status.setText(f"Failed to save {platform_name} (row {self.current_index + 1}): {e}")
 
     def prev_entry(self):
         if self.current_index > 0:
@@ -516,81 +641,117 @@ class RefLinksApp(QWidget):
             self.show_entry()
 
     def next_entry(self):
-        if self.current_index < len(self.df) - 1:
+        if self.current_index < len(self.catalog) - 1:
             self.current_index += 1
             self.show_entry()
 
+    def next_unreviewed(self):
+        pos = self.review_queue.next_after(self.current_index)
+        if pos is None:
+            self.logo_status.setText("Every row has been reviewed.")
+            return
+        self.current_index = pos
+        self.show_entry()
+
+    def review_text(self):
+        verified_at = self.review.verified_at(self.current_key, ROW)
+        if verified_at is None:
+            text = "not yet"
+        else:
+            text = time.strftime('%Y-%m-%d %H:%M', time.localtime(verified_at))
+            if self.current_index in self.review_queue:
+                text += " (stale)"
+        return f"{text} &mdash; {len(self.review_queue)} of {len(self.catalog)} rows need review"
+
     def website_verify_action(self):
-        self.website_verified[self.current_index] = True
-        self.website_check.setText('✅')
-        self.logo_status.setText('Website verified!')
+        row = self.catalog.row(self.current_index)
+        platform_name = row.get('Platform Name', '')
+        key = self.current_key
+        links = {}
+        for link, edit in (('website', self.website_edit), ('referral', self.referral_edit)):
+            url = edit.text().strip()
+            if url and url != 'nan':
+                links[(key, link)] = url
+        if not links:
+            self.logo_status.setText("No official website URL found.")
+            return
+        job_name = f"links: {platform_name}"
+        if self.jobs.is_running(job_name):
+            self.logo_status.setText("Link check already in progress...")
+            return
+        self.logo_status.setText("Checking links...")
+        self.jobs.submit(
+            job_name, linkcheck.check_links, links,
+            workers=2, deadline=30, session=self.http.session,
+            on_done=lambda result: self.on_links_checked(key, result[0]),
+            on_error=lambda e: self.logo_status.setText(f"Link check error: {e}"),
+        )
+
+    def on_links_checked(self, key, results):
+        self.link_health.record_many([(row_key, link, result) for (row_key, link), result in results.items()])
+        website = results.get((key, 'website'))
+        if website is not None:
+            # Bot protection or a dropped referral code still means the site is up
+            if website['status'] in {linkcheck.OK} | linkcheck.WARNING_STATUSES:
+                self.review.mark(key, WEBSITE)
+            else:
+                self.review.unmark(key, WEBSITE)
+        if key == self.current_key:
+            self.show_link_health()
+        idx = self.catalog.locate(key)
+        if idx is not None:
+            self.refresh_grid_row(idx)
+        self.logo_status.setText("; ".join(
+            f"{link.capitalize()}: {linkcheck.describe(result)}"
+            for (_, link), result in sorted(results.items(), key=lambda item: item[0][1], reverse=True)
+        ))
+
+    def show_link_health(self):
+        health = self.link_health.get(self.current_key)
+        if not health:
+            self.website_check.setText('✅' if self.review.is_verified(self.current_key, WEBSITE) else '')
+            self.website_check.setToolTip('')
+            return
+        self.website_check.setText(linkcheck.health_icon(result['status'] for result in health.values()))
+        checked = max(result['checked_at'] for result in health.values())
+        lines = [f"{link.capitalize()}: {linkcheck.describe(result)} -> {result['final_url']}"
+                 for link, result in sorted(health.items(), reverse=True)]
+        lines.append(f"Checked {time.strftime('%Y-%m-%d %H:%M', time.localtime(checked))}")
+        self.website_check.setToolTip("\n".join(lines))
 
     def get_favicon_from_website(self):
-        if not self.website_verified[self.current_index]:
+        if not self.review.is_verified(self.current_key, WEBSITE):
             self.logo_status.setText('Please verify the website first!')
             return
         self.verify_website_and_favicon()
 
     def verify_website_and_favicon(self):
         url = self.website_edit.text().strip()
-        row = self.df.iloc[self.current_index]
-        platform_name = safe_platform_name(row.get('Platform Name', ''))
+        row = self.catalog.row(self.current_index)
+        platform_name = row.get('Platform Name', '')
         if not url:
             self.logo_status.setText("No official website URL found.")
             return
-        # Try to fetch favicon
-        try:
-            # Try the standard /favicon.ico first
-            if not url.startswith('http'):
-                url = 'https://' + url
-            base_url = url.split('/')[2]
-            favicon_url = f"https://{base_url}/favicon.ico"
-            r = requests.get(favicon_url, timeout=6)
-            content_type = r.headers.get('content-type', '')
-            if r.status_code == 200 and r.content and 'image' in content_type:
-                favicon_data = r.content
-            else:
-                # Try to parse <link rel="icon"> from HTML
-                r_html = requests.get(url, timeout=6)
-                if BEAUTIFULSOUP_AVAILABLE:
-                    soup = BeautifulSoup(r_html.text, 'html.parser')
-                    icon_link = soup.find('link', rel=lambda x: x and 'icon' in x.lower())
-                    if icon_link and icon_link.get('href'):
-                        icon_href = icon_link['href']
-                        if icon_href.startswith('//'):
-                            icon_url = 'https:' + icon_href
-                        elif icon_href.startswith('http'):
-                            icon_url = icon_href
-                        else:
-                            icon_url = f"https://{base_url}/{icon_href.lstrip('/')}"
-                        r_icon = requests.get(icon_url, timeout=6)
-                        icon_content_type = r_icon.headers.get('content-type', '')
-                        if r_icon.status_code == 200 and r_icon.content and 'image' in icon_content_type:
-                            favicon_data = r_icon.content
-                        else:
-                            self.logo_status.setText("Favicon not found or not an image.")
-                            return
-                    else:
-                        self.logo_status.setText("Favicon not found.")
-                        return
-                else:
-                    self.logo_status.setText("BeautifulSoup not installed. Favicon parsing from HTML will be limited.")
-                    return
-            # Always save as PNG
-            try:
-                from PIL import Image
-                import io
-                img = Image.open(io.BytesIO(favicon_data))
-                png_path = os.path.join(FAVICON_DIR, f"fav_{platform_name}.png")
-                img.save(png_path, format='PNG')
-                favicon_filename = f"fav_{platform_name}.png"
-                favicon_path = png_path
-                self.update_favicon_csv_and_ui(favicon_filename, favicon_path)
-                self.logo_status.setText(f"Favicon saved as {favicon_filename}")
-            except Exception as e:
-                self.logo_status.setText(f"Favicon error: {e}")
-        except Exception as e:
-            self.logo_status.setText(f"Favicon error: {e}")
+        job_name = f"favicon: {platform_name}"
+        if self.jobs.is_running(job_name):
+            self.logo_status.setText("Favicon fetch already in progress...")
+            return
+        key = self.current_key
+        self.logo_status.setText("Fetching favicon...")
+        self.jobs.submit(
+            job_name, favicons.harvest, [(key, platform_name, url)], FAVICON_DIR,
+            workers=1, deadline=20, session=self.http,
+            on_done=lambda report: self.on_favicon_fetched(key, report),
+            on_error=lambda e: self.logo_status.setText(f"Favicon error: {e}"),
+        )
+
+    def on_favicon_fetched(self, key, report):
+        if report.misses:
+            self.logo_status.setText(f"Favicon error: {report.misses[0]['error']}")
+            return
+        hit = report.hits[0]
+        self.update_favicon_csv_and_ui(hit['filename'], hit['path'], key)
+        self.logo_status.setText(f"Favicon saved as {hit['filename']}")
 
     def paste_favicon_clipboard(self):
         clipboard = QGuiApplication.clipboard()
@@ -598,77 +759,57 @@ class RefLinksApp(QWidget):
         if mime.hasImage():
             image = clipboard.image()
             if not image.isNull():
-                row = self.df.iloc[self.current_index]
+                row = self.catalog.row(self.current_index)
                 platform_name = safe_platform_name(row.get('Platform Name', ''))
                 favicon_filename = f"fav_{platform_name}.png"
                 save_path = os.path.join(FAVICON_DIR, favicon_filename)
-                os.makedirs(FAVICON_DIR, exist_ok=True)
-                image.save(save_path, "PNG")
+                images.ingest(qimage_to_png(image), save_path, kind="favicon")
                 self.update_favicon_csv_and_ui(favicon_filename, save_path)
                 self.logo_status.setText(f"Favicon pasted and saved as {favicon_filename}")
                 return
         self.logo_status.setText("No image found in clipboard.")
 
     def upload_favicon(self):
-        row = self.df.iloc[self.current_index]
+        row = self.catalog.row(self.current_index)
         platform_name = safe_platform_name(row.get('Platform Name', ''))
         file_path, _ = QFileDialog.getOpenFileName(self, "Select Favicon Image", "", "Image Files (*.ico *.png *.jpg *.jpeg *.bmp)")
         if file_path:
-            from PIL import Image
-            img = Image.open(file_path)
             favicon_filename = f"fav_{platform_name}.png"
             save_path = os.path.join(FAVICON_DIR, favicon_filename)
-            os.makedirs(FAVICON_DIR, exist_ok=True)
-            img.save(save_path, format='PNG')
+            images.ingest(file_path, save_path, kind="favicon")
             self.update_favicon_csv_and_ui(favicon_filename, save_path)
             self.logo_status.setText(f"Favicon saved as {favicon_filename}")
 
-    def update_favicon_csv_and_ui(self, favicon_filename, favicon_path):
+    @metrics.timed("ui.update_favicon")
+    def update_favicon_csv_and_ui(self, favicon_filename, favicon_path, key=None):
+        if key is None:
+            key = self.current_key
         # Update CSV
-        row = self.df.iloc[self.current_index]
-        df_full = pd.read_csv(CSV_FILE)
-        # Ensure favicon column is string type
-        if 'favicon' not in df_full.columns:
-            df_full['favicon'] = ''
-        else:
-            df_full['favicon'] = df_full['favicon'].astype(str)
-        
-        # Use the same robust matching logic as save_to_csv
-        platform_name = row.get('Platform Name', '')
-        match = df_full['Platform Name'] == platform_name
-        idxs = df_full.index[match].tolist()
+        idx = self.catalog.locate(key, hint=self.current_index)
+        if idx is not None:
+            self.catalog.set(idx, favicons.favicon_column(self.catalog.columns), favicon_filename)
+            self.refresh_grid_row(idx)
         
-        # If multiple matches, try to narrow down by original website
-        if len(idxs) > 1:
-            original_website = row.get('Official Website', '')
-            # Handle empty website fields properly
-            if original_website and not pd.isna(original_website) and original_website.strip():
-                match = (df_full['Platform Name'] == platform_name) & (df_full['Official Website'] == original_website)
-            else:
-                # If original website is empty, use the first match by platform name
-                match = df_full['Platform Name'] == platform_name
-            idxs = df_full.index[match].tolist()
-        
-        # If still no match, try by index position (fallback)
-        if not idxs and self.current_index < len(df_full):
-            idxs = [self.current_index]
-        
-        if idxs:
-            idx = idxs[0]
-            df_full.at[idx, 'favicon'] = favicon_filename
-            # Force favicon column to string before saving
-            df_full['favicon'] = df_full['favicon'].astype(str)
-            df_full.to_csv(CSV_FILE, index=False)
-        
-        # Show favicon in UI
-        pixmap = QPixmap()
-        pixmap.load(favicon_path)
-        self.favicon_label.setPixmap(pixmap.scaled(32, 32, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        # Show favicon in UI (unless the user has moved on to another row)
+        if idx != self.current_index:
+            return
+        pixmap = self.pixmaps.get(favicon_path, FAVICON_SIZE)
+        if pixmap is not None:
+            self.favicon_label.setPixmap(pixmap)
 
-if __name__ == "__main__":
-    # Make a backup
+def make_backup():
+    import shutil
     shutil.copyfile(__file__, os.path.join(os.path.dirname(__file__), 'app2_backup.py'))
+
+if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = RefLinksApp()
     window.show()
-    sys.exit(app.exec_())
+    # Copying the source to app2_backup.py is opt-in and waits until the window is up
+    if '--backup' in sys.argv:
+        QTimer.singleShot(0, make_backup)
+    status = app.exec_()
+    # --metrics PATH writes the session's timings on exit (CSV for a .csv path, otherwise JSON)
+    if '--metrics' in sys.argv[:-1]:
+        metrics.METRICS.dump(sys.argv[sys.argv.index('--metrics') + 1])
+    sys.exit(status)
@@ -4,46 +4,42 @@ const csv = require('csv-parser');
 const createCsvWriter = require('csv-writer').createObjectCsvWriter;
 const axios = require('axios');
 
-// Platform APIs - only major platforms with reliable public APIs
+// Platform APIs - only major platforms with reliable public APIs.
+// currentDeals is owned by `python -m reflinks.deals`, which scrapes it; never write it here
 const PLATFORM_APIS = {
   'Coinbase': {
     url: 'https://api.coinbase.com/v2/currencies',
     extract: (data) => ({ 
       status: 'Active', 
-      lastUpdated: new Date().toISOString(),
-      currentDeals: 'Free crypto rewards available'
+      lastUpdated: new Date().toISOString()
     })
   },
   'Kraken': {
     url: 'https://api.kraken.com/0/public/Assets',
     extract: (data) => ({ 
       status: 'Active', 
-      lastUpdated: new Date().toISOString(),
-      currentDeals: 'Professional trading platform'
+      lastUpdated: new Date().toISOString()
     })
   },
   'Binance': {
     url: 'https://api.binance.com/api/v3/ticker/24hr',
     extract: (data) => ({ 
       status: 'Active', 
-      lastUpdated: new Date().toISOString(),
-      currentDeals: 'Referral program with up to 40% commission'
+      lastUpdated: new Date().toISOString()
     })
   },
   'Bybit': {
     url: 'https://api.bybit.com/v5/market/tickers',
     extract: (data) => ({ 
       status: 'Active', 
-      lastUpdated: new Date().toISOString(),
-      currentDeals: 'Welcome bonus up to $100'
+      lastUpdated: new Date().toISOString()
     })
   },
   'OKX': {
     url: 'https://www.okx.com/api/v5/market/tickers',
     extract: (data) => ({ 
       status: 'Active', 
-      lastUpdated: new Date().toISOString(),
-      currentDeals: 'New user rewards available'
+      lastUpdated: new Date().toISOString()
     })
   }
 };
@@ -62,64 +58,127 @@ async function fetchApiData(platformName, config) {
     console.error(`Error fetching API data for ${platformName}:`, error.message);
     return { 
       status: 'Error', 
-      lastUpdated: new Date().toISOString(),
-      currentDeals: 'Check platform for current offers'
+      lastUpdated: new Date().toISOString()
     };
   }
 }
 
-async function updateCSV() {
-  const csvPath = path.join(__dirname, '../../public/ref_links.csv');
-  const platforms = [];
-  
-  // Read existing CSV
+// Same advisory lock as the desktop validator (reflinks/catalog.py): a lock file
+// created exclusively next to the CSV, taken over once it is older than a minute
+const LOCK_TIMEOUT_MS = 10000;
+const LOCK_STALE_MS = 60000;
+
+async function withCsvLock(csvPath, fn) {
+  const lockPath = `${csvPath}.lock`;
+  const deadline = Date.now() + LOCK_TIMEOUT_MS;
+  for (;;) {
+    try {
+      fs.writeFileSync(lockPath, JSON.stringify({ pid: process.pid, owner: 'updateCSV.js', time: Date.now() / 1000 }), { flag: 'wx' });
+      break;
+    } catch (error) {
+      if (error.code !== 'EEXIST') throw error;
+      let age;
+      try {
+        age = Date.now() - fs.statSync(lockPath).mtimeMs;
+      } catch (statError) {
+        continue;
+      }
+      if (age > LOCK_STALE_MS) {
+        try { fs.unlinkSync(lockPath); } catch (unlinkError) { /* taken over by someone else */ }
+        continue;
+      }
+      if (Date.now() > deadline) throw new Error(`${lockPath} is held by another writer`);
+      await new Promise(resolve => setTimeout(resolve, 50));
+    }
+  }
+  try {
+    return await fn();
+  } finally {
+    try { fs.unlinkSync(lockPath); } catch (error) { /* already gone */ }
+  }
+}
+
+function readCSV(csvPath) {
   return new Promise((resolve, reject) => {
+    const rows = [];
     fs.createReadStream(csvPath)
       .pipe(csv())
-      .on('data', (row) => platforms.push(row))
-      .on('end', async () => {
-        try {
-          console.log(`Processing ${platforms.length} platforms...`);
-          
-          // Update each platform with API data
-          for (let i = 0; i < platforms.length; i++) {
-            const platform = platforms[i];
-            const platformName = platform['Platform Name'];
-            
-            // Check if platform has API configuration
-            if (PLATFORM_APIS[platformName]) {
-              console.log(`Updating ${platformName} via API...`);
-              const data = await fetchApiData(platformName, PLATFORM_APIS[platformName]);
-              platforms[i] = { ...platform, ...data };
-            } else {
-              // For platforms without APIs, just add timestamp
-              platforms[i] = { 
-                ...platform, 
-                lastUpdated: new Date().toISOString(),
-                currentDeals: platform['Referral Link'] ? 'Referral link available' : 'Check platform for offers'
-              };
-            }
-            
-            // Small delay to be respectful
-            await new Promise(resolve => setTimeout(resolve, 500));
-          }
-          
-          // Write updated CSV
-          const csvWriter = createCsvWriter({
-            path: csvPath,
-            header: Object.keys(platforms[0]).map(key => ({ id: key, title: key }))
-          });
-          
-          await csvWriter.writeRecords(platforms);
-          console.log('CSV updated successfully!');
-          resolve();
-          
-        } catch (error) {
-          console.error('Error updating CSV:', error);
-          reject(error);
-        }
+      .on('data', (row) => rows.push(row))
+      .on('end', () => resolve(rows))
+      .on('error', reject);
+  });
+}
+
+// Row keys as reflinks/catalog.py builds them (normalize_name, normalize_website,
+// row_keys), so both writers match the same rows
+function casefold(text) {
+  // Python's str.casefold() for everything but rare scripts: ß -> ss, final ς -> σ
+  return text.toUpperCase().toLowerCase().replace(/ς/g, 'σ');
+}
+
+function normalizeName(name) {
+  return casefold((name || '').split(/\s+/).filter(Boolean).join(' '));
+}
+
+function normalizeWebsite(url) {
+  return casefold((url || '').trim())
+    .replace(/^https:\/\//, '').replace(/^http:\/\//, '').replace(/^www\./, '').replace(/\/+$/, '');
+}
+
+// `${name}\0${website}\0${n}`, n telling exact duplicates apart
+function rowKeys(rows) {
+  const seen = new Map();
+  return rows.map(row => {
+    const key = `${normalizeName(row['Platform Name'])}\u0000${normalizeWebsite(row['Official Website'])}`;
+    const n = seen.get(key) || 0;
+    seen.set(key, n + 1);
+    return `${key}\u0000${n}`;
+  });
+}
+
+async function updateCSV() {
+  const csvPath = path.join(__dirname, '../../public/ref_links.csv');
+  const platforms = await readCSV(csvPath);
+  const keys = rowKeys(platforms);
+  const updates = new Map();
+
+  console.log(`Processing ${platforms.length} platforms...`);
+
+  // Update each platform with API data
+  for (const [i, platform] of platforms.entries()) {
+    const platformName = platform['Platform Name'];
+
+    // Check if platform has API configuration
+    if (PLATFORM_APIS[platformName]) {
+      console.log(`Updating ${platformName} via API...`);
+      updates.set(keys[i], await fetchApiData(platformName, PLATFORM_APIS[platformName]));
+    } else {
+      // For platforms without APIs, just add timestamp
+      updates.set(keys[i], {
+        lastUpdated: new Date().toISOString()
       });
+    }
+
+    // Small delay to be respectful
+    await new Promise(resolve => setTimeout(resolve, 500));
+  }
+
+  // The desktop validator may have saved edits meanwhile: re-read the file under the lock
+  // and change only the fields fetched here, then replace the file in one rename
+  await withCsvLock(csvPath, async () => {
+    const current = await readCSV(csvPath);
+    const currentKeys = rowKeys(current);
+    const merged = current.map((row, i) => ({ ...row, ...(updates.get(currentKeys[i]) || {}) }));
+    const columns = [...new Set(merged.flatMap(row => Object.keys(row)))];
+    const tmpPath = `${csvPath}.${process.pid}.tmp`;
+    const csvWriter = createCsvWriter({
+      path: tmpPath,
+      header: columns.map(key => ({ id: key, title: key }))
+    });
+    await csvWriter.writeRecords(merged);
+    fs.renameSync(tmpPath, csvPath);
   });
+  console.log('CSV updated successfully!');
 }
 
 // Run if called directly
@@ -0,0 +1,366 @@
+"""Hot-path benchmarks for the Ref Links Validator on synthetic catalogs.
+
+For each catalog size a fresh workspace is generated: a ref_links.csv with
+the real column layout plus a logo and a favicon file for every row, with
+websites pointing at a local mock web server. A child interpreter then opens
+RefLinksApp on it (offscreen without a display) and times:
+
+- startup: importing app2 and showing the window;
+- show_entry, save_to_csv and update_favicon_csv_and_ui on rows spread over
+  the catalog;
+- favicon harvesting of a slice of the rows against the mock web server;
+- combined enrichment of a slice of the rows against a mock OpenAI endpoint.
+
+Results are printed and, with ``--json``, written as machine-readable output.
+``--compare`` checks them against an earlier run:
+
+    python benchmarks/hotpaths.py --sizes 1000,10000,50000 --json hotpaths.json
+    python benchmarks/hotpaths.py --sizes 10000 --compare hotpaths.json --tolerance 0.25
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEADER = ["Category", "Platform Name", "Official Website", "Referral Link", "Notes", "Status", "Logo", "Favicon",
+          "Description", "Features", "capsules", "API", "scraping_page", "Deals", "currentDeals"]
+CATEGORIES = ["CEXs", "DEXs", "Trading Bots", "Wallets", "Bridging", "NFT Marketplaces", "Casinos"]
+WORDS = ["swap", "finance", "labs", "exchange", "wallet", "bot", "protocol", "market", "bridge", "pay"]
+OPERATIONS = ("show_entry", "save_to_csv", "update_favicon_csv_and_ui")
+
+
+def _png_pool(size, count=32, seed=0):
+    """A few distinct PNG images to copy around; encoding one per row would dominate generation."""
+    from PIL import Image, ImageDraw
+    rng = random.Random(seed)
+    pool = []
+    for _ in range(count):
+        img = Image.new('RGBA', (size, size), tuple(rng.randrange(256) for _ in range(3)) + (255,))
+        draw = ImageDraw.Draw(img)
+        for _ in range(4):
+            x, y = rng.randrange(size), rng.randrange(size)
+            draw.ellipse((x, y, x + size // 3, y + size // 3), fill=tuple(rng.randrange(256) for _ in range(4)))
+        buf = io.BytesIO()
+        img.save(buf, format='PNG')
+        pool.append(buf.getvalue())
+    return pool
+
+
+def generate_workspace(workspace, rows, web_url, seed=0):
+    """Write public/ref_links.csv with `rows` synthetic platforms, and their logos and favicons."""
+    import csv
+    sys.path.insert(0, ROOT)
+    from reflinks.config import safe_platform_name
+    rng = random.Random(seed)
+    public = os.path.join(workspace, "public")
+    logo_dir, favicon_dir = os.path.join(public, "logos"), os.path.join(public, "favicons")
+    os.makedirs(logo_dir, exist_ok=True)
+    os.makedirs(favicon_dir, exist_ok=True)
+    logos, icons = _png_pool(200, seed=seed), _png_pool(48, seed=seed + 1)
+    with open(os.path.join(public, "ref_links.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        for i in range(rows):
+            name = f"{rng.choice(WORDS).title()}{i:05d} {rng.choice(WORDS)}"
+            safe = safe_platform_name(name)
+            logo, favicon = f"logo_{safe}.png", f"fav_{safe}.png"
+            with open(os.path.join(logo_dir, logo), "wb") as img:
+                img.write(logos[i % len(logos)])
+            with open(os.path.join(favicon_dir, favicon), "wb") as img:
+                img.write(icons[i % len(icons)])
+            features = ",".join(rng.sample(["Low fees", "Fast swaps", "Staking", "Copy trading", "Mobile app",
+                                            "24/7 support", "Advanced charts", "Cross-chain"], 5))
+            writer.writerow([
+                rng.choice(CATEGORIES), name, f"{web_url}/site/{i}", f"{web_url}/ref/{i}?code=BENCH{i}", "",
+                rng.choice(["Existing", "Missing - Top Priority", ""]), logo, favicon,
+                f"{name} is a synthetic platform used to benchmark the validator with a realistic description.",
+                features, ",".join(features.split(",")[:2]), rng.choice(["yes", "no", "maybe"]), "", "", "",
+            ])
+
+
+class _WebHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    icon = b""
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, content_type, body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        path = self.path.split("?")[0]
+        if path.startswith("/icon/"):
+            etag = f'"{path}"'
+            if self.headers.get("If-None-Match") == etag:
+                return self._send(304, "image/png", b"", {"ETag": etag})
+            return self._send(200, "image/png", self.icon, {"ETag": etag})
+        if path == "/favicon.ico":
+            return self._send(404, "text/html", b"not found")
+        n = path.rstrip("/").rsplit("/", 1)[-1]
+        html = f'<html><head><link rel="icon" href="/icon/{n}.png"></head><body>Platform {n}</body></html>'
+        self._send(200, "text/html; charset=utf-8", html.encode())
+
+
+class _OpenAIHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._send_json({"object": "list", "data": []})
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.latency:
+            time.sleep(self.latency)
+        prompt = request["messages"][-1]["content"]
+        if "response_format" in request:
+            content = json.dumps({"description": "A synthetic platform for benchmarks.",
+                                  "features": ["Low fees", "Fast swaps", "Staking rewards", "Mobile app"],
+                                  "capsules": ["Fast", "Cheap", "Secure"]})
+        else:
+            content = "Low fees, Fast swaps, Staking" if "comma-separated" in prompt else "A synthetic platform."
+        self._send_json({
+            "id": "bench", "object": "chat.completion", "created": 0, "model": request["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4,
+                      "total_tokens": (len(prompt) + len(content)) // 4},
+        })
+
+
+def start_server(handler, **attrs):
+    handler = type(handler.__name__, (handler,), attrs)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def timing_stats(values):
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "total_s": sum(values),
+        "median_ms": statistics.median(values) * 1000,
+        "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))] * 1000,
+        "max_ms": values[-1] * 1000,
+    }
+
+
+def run_child(args):
+    """Runs inside the child interpreter with REFLINKS_WORKSPACE pointing at the synthetic catalog."""
+    sys.path.insert(0, ROOT)
+    t0 = time.perf_counter()
+    import app2
+    t1 = time.perf_counter()
+    from PyQt5.QtCore import QThreadPool
+    from reflinks import enrich, favicons
+    from reflinks.config import CSV_FILE, FAVICON_DIR
+
+    app = app2.QApplication(sys.argv[:1])
+    window = app2.RefLinksApp()
+    window.show()
+    app.processEvents()
+    t2 = time.perf_counter()
+    result = {"startup": {"import_s": t1 - t0, "window_s": t2 - t0}}
+
+    size = len(window.catalog)
+    stride = max(1, size // args.ops)
+    positions = [(i * stride) % size for i in range(args.ops)]
+    timings = {op: [] for op in OPERATIONS}
+    for pos in positions:
+        window.current_index = pos
+        start = time.perf_counter()
+        window.show_entry()
+        app.processEvents()
+        timings["show_entry"].append(time.perf_counter() - start)
+    for pos in positions:
+        window.current_index = pos
+        window.show_entry()
+        window.desc_edit.setText(f"Edited description {pos}")
+        start = time.perf_counter()
+        window.save_to_csv()
+        timings["save_to_csv"].append(time.perf_counter() - start)
+    for pos in positions:
+        window.current_index = pos
+        window.show_entry()
+        filename = os.path.basename(window.favicon_path_for(pos))
+        start = time.perf_counter()
+        window.update_favicon_csv_and_ui(filename, os.path.join(FAVICON_DIR, filename))
+        app.processEvents()
+        timings["update_favicon_csv_and_ui"].append(time.perf_counter() - start)
+    for op, values in timings.items():
+        result[op] = timing_stats(values)
+    names = [window.catalog.get(pos, 'Platform Name') for pos in positions]
+    window.close()
+    QThreadPool.globalInstance().waitForDone()
+
+    count = min(size, args.harvest_rows)
+    harvest_names = [window.catalog.get(pos, 'Platform Name') for pos in range(0, size, max(1, size // count))][:count]
+    start = time.perf_counter()
+    report = favicons.harvest_csv(CSV_FILE, FAVICON_DIR, platforms=harvest_names, workers=args.workers,
+                                  per_host=args.workers)
+    elapsed = time.perf_counter() - start
+    result["harvest"] = {"rows": len(harvest_names), "hits": len(report.hits), "misses": len(report.misses),
+                         "total_s": elapsed, "rows_per_s": len(harvest_names) / elapsed if elapsed else None}
+
+    enrich_names = names[:args.enrich_rows]
+    start = time.perf_counter()
+    outcome = enrich.enrich_csv(CSV_FILE, list(enrich.COMBINED_FIELDS), "bench-key", workers=args.workers,
+                                platforms=enrich_names, base_url=f"{args.llm_url}/v1", combined=True,
+                                use_cache=False)
+    elapsed = time.perf_counter() - start
+    result["enrich"] = {"rows": outcome["rows"], "generated": outcome["generated"], "errors": len(outcome["errors"]),
+                        "total_s": elapsed, "usage": outcome["usage"]}
+    print(json.dumps(result), flush=True)
+    return 0
+
+
+def run_size(size, args, web_url, llm_url):
+    workspace = tempfile.mkdtemp(prefix=f"reflinks-bench-{size}-")
+    try:
+        start = time.perf_counter()
+        generate_workspace(workspace, size, web_url, args.seed)
+        generated = time.perf_counter() - start
+        env = dict(os.environ, REFLINKS_WORKSPACE=workspace)
+        if args.platform:
+            env["QT_QPA_PLATFORM"] = args.platform
+        command = [sys.executable, os.path.abspath(__file__), "--child", "--ops", str(args.ops),
+                   "--harvest-rows", str(args.harvest_rows), "--enrich-rows", str(args.enrich_rows),
+                   "--workers", str(args.workers), "--llm-url", llm_url]
+        proc = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True)
+        lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+        if proc.returncode != 0 or not lines:
+            raise RuntimeError(f"benchmark child failed ({proc.returncode}): {proc.stderr.strip()[-800:]}")
+        result = json.loads(lines[-1])
+        result["generate_s"] = generated
+        return result
+    finally:
+        if not args.keep:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+
+def compare(results, baseline, tolerance):
+    """Print median changes against `baseline`; returns the regressions beyond `tolerance`."""
+    regressions = []
+    for size, ops in results.items():
+        base = baseline.get("results", {}).get(size)
+        if not base:
+            continue
+        for op in OPERATIONS:
+            old, new = base.get(op, {}).get("median_ms"), ops[op]["median_ms"]
+            if old:
+                change = new / old - 1
+                print(f"{size:>6} {op:26} {old:8.2f} -> {new:8.2f} ms ({change:+.0%})")
+                if change > tolerance:
+                    regressions.append((size, op, change))
+        for op, key in (("startup", "window_s"), ("harvest", "total_s"), ("enrich", "total_s")):
+            old, new = base.get(op, {}).get(key), ops[op][key]
+            if old:
+                change = new / old - 1
+                print(f"{size:>6} {op + ' ' + key:26} {old:8.3f} -> {new:8.3f} s  ({change:+.0%})")
+                if change > tolerance:
+                    regressions.append((size, op, change))
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the validator's hot paths on synthetic catalogs")
+    parser.add_argument("--sizes", default="1000,10000", help="Comma-separated catalog sizes (default: %(default)s)")
+    parser.add_argument("--ops", type=int, default=50, help="Rows per timed operation (default: %(default)s)")
+    parser.add_argument("--harvest-rows", type=int, default=200, help="Rows to harvest favicons for")
+    parser.add_argument("--enrich-rows", type=int, default=50, help="Rows to enrich through the mock OpenAI endpoint")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the mock servers wait per request")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--platform", default=None if os.environ.get("DISPLAY") or os.name == "nt" else "offscreen",
+                        help="QT_QPA_PLATFORM for the child process (default: offscreen without a display)")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated workspaces")
+    parser.add_argument("--json", help="Write the results to this path")
+    parser.add_argument("--compare", help="Earlier --json output to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Fail --compare when a median gets slower by more than this fraction")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--llm-url", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        return run_child(args)
+
+    web, web_url = start_server(_WebHandler, latency=args.latency, icon=_png_pool(64, count=1)[0])
+    llm, llm_url = start_server(_OpenAIHandler, latency=args.latency)
+    args.llm_url = llm_url
+    results = {}
+    try:
+        for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+            result = results[str(size)] = run_size(size, args, web_url, llm_url)
+            print(f"{size} rows (generated in {result['generate_s']:.1f}s)")
+            print(f"  startup: import {result['startup']['import_s'] * 1000:.0f} ms, "
+                  f"window {result['startup']['window_s'] * 1000:.0f} ms")
+            for op in OPERATIONS:
+                stats = result[op]
+                print(f"  {op:26} median {stats['median_ms']:7.2f} ms  p95 {stats['p95_ms']:7.2f} ms  "
+                      f"max {stats['max_ms']:7.2f} ms")
+            harvest, enriched = result["harvest"], result["enrich"]
+            print(f"  harvest: {harvest['hits']}/{harvest['rows']} favicons in {harvest['total_s']:.2f}s")
+            print(f"  enrich:  {enriched['rows']} rows ({enriched['generated']} values) in {enriched['total_s']:.2f}s, "
+                  f"{enriched['usage']['prompt_tokens']} + {enriched['usage']['completion_tokens']} tokens")
+    finally:
+        web.shutdown()
+        llm.shutdown()
+
+    output = {"meta": {"commit": git_commit(), "python": platform.python_version(), "platform": platform.platform(),
+                       "timestamp": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), "ops": args.ops,
+                       "latency": args.latency},
+              "results": results}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for size, op, change in regressions:
+            print(f"FAIL: {op} at {size} rows is {change:.0%} slower")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
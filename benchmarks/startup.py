@@ -0,0 +1,103 @@
+"""Cold-start benchmark for the Ref Links Validator (app2.py).
+
+Every run starts a fresh interpreter that imports app2 and opens the main
+window, and reports how long the import took, when the window was first shown
+and which heavy dependencies had been loaded by then. The workspace defaults
+to this checkout. Budgets turn the script into a regression check:
+
+    python benchmarks/startup.py --runs 5 --json startup.json
+    python benchmarks/startup.py --max-import 0.5 --max-window 1.5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("pandas", "openai", "requests", "bs4", "PIL")
+
+CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+import app2
+t1 = time.perf_counter()
+from PyQt5.QtCore import QThreadPool, QTimer
+app = app2.QApplication(sys.argv[:1])
+window = app2.RefLinksApp()
+window.show()
+
+def shown():
+    t2 = time.perf_counter()
+    loaded = [m for m in %r if m in sys.modules]
+    print(json.dumps({"import_s": t1 - t0, "window_s": t2 - t0, "heavy_modules": loaded}), flush=True)
+    window.close()
+    app.quit()
+
+# Fires once the event loop has processed the show events
+QTimer.singleShot(0, shown)
+app.exec_()
+# Let background thumbnail loads finish before their signal objects are torn down
+QThreadPool.globalInstance().waitForDone()
+""" % (HEAVY_MODULES,)
+
+
+def run_once(workspace, platform=None):
+    env = dict(os.environ, REFLINKS_WORKSPACE=workspace)
+    if platform:
+        env["QT_QPA_PLATFORM"] = platform
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", CHILD], cwd=ROOT, env=env, capture_output=True, text=True)
+    total = time.perf_counter() - start
+    lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+    if proc.returncode != 0 or not lines:
+        raise RuntimeError(f"startup run failed ({proc.returncode}): {proc.stderr.strip()[-500:]}")
+    result = json.loads(lines[-1])
+    # Includes interpreter start-up and teardown, which the in-process timers cannot see
+    result["process_s"] = total
+    return result
+
+
+def summarize(runs):
+    summary = {}
+    for metric in ("import_s", "window_s", "process_s"):
+        values = [run[metric] for run in runs]
+        summary[metric] = {"min": min(values), "median": statistics.median(values), "max": max(values)}
+    summary["heavy_modules"] = sorted({m for run in runs for m in run["heavy_modules"]})
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure app2.py import time and time to first window")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workspace", default=ROOT, help="Checkout with public/ref_links.csv (default: %(default)s)")
+    parser.add_argument("--platform", default=None if os.environ.get("DISPLAY") or os.name == "nt" else "offscreen",
+                        help="QT_QPA_PLATFORM for the child process (default: offscreen without a display)")
+    parser.add_argument("--json", help="Write the runs and summary to this path")
+    parser.add_argument("--max-import", type=float, help="Fail if the median import time exceeds this many seconds")
+    parser.add_argument("--max-window", type=float, help="Fail if the median time to first window exceeds this")
+    args = parser.parse_args(argv)
+
+    runs = [run_once(args.workspace, args.platform) for _ in range(args.runs)]
+    summary = summarize(runs)
+    for metric in ("import_s", "window_s", "process_s"):
+        stats = summary[metric]
+        print(f"{metric:10} median {stats['median'] * 1000:7.1f} ms  "
+              f"min {stats['min'] * 1000:7.1f} ms  max {stats['max'] * 1000:7.1f} ms")
+    print(f"heavy modules loaded at first window: {', '.join(summary['heavy_modules']) or 'none'}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"runs": runs, "summary": summary}, f, indent=2)
+
+    failed = False
+    for limit, metric in ((args.max_import, "import_s"), (args.max_window, "window_s")):
+        if limit is not None and summary[metric]["median"] > limit:
+            print(f"FAIL: median {metric} {summary[metric]['median']:.3f}s exceeds {limit:.3f}s")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+# Headless helpers shared by the Ref Links Validator (app2.py) and its CLI tools.
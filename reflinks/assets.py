@@ -0,0 +1,286 @@
+"""Integrity sweep over the logo and favicon directories and ref_links.csv.
+
+Checks that every ``Logo`` / ``Favicon`` value points to a file, that every
+image on disk is still referenced (by the CSV, by a literal path in the
+frontend sources, or by the ``fav_<name>`` / ``logo_<name>`` convention the
+validator saves and the frontend loads them by), and which images are byte-identical. Derived files
+written by `reflinks.images` (WebP copies, ``thumbs/``) follow their source.
+
+File hashes are kept in a manifest under the cache directory and a file is
+only hashed again when its size or mtime changed, so repeated sweeps just
+stat the directories. The result is a fix plan: relink rows to a file that
+exists under a slightly different name, re-fetch what is gone, delete
+unreferenced files:
+
+    python -m reflinks.assets
+    python -m reflinks.assets --plan asset-plan.json
+    python -m reflinks.assets --apply
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+
+from reflinks.config import CACHE_DIR, CSV_FILE, FAVICON_DIR, LOGO_DIR, WORKSPACE_DIR, safe_platform_name
+from reflinks.favicons import favicon_column
+from reflinks.images import IMAGE_EXTENSIONS, THUMB_DIR_NAME
+from reflinks.store import open_catalog
+
+SOURCE_EXTENSIONS = ('.ts', '.tsx', '.js', '.jsx', '.css', '.html')
+SOURCE_REFERENCE = re.compile(r'/(logos|favicons)/([\w.\-]+\.(?:png|jpe?g|gif|ico|webp|bmp|svg))', re.I)
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Manifest:
+    """Content hashes keyed by path, trusted while size and mtime are unchanged."""
+
+    def __init__(self, path=os.path.join(CACHE_DIR, "assets.sqlite")):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, sha256 TEXT)"
+        )
+        self._db.commit()
+        self.rehashed = 0
+
+    def scan(self, paths, prune=True):
+        """``{path: (size, sha256)}`` for `paths`, hashing only new or modified files.
+
+        With `prune`, entries for files not in `paths` are forgotten.
+        """
+        known = {path: (size, mtime_ns, sha) for path, size, mtime_ns, sha in self._db.execute("SELECT * FROM files")}
+        result, updates = {}, []
+        for path in paths:
+            st = os.stat(path)
+            entry = known.get(path)
+            if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+                sha = entry[2]
+            else:
+                sha = file_hash(path)
+                updates.append((path, st.st_size, st.st_mtime_ns, sha))
+            result[path] = (st.st_size, sha)
+        gone = [(path,) for path in known if path not in result] if prune else []
+        with self._db:
+            self._db.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", updates)
+            self._db.executemany("DELETE FROM files WHERE path = ?", gone)
+        self.rehashed += len(updates)
+        return result
+
+    def close(self):
+        self._db.close()
+
+
+def list_images(directory):
+    """``(sources, derived)``: the images in `directory`, and the WebP copies and thumbnails made from them.
+
+    ``derived`` maps each derived path to the stem of the source it belongs to.
+    """
+    if not os.path.isdir(directory):
+        return [], {}
+    names = [n for n in os.listdir(directory) if n.lower().endswith(IMAGE_EXTENSIONS)
+             and os.path.isfile(os.path.join(directory, n))]
+    stems = {os.path.splitext(n)[0] for n in names if not n.lower().endswith('.webp')}
+    sources, derived = [], {}
+    for name in sorted(names):
+        stem = os.path.splitext(name)[0]
+        path = os.path.join(directory, name)
+        if name.lower().endswith('.webp') and stem in stems:
+            derived[path] = stem
+        else:
+            sources.append(path)
+    thumbs = os.path.join(directory, THUMB_DIR_NAME)
+    if os.path.isdir(thumbs):
+        for name in sorted(os.listdir(thumbs)):
+            derived[os.path.join(thumbs, name)] = os.path.splitext(name)[0]
+    return sources, derived
+
+
+def source_references(src_dir):
+    """``{"logos": {filename}, "favicons": {filename}}`` named literally in the frontend sources."""
+    found = {"logos": set(), "favicons": set()}
+    if not src_dir or not os.path.isdir(src_dir):
+        return found
+    for root, _, files in os.walk(src_dir):
+        for name in files:
+            if not name.endswith(SOURCE_EXTENSIONS):
+                continue
+            with open(os.path.join(root, name), encoding='utf-8', errors='replace') as f:
+                for folder, filename in SOURCE_REFERENCE.findall(f.read()):
+                    found[folder.lower()].add(filename)
+    return found
+
+
+def frontend_name(platform_name):
+    """The name the frontend derives favicon paths from (``getFaviconPath`` in PlatformDetail.tsx)."""
+    return re.sub(r'[^a-z0-9]+', '_', platform_name.lower()).strip('_')
+
+
+def conventional_names(kind, platform_name):
+    """File stems the validator would give this platform's asset, or the frontend would load it by."""
+    prefix = "logo_" if kind == "logo" else "fav_"
+    return {prefix + safe_platform_name(platform_name), prefix + frontend_name(platform_name)}
+
+
+def _find_replacement(kind, platform_name, value, by_name, by_stem):
+    """A file on disk the row probably meant: same name in another case or extension, or the conventional name."""
+    if value:
+        match = by_name.get(value.casefold()) or by_stem.get(os.path.splitext(value)[0].casefold())
+        if match:
+            return match
+    for stem in conventional_names(kind, platform_name):
+        match = by_stem.get(stem.casefold())
+        if match:
+            return match
+    return None
+
+
+def sweep(catalog, logo_dir=LOGO_DIR, favicon_dir=FAVICON_DIR, manifest=None,
+          src_dir=os.path.join(WORKSPACE_DIR, "src")):
+    """Check the catalog against the asset directories.
+
+    Returns a report dict with ``missing`` (rows whose file does not exist),
+    ``unscanned`` (rows naming an existing file the sweep does not cover: not
+    an image extension, or in a subdirectory), ``orphans`` (files nothing
+    refers to, by CSV value, literal source path or naming convention), ``duplicates`` (groups of byte-identical files), ``plan`` (the
+    actions that would fix them) and ``stats``.
+    """
+    start = time.perf_counter()
+    manifest = manifest or Manifest()
+    literal = source_references(src_dir)
+    names = catalog.column('Platform Name')
+    report = {"missing": [], "unscanned": [], "orphans": [], "duplicates": [], "plan": []}
+    kinds = [("logo", 'Logo', logo_dir, "logos"), ("favicon", favicon_column(catalog.columns), favicon_dir, "favicons")]
+    listings = [list_images(directory) for _, _, directory, _ in kinds]
+    # One scan over everything, so the manifest can forget files that are gone
+    scanned = manifest.scan([path for sources, derived in listings for path in sources + list(derived)])
+    for (kind, column, directory, folder), (sources, derived) in zip(kinds, listings):
+        by_name = {os.path.basename(p).casefold(): os.path.basename(p) for p in sources}
+        by_stem = {os.path.splitext(os.path.basename(p))[0].casefold(): os.path.basename(p) for p in sources}
+
+        referenced = set(literal[folder]) & set(by_name.values())
+        for pos, value in enumerate(catalog.column(column)):
+            value = value.strip()
+            if value and os.path.isfile(os.path.join(directory, value)):
+                referenced.add(value)
+                if os.path.join(directory, value) not in scanned:
+                    report["unscanned"].append({"row": pos, "platform": names[pos], "column": column, "file": value})
+                continue
+            replacement = _find_replacement(kind, names[pos], value, by_name, by_stem)
+            if value:
+                report["missing"].append({"row": pos, "platform": names[pos], "column": column, "file": value})
+            if replacement:
+                referenced.add(replacement)
+                report["plan"].append({"action": "relink", "row": pos, "platform": names[pos], "column": column,
+                                       "from": value, "to": replacement})
+            elif value:
+                report["plan"].append({"action": "refetch", "row": pos, "platform": names[pos], "column": column,
+                                       "file": value})
+
+        # Files named by convention are loaded without a CSV reference, so they are never orphans
+        conventional = {stem.casefold() for name in names for stem in conventional_names(kind, name)}
+        referenced.update(os.path.basename(p) for p in sources
+                          if os.path.splitext(os.path.basename(p))[0].casefold() in conventional)
+
+        referenced_hashes = {scanned[os.path.join(directory, name)][1]: name for name in referenced
+                             if os.path.join(directory, name) in scanned}
+        orphan_stems = set()
+        for path in sources:
+            name = os.path.basename(path)
+            if name in referenced:
+                continue
+            orphan_stems.add(os.path.splitext(name)[0])
+            twin = referenced_hashes.get(scanned[path][1])
+            reason = f"identical to {twin}" if twin else "not referenced"
+            report["orphans"].append({"kind": kind, "path": path, "bytes": scanned[path][0]})
+            report["plan"].append({"action": "delete", "path": path, "reason": reason})
+        live_stems = {os.path.splitext(name)[0] for name in referenced}
+        for path, stem in derived.items():
+            if stem not in live_stems:
+                reason = "derived from an orphan" if stem in orphan_stems else "source image is gone"
+                report["orphans"].append({"kind": kind, "path": path, "bytes": scanned[path][0]})
+                report["plan"].append({"action": "delete", "path": path, "reason": reason})
+
+    by_hash = {}
+    for path, (_, sha) in scanned.items():
+        if os.path.basename(os.path.dirname(path)) != THUMB_DIR_NAME:
+            by_hash.setdefault(sha, []).append(path)
+    report["duplicates"] = sorted(sorted(paths) for paths in by_hash.values() if len(paths) > 1)
+    report["stats"] = {"files": len(scanned), "bytes": sum(size for size, _ in scanned.values()),
+                       "rehashed": manifest.rehashed,
+                       "elapsed_s": time.perf_counter() - start}
+    return report
+
+
+def apply_plan(catalog, plan):
+    """Carry out the relink and delete actions. Returns ``(relinked, deleted)``."""
+    relinked = deleted = 0
+    with catalog.batch():
+        for action in plan:
+            if action["action"] == "relink":
+                catalog.set(action["row"], action["column"], action["to"])
+                relinked += 1
+    for action in plan:
+        if action["action"] == "delete" and os.path.exists(action["path"]):
+            os.remove(action["path"])
+            deleted += 1
+    return relinked, deleted
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find missing, orphaned and duplicate logos and favicons")
+    parser.add_argument("--csv", default=CSV_FILE, help="CSV file (default: %(default)s)")
+    parser.add_argument("--store", help="SQLite working store to use instead of the CSV, if it exists")
+    parser.add_argument("--logo-dir", default=LOGO_DIR)
+    parser.add_argument("--favicon-dir", default=FAVICON_DIR)
+    parser.add_argument("--src-dir", default=os.path.join(WORKSPACE_DIR, "src"),
+                        help="Frontend sources searched for literal asset paths (default: %(default)s)")
+    parser.add_argument("--manifest", default=os.path.join(CACHE_DIR, "assets.sqlite"))
+    parser.add_argument("--plan", help="Write the report and fix plan to this JSON file")
+    parser.add_argument("--apply", action="store_true", help="Relink rows and delete orphaned files")
+    args = parser.parse_args(argv)
+
+    catalog = open_catalog(args.csv, args.store)
+    manifest = Manifest(args.manifest)
+    try:
+        report = sweep(catalog, args.logo_dir, args.favicon_dir, manifest, args.src_dir)
+        for item in report["missing"]:
+            print(f"missing: row {item['row'] + 1} {item['platform']!r} {item['column']} -> {item['file']}")
+        for item in report["unscanned"]:
+            print(f"not checked: row {item['row'] + 1} {item['platform']!r} {item['column']} -> {item['file']}")
+        for item in report["orphans"]:
+            print(f"orphan: {os.path.relpath(item['path'], os.path.dirname(args.logo_dir))}")
+        for paths in report["duplicates"]:
+            print(f"identical: {', '.join(os.path.basename(p) for p in paths)}")
+        counts = {}
+        for action in report["plan"]:
+            counts[action["action"]] = counts.get(action["action"], 0) + 1
+        stats = report["stats"]
+        print(f"{stats['files']} files ({stats['bytes'] / 1024 / 1024:.1f} MB), {stats['rehashed']} hashed, "
+              f"{stats['elapsed_s'] * 1000:.0f} ms: {len(report['missing'])} missing, "
+              f"{len(report['orphans'])} orphaned, {len(report['duplicates'])} duplicate groups")
+        print("Plan: " + (', '.join(f"{n} {action}" for action, n in sorted(counts.items())) or "nothing to do"))
+        if args.plan:
+            with open(args.plan, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+        if args.apply:
+            relinked, deleted = apply_plan(catalog, report["plan"])
+            print(f"Relinked {relinked} rows, deleted {deleted} files")
+    finally:
+        manifest.close()
+        catalog.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,468 @@
+"""In-memory working copy of ref_links.csv with row-level dirty tracking.
+
+The CSV is parsed once into plain lists; `Catalog.df` builds a DataFrame view
+only when a caller asks for one, so opening a catalog does not import pandas.
+Edits go through `Catalog.set`, which marks the row dirty; `flush`
+re-serializes only the dirty rows, copies every other record verbatim from the
+text it was read from, and swaps the result into place with an atomic
+write-and-rename. Wrap several edits in ``with catalog.batch():`` to
+write them in one go.
+
+Rows are addressed by position, and also by a stable key built from the
+normalized platform name and website (`Catalog.row_key`). Keys are kept in a
+dict index, so `locate` is O(1). A key still finds its row after the rows
+are reordered. `reflinks.store.StoreCatalog` offers the same interface on top
+of a SQLite working store.
+
+Other programs write ref_links.csv too (backend/scripts/updateCSV.js). Every
+write holds the advisory lock file ``ref_links.csv.lock`` (`file_lock`), and
+the catalog remembers the size and mtime of the file as it last read or wrote
+it. If the file changed in between, `flush` first reloads it and re-applies
+the catalog's own edits field by field: a field only someone else changed
+takes their value, a field only this catalog changed keeps ours, and a field
+both changed differently keeps ours and is reported in `Catalog.conflicts`.
+`sync` does the same merge on demand, e.g. when a file watcher fires, and
+returns the conflicts instead.
+"""
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+
+from reflinks import metrics
+
+KEY_COLUMNS = ('Platform Name', 'Official Website')
+LOCK_TIMEOUT = 10
+# A lock file older than this was left behind by a writer that crashed
+LOCK_STALE = 60
+
+
+class LockTimeout(Exception):
+    pass
+
+
+def is_missing(value):
+    # None or NaN, checked without importing pandas
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def normalize_name(name):
+    if is_missing(name):
+        return ''
+    return ' '.join(str(name).split()).casefold()
+
+
+def normalize_website(url):
+    if is_missing(url):
+        return ''
+    url = str(url).strip().casefold()
+    for prefix in ('https://', 'http://'):
+        if url.startswith(prefix):
+            url = url[len(prefix):]
+    if url.startswith('www.'):
+        url = url[4:]
+    return url.rstrip('/')
+
+
+def _read_records(text):
+    """Split CSV text into ``(header, rows, raw_records)``.
+
+    ``raw_records[i]`` is the exact source text of ``rows[i]``, including its
+    line terminator, so untouched rows can be written back unchanged.
+    """
+    lines = text.splitlines(keepends=True)
+    reader = csv.reader(lines)
+    records, raw = [], []
+    start = 0
+    for record in reader:
+        records.append(record)
+        raw.append(''.join(lines[start:reader.line_num]))
+        start = reader.line_num
+    if not records:
+        return [], [], [], ''
+    return records[0], records[1:], raw[1:], raw[0]
+
+
+def read_csv(path):
+    """Parse a CSV file into ``(header, rows, raw_records, raw_header, lineterminator)``.
+
+    Short rows are padded and long rows truncated to the header width.
+    """
+    with open(path, newline='', encoding='utf-8') as f:
+        text = f.read()
+    header, rows, raw, raw_header = _read_records(text)
+    lineterminator = '\r\n' if raw_header.endswith('\r\n') else '\n'
+    if raw and not raw[-1].endswith('\n'):
+        raw[-1] += lineterminator
+    width = len(header)
+    rows = [row + [''] * (width - len(row)) if len(row) < width else row[:width] for row in rows]
+    return header, rows, raw, raw_header, lineterminator
+
+
+def to_text(value):
+    return '' if is_missing(value) else str(value)
+
+
+def write_atomic(path, header, records):
+    """Write `header` and the `records` strings to `path` via a temp file and rename."""
+    fd, tmp_path = tempfile.mkstemp(prefix='.ref_links.', suffix='.tmp', dir=os.path.dirname(path) or '.')
+    try:
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+        with os.fdopen(fd, 'w', newline='', encoding='utf-8') as f:
+            f.write(header)
+            f.writelines(records)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def serialize_record(values, lineterminator):
+    buf = io.StringIO()
+    csv.writer(buf, lineterminator=lineterminator).writerow(values)
+    return buf.getvalue()
+
+
+def parse_record(raw):
+    """The values of one raw CSV record."""
+    return next(csv.reader(raw.splitlines(keepends=True)), [])
+
+
+@contextmanager
+def file_lock(path, timeout=LOCK_TIMEOUT, stale=LOCK_STALE):
+    """Hold the advisory lock ``<path>.lock`` for the duration of the block.
+
+    The lock is a file created exclusively (O_EXCL), which works the same from
+    Python and Node and on every platform. A lock file older than `stale`
+    seconds is taken over; raises `LockTimeout` after `timeout` seconds.
+    """
+    lock_path = f"{path}.lock"
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                age = time.time() - os.stat(lock_path).st_mtime
+            except FileNotFoundError:
+                continue
+            if age > stale:
+                try:
+                    os.remove(lock_path)
+                except FileNotFoundError:
+                    pass
+                continue
+            if time.monotonic() > deadline:
+                raise LockTimeout(f"{lock_path} is held by another writer")
+            time.sleep(0.05)
+            continue
+        with os.fdopen(fd, 'w') as f:
+            json.dump({"pid": os.getpid(), "owner": "reflinks", "time": time.time()}, f)
+        break
+    try:
+        yield
+    finally:
+        try:
+            os.remove(lock_path)
+        except FileNotFoundError:
+            pass
+
+
+def row_keys(names, websites):
+    """Row keys ``(name, website, n)`` for parallel lists, as `Catalog.row_key` builds them."""
+    seen, keys = {}, []
+    for name, site in zip(names, websites):
+        key = (normalize_name(name), normalize_website(site))
+        n = seen.get(key, 0)
+        seen[key] = n + 1
+        keys.append(key + (n,))
+    return keys
+
+
+class Catalog:
+    def __init__(self, path):
+        self.path = path
+        self.conflicts = []
+        with metrics.span("catalog.load", kind=type(self).__name__) as span:
+            self.load()
+            span["rows"] = len(self)
+
+    def load(self):
+        self._version = self._disk_version()
+        header, self._rows, self._raw, _, self.lineterminator = read_csv(self.path)
+        self._columns = list(header)
+        self._positions = {}
+        for i, column in enumerate(header):
+            self._positions.setdefault(column, i)
+        self._header = list(header)
+        self._df = None
+        self._dirty = set()
+        self._batch_depth = 0
+        self._build_index()
+
+    def _build_index(self):
+        by_name, by_key = {}, {}
+        names = self.column('Platform Name')
+        sites = self.column('Official Website')
+        for pos, (name, site) in enumerate(zip(names, sites)):
+            name = normalize_name(name)
+            by_name.setdefault(name, []).append(pos)
+            by_key.setdefault((name, normalize_website(site)), []).append(pos)
+        self._by_name = by_name
+        self._by_key = by_key
+        self._index_stale = False
+
+    def _index(self):
+        if self._index_stale:
+            self._build_index()
+        return self._by_name, self._by_key
+
+    def row_key(self, idx):
+        """Stable key for a row: ``(name, website, n)``, n telling exact duplicates apart."""
+        name = normalize_name(self.get(idx, 'Platform Name'))
+        site = normalize_website(self.get(idx, 'Official Website'))
+        positions = self._index()[1].get((name, site), [idx])
+        return name, site, positions.index(idx) if idx in positions else 0
+
+    def locate(self, key, hint=None):
+        """Return the position of the row with `key`, or None if it is gone.
+
+        A duplicate counter past the remaining duplicates also gives None: one of
+        them was removed, and guessing which is left could edit the wrong row.
+        """
+        positions = self._index()[1].get(key[:2])
+        if not positions:
+            return None
+        if hint in positions and self.row_key(hint) == key:
+            return hint
+        return positions[key[2]] if key[2] < len(positions) else None
+
+    def rows_named(self, platform_name):
+        return list(self._index()[0].get(normalize_name(platform_name), []))
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def df(self):
+        """The catalog as a DataFrame of strings, built on first access and kept in step with edits."""
+        if self._df is None:
+            import pandas as pd
+            self._df = pd.DataFrame(self._rows, columns=self._columns, dtype=object)
+        return self._df
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    def column(self, column):
+        """All values of `column` in row order ('' for every row if it does not exist)."""
+        if column not in self._positions:
+            return [''] * len(self)
+        i = self._positions[column]
+        return [row[i] for row in self._rows]
+
+    def row(self, idx):
+        """The row at position `idx` as a dict keyed by column name."""
+        return dict(zip(self._columns, self._rows[idx]))
+
+    @property
+    def dirty(self):
+        return bool(self._dirty) or self._columns != self._header
+
+    def ensure_column(self, column, default=''):
+        if column in self._positions:
+            return
+        self._positions[column] = len(self._columns)
+        self._columns.append(column)
+        for row in self._rows:
+            row.append(default)
+        if self._df is not None:
+            self._df[column] = default
+            self._df[column] = self._df[column].astype(object)
+
+    def rename_column(self, old, new):
+        if old not in self._positions or new in self._positions:
+            raise KeyError(f"Cannot rename column {old!r} to {new!r}")
+        self._columns[self._positions[old]] = new
+        self._positions[new] = self._positions.pop(old)
+        if self._df is not None:
+            self._df.rename(columns={old: new}, inplace=True)
+
+    def drop_column(self, column):
+        if column not in self._positions:
+            return
+        i = self._positions[column]
+        del self._columns[i]
+        for row in self._rows:
+            del row[i]
+        self._positions = {}
+        for j, name in enumerate(self._columns):
+            self._positions.setdefault(name, j)
+        if self._df is not None:
+            del self._df[column]
+
+    def get(self, idx, column, default=''):
+        if column not in self._positions:
+            return default
+        return self._rows[idx][self._positions[column]]
+
+    def set(self, idx, column, value):
+        """Set one field; the row is written on the next flush."""
+        self._assign(idx, column, value)
+        if not self._batch_depth:
+            self.flush()
+
+    def _assign(self, idx, column, value):
+        self.ensure_column(column)
+        value = to_text(value)
+        row = self._rows[idx]
+        i = self._positions[column]
+        if row[i] != value:
+            row[i] = value
+            if self._df is not None:
+                self._df.at[idx, column] = value
+            self._dirty.add(idx)
+            if column in KEY_COLUMNS:
+                self._index_stale = True
+
+    def update(self, idx, values):
+        with self.batch():
+            for column, value in values.items():
+                self.set(idx, column, value)
+
+    @contextmanager
+    def batch(self):
+        """Defer flushing until the outermost batch exits."""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+        if not self._batch_depth:
+            self.flush()
+
+    def _disk_version(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def changed_on_disk(self):
+        """True if the CSV was rewritten by someone else since this catalog last read or wrote it."""
+        return self._disk_version() != self._version
+
+    def _edited(self):
+        """Positions of the rows with edits the CSV does not have yet."""
+        return sorted(self._dirty)
+
+    def _base_record(self, pos):
+        """The CSV text row `pos` was last read or written as; empty for a row only this catalog has."""
+        return self._raw[pos]
+
+    def _append_row(self, values):
+        self._rows.append(list(values))
+        self._raw.append('')
+        self._dirty.add(len(self._rows) - 1)
+        self._index_stale = True
+        return len(self._rows) - 1
+
+    def _reload(self):
+        self.load()
+
+    def local_edits(self):
+        """``{pos: {column: (base, ours)}}`` for every field that differs from the CSV as last read or written."""
+        header = {column: i for i, column in reversed(list(enumerate(self._header)))}
+        edits = {}
+        for pos in self._edited():
+            raw = self._base_record(pos)
+            base = parse_record(raw) if raw else []
+            fields = {}
+            for column, value in self.row(pos).items():
+                i = header.get(column)
+                old = base[i] if i is not None and i < len(base) else ''
+                if value != old:
+                    fields[column] = (old, value)
+            if fields:
+                edits[pos] = fields
+        return edits
+
+    def _merge_from_disk(self):
+        """Reload the CSV and re-apply this catalog's edits on top of it. Returns the conflicts."""
+        edits = self.local_edits()
+        local_only = {pos for pos in edits if not self._base_record(pos)}
+        added = [column for column in self._columns if column not in self._header]
+        names, sites = self.column('Platform Name'), self.column('Official Website')
+        ours = {pos: self.row(pos) for pos in edits}
+        for pos, fields in edits.items():
+            # Rows are matched on their key as it was before our edits
+            names[pos] = fields.get('Platform Name', (names[pos],))[0]
+            sites[pos] = fields.get('Official Website', (sites[pos],))[0]
+        base_keys = row_keys(names, sites)
+        depth = self._batch_depth
+        self._reload()
+        self._batch_depth = depth
+        for column in added:
+            self.ensure_column(column)
+        theirs = {key: pos for pos, key in enumerate(row_keys(self.column('Platform Name'),
+                                                              self.column('Official Website')))}
+        conflicts = []
+        for pos, fields in edits.items():
+            target = None if pos in local_only else theirs.get(base_keys[pos])
+            if target is None:
+                # Removed (or renamed) by the other writer; keep our version as a row of its own
+                target = self._append_row([ours[pos].get(column, '') for column in self._columns])
+                if pos not in local_only:
+                    conflicts.append({"row": target, "platform": ours[pos].get('Platform Name', ''),
+                                      "column": None, "base": None, "ours": None, "theirs": None})
+                continue
+            for column, (base, value) in fields.items():
+                current = self.get(target, column)
+                if current not in (base, value):
+                    conflicts.append({"row": target, "platform": self.get(target, 'Platform Name'),
+                                      "column": column, "base": base, "ours": value, "theirs": current})
+                self._assign(target, column, value)
+        return conflicts
+
+    def sync(self):
+        """Merge changes another writer made to the CSV.
+
+        Returns None if the file is unchanged, otherwise the list of conflicts
+        (empty when the merge was clean).
+        """
+        if not self.changed_on_disk():
+            return None
+        with file_lock(self.path):
+            return self._merge_from_disk()
+
+    def flush(self):
+        """Write pending edits, merging first if the file changed on disk. Returns the number of rows re-serialized."""
+        if not self._dirty and self._columns == self._header:
+            return 0
+        with file_lock(self.path):
+            if self.changed_on_disk():
+                self.conflicts.extend(self._merge_from_disk())
+            columns = list(self._columns)
+            schema_changed = columns != self._header
+            rewrite = range(len(self._rows)) if schema_changed else sorted(self._dirty)
+            with metrics.span("catalog.save", rows=len(rewrite)):
+                for pos in rewrite:
+                    self._raw[pos] = serialize_record(self._rows[pos], self.lineterminator)
+                write_atomic(self.path, serialize_record(columns, self.lineterminator), self._raw)
+            self._version = self._disk_version()
+        written = len(rewrite)
+        self._header = columns
+        self._dirty.clear()
+        return written
+
+    def close(self):
+        self.flush()
@@ -0,0 +1,209 @@
+"""Bulk clean-up and validation of ref_links.csv.
+
+Applies the rules the validator uses when it saves a row to every row at
+once, with pandas string operations instead of a Python loop per field:
+
+- surrounding whitespace, ``nan`` placeholders and wrapping quotes are removed
+  from every cell;
+- Features and capsules become a plain comma list (no quotes, no empty tags);
+- misspelled column names (``favicon``) are folded into the canonical column.
+
+Each rule reports how many cells it changed; the fixes are then written in a
+single pass. `CHECKS` are only reported, never fixed, because fixing them
+would drop data: more than `MAX_CAPSULES` capsules (the number the frontend
+shows) needs someone to pick which ones to keep. With ``--check`` nothing is
+written and the exit code is 1 when anything would change; `CHECKS` are only
+warnings there, so the pre-commit hook does not block on a manual edit:
+
+    python -m reflinks.clean --check
+    python -m reflinks.clean
+"""
+import argparse
+import re
+import sys
+
+from reflinks.catalog import to_text
+from reflinks.config import CSV_FILE
+from reflinks.store import open_catalog
+
+MAX_CAPSULES = 3
+TAG_COLUMNS = ('Features', 'capsules')
+# lower-case alias -> canonical column name
+COLUMN_ALIASES = {'favicon': 'Favicon'}
+MISSING_MARKERS = ('nan',)
+
+QUOTED = re.compile(r'^"(.*)"$', re.S)
+TAG_QUOTES = re.compile(r'["\']')
+TAG_SEPARATOR = re.compile(r'\s*,[\s,]*')
+
+
+def clean_value(value):
+    """Scalar version of the per-cell rules, for single edits."""
+    value = to_text(value).strip()
+    if value.lower() in MISSING_MARKERS:
+        return ''
+    return QUOTED.sub(r'\1', value)
+
+
+def clean_tags(value):
+    """Scalar version of the tag rules: ``' "a" , b,,c'`` -> ``'a,b,c'``."""
+    return TAG_SEPARATOR.sub(',', TAG_QUOTES.sub('', clean_value(value))).strip(', ')
+
+
+def tag_count(value):
+    return len(value.split(',')) if value else 0
+
+
+def _strip(s):
+    return s.str.strip()
+
+
+def _missing(s):
+    return s.mask(s.str.lower().isin(MISSING_MARKERS), '')
+
+
+def _quotes(s):
+    return s.str.replace(QUOTED, r'\1', regex=True)
+
+
+def _tags(s):
+    return s.str.replace(TAG_QUOTES, '', regex=True).str.replace(TAG_SEPARATOR, ',', regex=True).str.strip(', ')
+
+
+def _too_many_capsules(s):
+    return s.str.count(',').where(s != '', -1) >= MAX_CAPSULES
+
+
+# (rule, description, columns or None for all, Series -> Series)
+RULES = [
+    ("whitespace", "surrounding whitespace", None, _strip),
+    ("missing", "'nan' placeholder instead of an empty cell", None, _missing),
+    ("quotes", "value wrapped in quotes", None, _quotes),
+    ("tags", "tag list with quotes, spaces or empty tags", TAG_COLUMNS, _tags),
+]
+# Reported but not fixed: (rule, description, columns, Series -> boolean mask of bad cells)
+CHECKS = [
+    ("capsule_limit", f"more than {MAX_CAPSULES} capsules, edit by hand", ('capsules',), _too_many_capsules),
+]
+
+
+def column_renames(columns):
+    """``[(alias, canonical)]`` for the misspelled columns present in `columns`."""
+    return [(column, COLUMN_ALIASES[column]) for column in columns if column in COLUMN_ALIASES]
+
+
+def reconcile_columns(catalog):
+    """Fold alias columns into their canonical column. Returns the number of values moved."""
+    moved = 0
+    for alias, canonical in column_renames(catalog.columns):
+        if canonical not in catalog.columns:
+            catalog.rename_column(alias, canonical)
+            continue
+        # Both exist: the canonical value wins, the alias fills its gaps
+        for pos, value in enumerate(catalog.column(alias)):
+            if value and not catalog.get(pos, canonical):
+                catalog.set(pos, canonical, value)
+                moved += 1
+        catalog.drop_column(alias)
+    return moved
+
+
+def find_violations(df):
+    """Run `RULES` over a DataFrame of strings.
+
+    Returns ``(cleaned, violations)``; ``violations`` maps each rule to a list
+    of ``(row, column)`` cells it changed, and each of `CHECKS` to the cells
+    it flagged (left as they are in ``cleaned``).
+    """
+    cleaned = df.fillna('').astype(str)
+    violations = {}
+    for rule, _, columns, func in RULES:
+        for column in columns or cleaned.columns:
+            if column not in cleaned.columns:
+                continue
+            before = cleaned[column]
+            after = func(before)
+            changed = (after != before).to_numpy().nonzero()[0]
+            if len(changed):
+                violations.setdefault(rule, []).extend((int(pos), column) for pos in changed)
+                cleaned[column] = after
+    for rule, _, columns, func in CHECKS:
+        for column in columns:
+            if column in cleaned.columns:
+                flagged = func(cleaned[column]).to_numpy().nonzero()[0]
+                if len(flagged):
+                    violations.setdefault(rule, []).extend((int(pos), column) for pos in flagged)
+    return cleaned, violations
+
+
+def fixable(violations):
+    """The cells `clean_catalog` fixes, out of `find_violations`' result."""
+    return sorted({cell for rule, _, _, _ in RULES for cell in violations.get(rule, [])})
+
+
+def manual(violations):
+    """The cells flagged by `CHECKS`, which need a manual edit."""
+    return sorted({cell for rule, _, _, _ in CHECKS for cell in violations.get(rule, [])})
+
+
+def clean_catalog(catalog, write=True):
+    """Validate and (with `write`) fix the whole catalog in one write.
+
+    Returns ``(violations, renames)``.
+    """
+    renames = column_renames(catalog.columns)
+    df = catalog.df
+    if renames:
+        # Validate the values as they will be after the columns are merged
+        df = df.drop(columns=[alias for alias, _ in renames])
+    cleaned, violations = find_violations(df)
+    cells = fixable(violations)
+    if write and (cells or renames):
+        with catalog.batch():
+            reconcile_columns(catalog)
+            for pos, column in cells:
+                catalog.set(pos, column, cleaned.at[pos, column])
+    return violations, renames
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clean and validate every row of ref_links.csv")
+    parser.add_argument("--csv", default=CSV_FILE, help="CSV file (default: %(default)s)")
+    parser.add_argument("--store", help="SQLite working store to use instead of the CSV, if it exists")
+    parser.add_argument("--check", action="store_true", help="Only report; exit 1 if any cell needs cleaning")
+    parser.add_argument("--show", type=int, default=5, metavar="N", help="Example rows to print per rule")
+    args = parser.parse_args(argv)
+
+    catalog = open_catalog(args.csv, args.store)
+    try:
+        violations, renames = clean_catalog(catalog, write=not args.check)
+        names = catalog.column('Platform Name')
+        for alias, canonical in renames:
+            print(f"column '{alias}' should be '{canonical}'")
+        for rule, description, _, _ in RULES + CHECKS:
+            cells = violations.get(rule)
+            if not cells:
+                continue
+            print(f"{rule}: {len(cells)} cells ({description})")
+            for pos, column in cells[:args.show]:
+                print(f"  row {pos + 1} {names[pos]!r}: {column}")
+        total, by_hand = len(fixable(violations)), len(manual(violations))
+        if not total and not renames and not by_hand:
+            print(f"{len(catalog)} rows clean")
+            return 0
+        if total or renames:
+            if args.check:
+                print(f"{total} cells need cleaning; run `python -m reflinks.clean` to fix them")
+            else:
+                print(f"Fixed {total} cells in {len(catalog)} rows")
+        if by_hand:
+            print(f"warning: {by_hand} cells need a manual edit")
+        if args.check and (total or renames):
+            return 1
+    finally:
+        catalog.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
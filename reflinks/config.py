@@ -0,0 +1,17 @@
+import os
+
+# REFLINKS_WORKSPACE points the tools at another checkout, e.g. a benchmark fixture
+WORKSPACE_DIR = os.environ.get("REFLINKS_WORKSPACE", r"C:\Users\alexa\Downloads\crypto-glass-beacon-66-main")
+CSV_FILE = os.path.join(WORKSPACE_DIR, "public", "ref_links.csv")
+LOGO_DIR = os.path.join(WORKSPACE_DIR, "public", "logos")
+FAVICON_DIR = os.path.join(WORKSPACE_DIR, "public", "favicons")
+# Generated sprite sheets and their offset map, served by the frontend
+SPRITE_DIR = os.path.join(WORKSPACE_DIR, "public", "sprites")
+STORE_FILE = os.path.join(WORKSPACE_DIR, "ref_links.db")
+# Per-row results of the validator's checks (link health, ...), kept out of the CSV
+STATE_FILE = os.path.join(WORKSPACE_DIR, "ref_links_state.db")
+CACHE_DIR = os.path.join(WORKSPACE_DIR, ".cache")
+
+
+def safe_platform_name(name):
+    return "".join(c if c.isalnum() else "_" for c in name)
@@ -0,0 +1,256 @@
+"""Refresh the ``currentDeals`` column from each row's ``scraping_page``.
+
+Every distinct scraping page is fetched concurrently through
+`reflinks.net.run_all` with a caching session, so a page that sends
+ETag / Last-Modified is revalidated and comes back as a 304. The SHA-256 of
+each page body is kept in the state database. A page whose hash has not
+changed since the last refresh is not parsed again.
+
+The offer is extracted with a CSS selector configured for the platform (by
+platform name or host, in ``deal_selectors.json``), falling back to the page
+description and the first heading or paragraph that reads like a sign-up
+offer. The deal text goes to ``currentDeals``; the time of the check stays in
+the state database, next to the page hash, so the frontend CSV gains no column:
+
+    python -m reflinks.deals
+    python -m reflinks.deals --platform Bitget --force
+    python -m reflinks.deals --base-url http://127.0.0.1:8000  # fixture server
+
+With ``--base-url`` every page is requested as ``<base-url>/<host>/<path>``,
+which lets a local HTTP server stand in for the real sites.
+"""
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from urllib.parse import urlparse
+
+from reflinks.catalog import normalize_name
+from reflinks.config import CSV_FILE, STATE_FILE, WORKSPACE_DIR
+from reflinks.http_cache import make_cached_session
+from reflinks.net import host_of, normalize_url, run_all
+from reflinks.store import open_catalog
+
+# bs4 is only imported when a page actually has to be parsed
+BEAUTIFULSOUP_AVAILABLE = importlib.util.find_spec("bs4") is not None
+SELECTORS_FILE = os.path.join(WORKSPACE_DIR, "deal_selectors.json")
+DEAL_COLUMN = 'currentDeals'
+MAX_DEAL_LENGTH = 200
+OFFER_PATTERN = re.compile(
+    r'\b(bonus|reward|rebate|cashback|welcome|free|discount|off|up to|earn|get|gift|voucher|commission)\b'
+    r'|\$\s?\d|\d+\s?%|\d[\d,.]*\s?(usdt|usdc|btc|eth|sol)\b',
+    re.I,
+)
+CANDIDATE_TAGS = ('h1', 'h2', 'h3', 'p', 'li', 'strong')
+
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+NO_DEAL = "no_deal"
+ERROR = "error"
+
+
+def load_selectors(path=SELECTORS_FILE):
+    """``{key: [css selector]}`` keyed by normalized platform name or host; empty without a file."""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        raw = json.load(f)
+    selectors = {}
+    for key, value in raw.items():
+        key = key.lower() if '.' in key else normalize_name(key)
+        selectors[key] = [value] if isinstance(value, str) else list(value)
+    return selectors
+
+
+def selectors_for(selectors, platform_name, url):
+    host = host_of(url)
+    return (selectors.get(normalize_name(platform_name)) or selectors.get(host)
+            or selectors.get(host[4:] if host.startswith('www.') else host) or [])
+
+
+def rebase(url, base_url):
+    """Point `url` at a stand-in server: ``https://a.com/x?y`` -> ``<base_url>/a.com/x?y``."""
+    if not base_url:
+        return url
+    parts = urlparse(normalize_url(url))
+    path = parts.path or '/'
+    return f"{base_url.rstrip('/')}/{parts.netloc}{path}" + (f"?{parts.query}" if parts.query else '')
+
+
+def _clean(text):
+    text = ' '.join(text.split())
+    if len(text) > MAX_DEAL_LENGTH:
+        text = text[:MAX_DEAL_LENGTH - 1].rsplit(' ', 1)[0] + '…'
+    return text
+
+
+def extract_deal(html, selectors=()):
+    """The sign-up offer on a page, or ``''`` if nothing looks like one."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup(['script', 'style', 'noscript', 'template']):
+        tag.decompose()
+    for selector in selectors:
+        element = soup.select_one(selector)
+        if element is not None:
+            text = _clean(element.get_text(' '))
+            if text:
+                return text
+    for attrs in ({'property': 'og:description'}, {'name': 'description'}):
+        meta = soup.find('meta', attrs=attrs)
+        if meta and meta.get('content') and OFFER_PATTERN.search(meta['content']):
+            return _clean(meta['content'])
+    for element in soup.find_all(CANDIDATE_TAGS):
+        text = _clean(element.get_text(' '))
+        if 12 <= len(text) and OFFER_PATTERN.search(text):
+            return text
+    return ''
+
+
+class DealState:
+    """Last fetched page hash and extracted deal per row, keyed by the catalog row key."""
+
+    def __init__(self, path=STATE_FILE):
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS deals ("
+            " name TEXT, website TEXT, url TEXT, content_hash TEXT, deal TEXT, status TEXT, error TEXT,"
+            " checked_at REAL, changed_at REAL, PRIMARY KEY (name, website))"
+        )
+        self._db.commit()
+
+    def get(self, key):
+        row = self._db.execute(
+            "SELECT url, content_hash, deal, status, error, checked_at, changed_at FROM deals"
+            " WHERE name = ? AND website = ?", (key[0], key[1]),
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("url", "content_hash", "deal", "status", "error", "checked_at", "changed_at"), row))
+
+    def record_many(self, entries):
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO deals VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(key[0], key[1], r["url"], r["content_hash"], r["deal"], r["status"], r["error"],
+                  r["checked_at"], r["changed_at"]) for key, r in entries],
+            )
+
+    def close(self):
+        self._db.close()
+
+
+def fetch_page(session, url, timeout=10):
+    """``(body, content_hash, from_cache)`` for a page; raises on HTTP errors."""
+    r = session.get(url, timeout=timeout)
+    r.raise_for_status()
+    return r.content, hashlib.sha256(r.content).hexdigest(), getattr(r, 'from_cache', False)
+
+
+def refresh(catalog, state, session=None, selectors=None, positions=None, force=False, base_url=None,
+            workers=16, per_host=2, host_interval=0.2, timeout=10, deadline=None):
+    """Fetch the scraping pages of `positions` (default: all rows) and update the catalog.
+
+    Returns ``([result], elapsed)`` with one result dict per row that has a
+    scraping page. Only rows whose page yields a new deal are written.
+    """
+    if session is None:
+        session = make_cached_session(workers)
+    selectors = load_selectors() if selectors is None else selectors
+    rows = {}
+    for pos in (range(len(catalog)) if positions is None else positions):
+        page = str(catalog.get(pos, 'scraping_page')).strip()
+        if page.startswith(('http://', 'https://')):
+            rows[pos] = page
+    urls = list(dict.fromkeys(rows.values()))
+    fetched, elapsed = run_all(urls, lambda url: fetch_page(session, rebase(url, base_url), timeout),
+                               key=lambda url: host_of(rebase(url, base_url)), workers=workers,
+                               per_host=per_host, deadline=deadline, host_interval=host_interval)
+    pages = dict(zip(urls, fetched))
+
+    now = time.time()
+    results, records = [], []
+    with catalog.batch():
+        for pos, url in sorted(rows.items()):
+            key = catalog.row_key(pos)
+            name = catalog.get(pos, 'Platform Name')
+            previous = state.get(key) or {}
+            ok, value = pages[url]
+            result = {"row": pos, "platform": name, "url": url, "deal": previous.get("deal") or '',
+                      "content_hash": previous.get("content_hash"), "error": None, "checked_at": now,
+                      "changed_at": previous.get("changed_at"), "from_cache": False}
+            if not ok:
+                result.update(status=ERROR, error=str(value) or type(value).__name__)
+            else:
+                body, content_hash, result["from_cache"] = value
+                same_page = content_hash == previous.get("content_hash") and url == previous.get("url")
+                if same_page and not force:
+                    result["status"] = UNCHANGED
+                else:
+                    deal = extract_deal(body, selectors_for(selectors, name, url))
+                    result.update(content_hash=content_hash, changed_at=now)
+                    if deal:
+                        result.update(status=UPDATED, deal=deal)
+                    else:
+                        result["status"] = NO_DEAL
+                if result["status"] == UPDATED:
+                    catalog.set(pos, DEAL_COLUMN, result["deal"])
+            results.append(result)
+            records.append((key, result))
+    state.record_many(records)
+    return results, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Refresh currentDeals from each row's scraping_page")
+    parser.add_argument("--csv", default=CSV_FILE, help="CSV file (default: %(default)s)")
+    parser.add_argument("--store", help="SQLite working store to use instead of the CSV, if it exists")
+    parser.add_argument("--state", default=STATE_FILE)
+    parser.add_argument("--selectors", default=SELECTORS_FILE,
+                        help="JSON file of CSS selectors by platform name or host (default: %(default)s)")
+    parser.add_argument("--platform", action="append", help="Only this platform (repeatable)")
+    parser.add_argument("--force", action="store_true", help="Parse pages even if they have not changed")
+    parser.add_argument("--base-url", help="Request every page from this server instead (e.g. a fixture server)")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--per-host", type=int, default=2, help="Concurrent requests per host (default: %(default)s)")
+    parser.add_argument("--timeout", type=float, default=10, help="Per-request timeout in seconds (default: %(default)s)")
+    parser.add_argument("--deadline", type=float, default=120, help="Overall time budget in seconds (default: %(default)s)")
+    parser.add_argument("--report", help="Write every result as JSON to this path")
+    args = parser.parse_args(argv)
+    if not BEAUTIFULSOUP_AVAILABLE:
+        parser.error("beautifulsoup4 is required: pip install beautifulsoup4")
+
+    catalog = open_catalog(args.csv, args.store)
+    state = DealState(args.state)
+    try:
+        positions = None
+        if args.platform:
+            positions = sorted({pos for name in args.platform for pos in catalog.rows_named(name)})
+        session = make_cached_session(args.workers)
+        results, elapsed = refresh(catalog, state, session, load_selectors(args.selectors), positions, args.force,
+                                   args.base_url, args.workers, args.per_host, timeout=args.timeout,
+                                   deadline=args.deadline)
+    finally:
+        state.close()
+        catalog.close()
+    counts = {}
+    for r in results:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+        if r["status"] != UNCHANGED:
+            detail = r["error"] if r["status"] == ERROR else r["deal"]
+            print(f"{r['status']:9} {r['platform']}: {detail}")
+    print(f"{len(results)} pages in {elapsed:.1f}s: "
+          + ', '.join(f"{n} {status}" for status, n in sorted(counts.items())) + f" ({session.cache.hits} not modified)")
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""Duplicate and near-duplicate platform detection.
+
+Names and websites are normalized ("Magic Eden" -> ``magiceden``,
+``https://wallet.coinbase.com/`` -> ``coinbase.com``) and every row is put
+into a few small blocks: its registrable domain, each name token and the
+first letters of its squashed name. Only rows sharing a block are compared,
+so the work grows with the block sizes rather than with all pairs; blocks
+larger than `MAX_BLOCK` (a token every other platform has) are skipped, and
+the summary says how many blocks and pairs that left out. Pairs scoring at
+least the threshold are joined into clusters:
+
+    python -m reflinks.dedupe
+    python -m reflinks.dedupe --threshold 0.9 --json duplicates.json
+"""
+import argparse
+import difflib
+import itertools
+import json
+import re
+import sys
+
+from reflinks.catalog import normalize_name, normalize_website
+from reflinks.config import CSV_FILE
+from reflinks.store import open_catalog
+
+DEFAULT_THRESHOLD = 0.8
+MAX_BLOCK = 50
+PREFIX_LENGTH = 5
+# Hosts shared by unrelated platforms: the first path segment identifies the platform
+SHARED_HOSTS = {"t.me", "x.com", "twitter.com", "github.com", "medium.com", "linktr.ee", "discord.gg"}
+# Second-level labels under which registrations happen (example.co.uk)
+SECOND_LEVEL = {"co", "com", "org", "net", "ac", "gov", "edu"}
+
+
+def squash(name):
+    """Name without case, spaces or punctuation: ``"Bullx Neo"`` -> ``"bullxneo"``."""
+    return re.sub(r'[\W_]+', '', normalize_name(name))
+
+
+def name_tokens(name):
+    return [t for t in re.split(r'[\W_]+', normalize_name(name)) if t]
+
+
+def site_domain(url):
+    """The registrable domain of a website, ``''`` if there is none."""
+    url = normalize_website(url)
+    if not url:
+        return ''
+    host, _, path = url.partition('/')
+    host = host.split(':')[0]
+    if host in SHARED_HOSTS:
+        segment = path.split('/')[0]
+        return f"{host}/{segment}" if segment else host
+    labels = host.split('.')
+    if len(labels) >= 3 and labels[-2] in SECOND_LEVEL and len(labels[-1]) == 2:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+
+class Record:
+    __slots__ = ("pos", "name", "website", "squashed", "tokens", "domain", "site")
+
+    def __init__(self, pos, name, website):
+        self.pos = pos
+        self.name = name
+        self.website = website
+        self.squashed = squash(name)
+        self.tokens = frozenset(name_tokens(name))
+        self.domain = site_domain(website)
+        self.site = normalize_website(website)
+
+
+def blocking_keys(record):
+    keys = set()
+    if record.domain:
+        keys.add("d:" + record.domain)
+    for token in record.tokens:
+        if len(token) >= 3:
+            keys.add("t:" + token)
+    if len(record.squashed) >= 3:
+        keys.add("p:" + record.squashed[:PREFIX_LENGTH])
+    return keys
+
+
+def build_blocks(records, max_block=MAX_BLOCK):
+    """``(blocks, skipped)``: ``{key: [record index]}`` for every block that has
+    something to compare, and ``{key: size}`` for the blocks over `max_block`."""
+    blocks = {}
+    for i, record in enumerate(records):
+        for key in blocking_keys(record):
+            blocks.setdefault(key, []).append(i)
+    skipped = {key: len(members) for key, members in blocks.items() if len(members) > max_block}
+    return {key: members for key, members in blocks.items() if 1 < len(members) <= max_block}, skipped
+
+
+def candidate_pairs(blocks):
+    pairs = set()
+    for members in blocks.values():
+        pairs.update(itertools.combinations(members, 2))
+    return pairs
+
+
+def name_similarity(a, b, threshold=DEFAULT_THRESHOLD):
+    """``(score, reason)`` for two records' names; 0 for anything below `threshold`."""
+    if not a.squashed or not b.squashed:
+        return 0.0, None
+    if a.squashed == b.squashed:
+        return 1.0, "same name"
+    short, long = sorted((a.squashed, b.squashed), key=len)
+    if (a.tokens < b.tokens or b.tokens < a.tokens) or (len(short) >= 4 and long.startswith(short)):
+        return 0.85, "name contained in the other"
+    # Cheap upper bound before the full sequence match
+    if 2 * len(short) / (len(short) + len(long)) < threshold:
+        return 0.0, None
+    ratio = difflib.SequenceMatcher(None, a.squashed, b.squashed).ratio()
+    if ratio < threshold:
+        return 0.0, None
+    return ratio, f"similar names ({ratio:.2f})"
+
+
+def score_pair(a, b, threshold=DEFAULT_THRESHOLD):
+    """``(score, reasons)`` for two records."""
+    reasons = []
+    score = 0.0
+    if a.site and a.site == b.site:
+        score = 1.0
+        reasons.append("same website")
+    elif a.domain and a.domain == b.domain:
+        score = 0.9
+        reasons.append(f"same domain {a.domain}")
+    similarity, reason = name_similarity(a, b, threshold)
+    if reason:
+        reasons.append(reason)
+    return max(score, similarity), reasons
+
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def find_clusters(names, websites, threshold=DEFAULT_THRESHOLD, max_block=MAX_BLOCK):
+    """Group rows that look like the same platform.
+
+    Returns ``(clusters, stats)``: each cluster is a dict with its row
+    positions and the matching pairs (``(pos_a, pos_b, score, reasons)``),
+    largest clusters first. ``stats["skipped_pairs"]`` counts the pairs of the
+    oversized blocks; some of them may still have been compared via another block.
+    """
+    records = [Record(pos, name, website) for pos, (name, website) in enumerate(zip(names, websites))]
+    blocks, skipped = build_blocks(records, max_block)
+    pairs = candidate_pairs(blocks)
+    parent = list(range(len(records)))
+    matches = []
+    for i, j in pairs:
+        score, reasons = score_pair(records[i], records[j], threshold)
+        if score >= threshold:
+            matches.append((i, j, score, reasons))
+            parent[_find(parent, i)] = _find(parent, j)
+    groups = {}
+    for i, j, score, reasons in matches:
+        groups.setdefault(_find(parent, i), []).append((records[i].pos, records[j].pos, score, reasons))
+    clusters = []
+    for found in groups.values():
+        rows = sorted({pos for a, b, _, _ in found for pos in (a, b)})
+        clusters.append({"rows": rows, "pairs": sorted(found)})
+    clusters.sort(key=lambda c: (-len(c["rows"]), c["rows"][0]))
+    stats = {"rows": len(records), "blocks": len(blocks), "comparisons": len(pairs), "matches": len(matches),
+             "skipped_blocks": len(skipped), "skipped_pairs": sum(n * (n - 1) // 2 for n in skipped.values())}
+    return clusters, stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find duplicate and near-duplicate platforms in ref_links.csv")
+    parser.add_argument("--csv", default=CSV_FILE, help="CSV file (default: %(default)s)")
+    parser.add_argument("--store", help="SQLite working store to use instead of the CSV, if it exists")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Minimum pair score, 0-1 (default: %(default)s)")
+    parser.add_argument("--max-block", type=int, default=MAX_BLOCK,
+                        help="Skip blocking keys shared by more rows than this (default: %(default)s)")
+    parser.add_argument("--json", help="Write the clusters to this path")
+    args = parser.parse_args(argv)
+
+    catalog = open_catalog(args.csv, args.store)
+    names = catalog.column('Platform Name')
+    websites = catalog.column('Official Website')
+    catalog.close()
+    clusters, stats = find_clusters(names, websites, args.threshold, args.max_block)
+
+    for n, cluster in enumerate(clusters, 1):
+        print(f"Cluster {n} ({len(cluster['rows'])} rows)")
+        for pos in cluster["rows"]:
+            print(f"  row {pos + 1:5}  {names[pos]}  {websites[pos]}")
+        for a, b, score, reasons in cluster["pairs"]:
+            print(f"    {names[a]} ~ {names[b]}: {score:.2f} ({', '.join(reasons)})")
+    print(f"{len(clusters)} candidate clusters in {stats['rows']} rows "
+          f"({stats['comparisons']} comparisons in {stats['blocks']} blocks)")
+    if stats["skipped_blocks"]:
+        print(f"incomplete: skipped {stats['skipped_blocks']} blocks over {args.max_block} rows "
+              f"(up to {stats['skipped_pairs']} pairs not compared); raise --max-block to include them")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"stats": stats, "clusters": [
+                dict(cluster, names=[names[pos] for pos in cluster["rows"]]) for cluster in clusters
+            ]}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
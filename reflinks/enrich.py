@@ -0,0 +1,353 @@
+"""Description / features / capsules generation, usable with or without the GUI.
+
+The prompts and clean-up rules here are the ones RefLinksApp uses for its
+"Generate ... (OpenAI)" buttons. `enrich_csv` runs them over every row (or a
+filtered subset) of ref_links.csv with a bounded worker pool and writes the
+results back in a single pass:
+
+    python -m reflinks.enrich --fields description,features --only-missing
+
+``--combined`` asks for all three fields in one JSON-structured request per
+row instead of one request per field.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from reflinks import llm, metrics
+from reflinks.catalog import is_missing
+from reflinks.config import CSV_FILE
+from reflinks.store import open_catalog
+
+DEFAULT_MODEL = "o4-mini"
+MODELS = list(llm.MODEL_CAPABILITIES)
+
+
+def description_prompt(platform_name, website):
+    return (
+        f"Write a single, concise sentence (max 25 words) summarizing the crypto platform: "
+        f"{platform_name}. Website: {website}"
+    )
+
+
+def features_prompt(platform_name, website):
+    return (
+        f"List 4 to 6 key features of the crypto platform: "
+        f"{platform_name}. Website: {website}. "
+        f"Each feature should be 3-8 words, comma-separated, and describe a real capability or benefit. "
+        f"Do NOT use numbers, bullets, or single-word tags."
+    )
+
+
+def capsules_prompt(platform_name, website, n_capsules):
+    return (
+        f"Generate {n_capsules} extremely concise, unique feature tags for the crypto platform: "
+        f"{platform_name}. Website: {website}. "
+        f"Each tag should be 1-3 words (prefer 1-2), comma-separated, and highlight distinctive or main features. "
+        f"DO NOT include numbers or bullet points, just comma-separated text."
+    )
+
+
+def pick_capsule_count(rng=random):
+    return rng.choices([2, 3], weights=[0.7, 0.3])[0]
+
+
+def row_rng(platform_name, website):
+    # Same row, same capsule count, same prompt: keeps the result cache effective
+    return random.Random(f"{platform_name}|{website}")
+
+
+def clean_text(text):
+    return text.strip()
+
+
+def clean_tags(text):
+    # Strip quotes, bullets and numbering, then re-join as a plain comma list
+    text = text.strip().replace('"', '')
+    text = text.replace('\n', ',').replace('•', '').replace('-', '')
+    return ','.join(t.strip().lstrip('0123456789. ') for t in text.split(',') if t.strip())
+
+
+# field -> (CSV column, max tokens, temperature, post-processing)
+FIELDS = {
+    "description": ("Description", 60, 0.7, clean_text),
+    "features": ("Features", 80, 0.7, clean_tags),
+    "capsules": ("capsules", 32, 0.8, clean_tags),
+}
+
+
+# One request for all three fields, returned as JSON
+COMBINED_FIELDS = ("description", "features", "capsules")
+COMBINED_MAX_TOKENS = 400
+COMBINED_TEMPERATURE = 0.7
+
+
+COMBINED_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "description": {"type": "string"},
+        "features": {"type": "array", "items": {"type": "string"}},
+        "capsules": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["description", "features", "capsules"],
+    "additionalProperties": False,
+}
+
+
+def combined_prompt(platform_name, website, n_capsules):
+    return (
+        f"Describe the crypto platform: {platform_name}. Website: {website}. "
+        f"Reply with a JSON object with these keys: "
+        f"\"description\": a single, concise sentence (max 25 words) summarizing the platform; "
+        f"\"features\": a list of 4 to 6 key features, each 3-8 words, describing a real capability or benefit "
+        f"(no numbers, bullets, or single-word tags); "
+        f"\"capsules\": a list of {n_capsules} extremely concise, unique feature tags, each 1-3 words (prefer 1-2), "
+        f"highlighting distinctive or main features."
+    )
+
+
+def _clean_items(items, limit):
+    if not isinstance(items, list):
+        raise ValueError("expected a list")
+    cleaned = []
+    for item in items:
+        if not isinstance(item, str):
+            raise ValueError("expected a list of strings")
+        # Commas are the CSV tag separator, so they cannot appear inside a tag
+        item = item.replace(',', ' ').replace('"', '').strip()
+        if item and item not in cleaned:
+            cleaned.append(item)
+    if not cleaned:
+        raise ValueError("empty list")
+    return ','.join(cleaned[:limit])
+
+
+def parse_combined(content, n_capsules):
+    """Validate a combined JSON reply and return ``{field: value}`` in CSV form."""
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Model did not return valid JSON: {e}")
+    if not isinstance(data, dict):
+        raise ValueError("Model reply is not a JSON object")
+    description = data.get("description")
+    if not isinstance(description, str) or not description.strip():
+        raise ValueError("Model reply has no description")
+    try:
+        features = _clean_items(data.get("features"), 6)
+        capsules = _clean_items(data.get("capsules"), n_capsules)
+    except ValueError as e:
+        raise ValueError(f"Model reply has invalid features/capsules: {e}")
+    return {"description": description.strip(), "features": features, "capsules": capsules}
+
+
+def generate_combined(client, model, platform_name, website, rng=None, fresh=False):
+    """Generate description, features and capsules with a single completion."""
+    if rng is None:
+        rng = random if fresh else row_rng(platform_name, website)
+    n_capsules = pick_capsule_count(rng)
+    prompt = combined_prompt(platform_name, website, n_capsules)
+    # Models without structured output support fall back to JSON mode in llm.build_params
+    response_format = {
+        "type": "json_schema",
+        "json_schema": {"name": "platform_copy", "strict": True, "schema": COMBINED_SCHEMA},
+    }
+    content = complete(client, model, prompt, COMBINED_MAX_TOKENS, COMBINED_TEMPERATURE,
+                       response_format=response_format, fresh=fresh)
+    return parse_combined(content, n_capsules)
+
+
+def build_prompt(field, platform_name, website, rng=random):
+    if field == "description":
+        return description_prompt(platform_name, website)
+    if field == "features":
+        return features_prompt(platform_name, website)
+    if field == "capsules":
+        return capsules_prompt(platform_name, website, pick_capsule_count(rng))
+    raise ValueError(f"Unknown field: {field}")
+
+
+def make_client(api_key, base_url=None, requests_per_minute=None, use_cache=True):
+    return llm.get_client(api_key, base_url, use_cache, requests_per_minute=requests_per_minute)
+
+
+def complete(client, model, prompt, max_tokens, temperature, response_format=None, fresh=False):
+    """Run one chat completion through an `llm.LLMClient` and return the reply text."""
+    return client.chat(model, prompt, max_tokens, temperature, response_format, fresh=fresh)
+
+
+def generate_field(client, model, field, platform_name, website, prompt=None, rng=None, fresh=False):
+    """Run one generation and return the cleaned value for `field`.
+
+    `fresh` bypasses the result cache; the capsule count is then random too.
+    """
+    _, max_tokens, temperature, post = FIELDS[field]
+    if rng is None:
+        rng = random if fresh else row_rng(platform_name, website)
+    if not prompt:
+        prompt = build_prompt(field, platform_name, website, rng)
+    return post(complete(client, model, prompt, max_tokens, temperature, fresh=fresh))
+
+
+def _cell(row, column):
+    value = row.get(column, '')
+    if is_missing(value):
+        return ''
+    return str(value).strip()
+
+
+def select_rows(df, platforms=None, categories=None, only_missing=False, fields=None):
+    """Return the index labels of the rows a batch run should touch."""
+    import pandas as pd
+    mask = pd.Series(True, index=df.index)
+    if platforms:
+        wanted = {p.lower() for p in platforms}
+        mask &= df['Platform Name'].astype(str).str.lower().isin(wanted)
+    if categories:
+        wanted = {c.lower() for c in categories}
+        mask &= df['Category'].astype(str).str.lower().isin(wanted)
+    if only_missing and fields:
+        missing = pd.Series(False, index=df.index)
+        for field in fields:
+            column = FIELDS[field][0]
+            if column not in df.columns:
+                missing |= True
+                continue
+            values = df[column]
+            missing |= values.isna() | values.astype(str).str.strip().isin(['', 'nan'])
+        mask &= missing
+    return df.index[mask].tolist()
+
+
+def enrich_rows(df, fields, client, model=DEFAULT_MODEL, rows=None, workers=4, seed=None, progress=None,
+                combined=False, fresh=False):
+    """Generate `fields` for `rows` of `df` concurrently.
+
+    Returns ``(results, errors)`` where results maps ``(row, field)`` to the
+    generated value and errors maps ``(row, field)`` to the exception text.
+    `df` is not modified; see `apply_results`. With `combined`, each row
+    costs one request that returns all three fields.
+    """
+    for field in fields:
+        if field not in FIELDS:
+            raise ValueError(f"Unknown field: {field}")
+    if rows is None:
+        rows = df.index.tolist()
+    jobs = []
+    for idx in rows:
+        row = df.loc[idx]
+        for field in ([None] if combined else fields):
+            # One RNG per job keeps capsule counts reproducible for a given seed
+            rng = random.Random(f"{seed}:{idx}:{field}") if seed is not None else None
+            jobs.append((idx, field, _cell(row, 'Platform Name'), _cell(row, 'Official Website'), rng))
+
+    results, errors = {}, {}
+
+    def run(job):
+        idx, field, name, website, rng = job
+        if field is None:
+            return generate_combined(client, model, name, website, rng=rng, fresh=fresh)
+        return generate_field(client, model, field, name, website, rng=rng, fresh=fresh)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(run, job): job for job in jobs}
+        for done, future in enumerate(as_completed(futures), 1):
+            idx, field = futures[future][:2]
+            try:
+                value = future.result()
+            except Exception as e:
+                for name in ([field] if field else fields):
+                    errors[(idx, name)] = str(e)
+            else:
+                if field is None:
+                    for name in fields:
+                        results[(idx, name)] = value[name]
+                else:
+                    results[(idx, field)] = value
+            if progress:
+                progress(done, len(jobs))
+    return results, errors
+
+
+def apply_results(catalog, results):
+    with catalog.batch():
+        for (idx, field), value in results.items():
+            catalog.set(idx, FIELDS[field][0], value)
+
+
+def enrich_csv(csv_path, fields, api_key, model=DEFAULT_MODEL, workers=4, platforms=None,
+               categories=None, only_missing=False, base_url=None, seed=None, dry_run=False,
+               progress=None, combined=False, requests_per_minute=None, use_cache=True, fresh=False,
+               store_path=None):
+    catalog = open_catalog(csv_path, store_path)
+    rows = select_rows(catalog.df, platforms, categories, only_missing, fields)
+    client = make_client(api_key, base_url, requests_per_minute, use_cache)
+    results, errors = enrich_rows(catalog.df, fields, client, model, rows, workers, seed, progress, combined,
+                                  fresh)
+    if results and not dry_run:
+        apply_results(catalog, results)
+    catalog.close()
+    return {"rows": len(rows), "generated": len(results), "errors": errors, "results": results,
+            "usage": dict(client.usage)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-generate descriptions, features and capsules for ref_links.csv")
+    parser.add_argument("--csv", default=CSV_FILE, help="CSV file to enrich (default: %(default)s)")
+    parser.add_argument("--store", help="Working store to edit instead (default: the validator's, if imported)")
+    parser.add_argument("--fields", default="description,features,capsules",
+                        help="Comma-separated fields to generate (default: %(default)s)")
+    parser.add_argument("--model", default=DEFAULT_MODEL, choices=MODELS)
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent requests (default: %(default)s)")
+    parser.add_argument("--platform", action="append", help="Only this platform (repeatable)")
+    parser.add_argument("--category", action="append", help="Only this category (repeatable)")
+    parser.add_argument("--only-missing", action="store_true", help="Skip rows that already have the fields filled")
+    parser.add_argument("--api-key", default=os.environ.get("OPENAI_API_KEY", ""))
+    parser.add_argument("--base-url", default=os.environ.get("OPENAI_BASE_URL"),
+                        help="Alternative OpenAI-compatible endpoint, e.g. a local stand-in")
+    parser.add_argument("--rpm", type=int,
+                        help="Cap requests per minute (default: follow the API's rate-limit headers)")
+    parser.add_argument("--seed", type=int,
+                        help="Seed for the capsule count (default: derived from each row's name and website)")
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor write the result cache")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Request new variants instead of cached results (they replace the cached ones)")
+    parser.add_argument("--combined", action="store_true",
+                        help="Generate all fields with one JSON request per row")
+    parser.add_argument("--dry-run", action="store_true", help="Print results without writing the CSV")
+    parser.add_argument("--metrics", help="Write per-call timings and token counts to this JSON or CSV file")
+    args = parser.parse_args(argv)
+
+    if not args.api_key:
+        parser.error("Set OPENAI_API_KEY or pass --api-key")
+    fields = [f.strip() for f in args.fields.split(',') if f.strip()]
+    for field in fields:
+        if field not in FIELDS:
+            parser.error(f"Unknown field: {field}")
+
+    def progress(done, total):
+        print(f"\r{done}/{total}", end="", file=sys.stderr, flush=True)
+
+    report = enrich_csv(args.csv, fields, args.api_key, args.model, args.workers, args.platform,
+                        args.category, args.only_missing, args.base_url, args.seed, args.dry_run, progress,
+                        args.combined, args.rpm, not args.no_cache, args.fresh, args.store)
+    print(file=sys.stderr)
+    if args.dry_run:
+        for (idx, field), value in sorted(report["results"].items(), key=lambda item: (str(item[0][0]), item[0][1])):
+            print(f"{idx}\t{field}\t{value}")
+    for (idx, field), error in report["errors"].items():
+        print(f"Row {idx} {field}: {error}", file=sys.stderr)
+    usage = report["usage"]
+    print(f"Rows: {report['rows']}, generated: {report['generated']}, errors: {len(report['errors'])}, "
+          f"requests: {usage['requests']}, cached: {usage['cache_hits']}, retries: {usage['retries']}, "
+          f"tokens: {usage['prompt_tokens']}+{usage['completion_tokens']}")
+    if args.metrics:
+        metrics.METRICS.dump(args.metrics)
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""Favicon harvesting for ref_links.csv.
+
+`find_favicon` is the lookup RefLinksApp has always done (/favicon.ico, then
+the page's ``<link rel="icon">``); `harvest` runs it for many rows at once
+through `reflinks.net.run_all`:
+
+    python -m reflinks.favicons --only-missing --deadline 60
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import threading
+
+from reflinks import images, metrics
+from reflinks.config import CSV_FILE, FAVICON_DIR, safe_platform_name
+from reflinks.http_cache import make_cached_session
+from reflinks.net import DeadlineExceeded, host_of, make_session, normalize_url, run_all
+from reflinks.store import open_catalog
+
+# bs4 is only imported when a page actually has to be parsed
+BEAUTIFULSOUP_AVAILABLE = importlib.util.find_spec("bs4") is not None
+
+
+class FaviconNotFound(Exception):
+    pass
+
+
+def _is_image(response):
+    return response.status_code == 200 and response.content and 'image' in response.headers.get('content-type', '')
+
+
+def find_favicon(session, url, timeout=6):
+    """Return ``(image_bytes, icon_url)`` for the site at `url`."""
+    url = normalize_url(url)
+    if not url:
+        raise FaviconNotFound("No official website URL found.")
+    scheme, base_url = url.split('/')[0], url.split('/')[2]
+    favicon_url = f"{scheme}//{base_url}/favicon.ico"
+    r = session.get(favicon_url, timeout=timeout)
+    if _is_image(r):
+        return r.content, favicon_url
+    # Try to parse <link rel="icon"> from HTML
+    if not BEAUTIFULSOUP_AVAILABLE:
+        raise FaviconNotFound("BeautifulSoup not installed. Favicon parsing from HTML will be limited.")
+    r_html = session.get(url, timeout=timeout)
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(r_html.text, 'html.parser')
+    icon_link = soup.find('link', rel=lambda x: x and 'icon' in x.lower())
+    if not icon_link or not icon_link.get('href'):
+        raise FaviconNotFound("Favicon not found.")
+    icon_href = icon_link['href']
+    if icon_href.startswith('//'):
+        icon_url = scheme + icon_href
+    elif icon_href.startswith('http'):
+        icon_url = icon_href
+    else:
+        icon_url = f"{scheme}//{base_url}/{icon_href.lstrip('/')}"
+    r_icon = session.get(icon_url, timeout=timeout)
+    if not _is_image(r_icon):
+        raise FaviconNotFound("Favicon not found or not an image.")
+    return r_icon.content, icon_url
+
+
+def save_favicon(data, platform_name, favicon_dir=FAVICON_DIR):
+    """Save favicon bytes as ``fav_<name>.png`` and return ``(filename, path)``."""
+    favicon_filename = f"fav_{safe_platform_name(platform_name)}.png"
+    png_path = os.path.join(favicon_dir, favicon_filename)
+    images.ingest(data, png_path, kind="favicon")
+    return favicon_filename, png_path
+
+
+class HarvestReport:
+    def __init__(self, hits, misses, elapsed, cache_stats=None):
+        self.hits = hits
+        self.misses = misses
+        self.elapsed = elapsed
+        self.cache_stats = cache_stats
+
+    def summary(self):
+        total = len(self.hits) + len(self.misses)
+        text = f"Favicons: {len(self.hits)}/{total} found, {len(self.misses)} missed in {self.elapsed:.1f}s"
+        if self.cache_stats:
+            text += f" (cache hit rate {self.cache_stats['hit_rate']:.0%})"
+        return text
+
+    def to_dict(self):
+        return {"elapsed": round(self.elapsed, 3), "hits": self.hits, "misses": self.misses,
+                "cache": self.cache_stats}
+
+
+def harvest(rows, favicon_dir=FAVICON_DIR, workers=16, per_host=2, deadline=None, timeout=6, session=None,
+            use_cache=True):
+    """Fetch favicons for ``(key, platform_name, website)`` rows concurrently.
+
+    Nothing is written once the deadline has passed, and a favicon that was
+    being written at that moment is reported as found rather than missed.
+    """
+    rows = list(rows)
+    if session is None:
+        session = make_cached_session(workers) if use_cache else make_session(workers)
+    # Set by run_all at the deadline; `writing` counts saves in progress
+    stop, writes = threading.Event(), threading.Condition()
+    writing, saved = [0], {}
+
+    def fetch(i):
+        key, platform_name, website = rows[i]
+        data, icon_url = find_favicon(session, website, timeout)
+        with writes:
+            if stop.is_set():
+                raise DeadlineExceeded(f"deadline of {deadline}s exceeded")
+            writing[0] += 1
+        try:
+            filename, path = save_favicon(data, platform_name, favicon_dir)
+            saved[i] = {"filename": filename, "path": path, "icon_url": icon_url, "bytes": len(data)}
+        finally:
+            with writes:
+                writing[0] -= 1
+                writes.notify_all()
+        return saved[i]
+
+    results, elapsed = run_all(range(len(rows)), fetch, key=lambda i: host_of(rows[i][2]),
+                               workers=workers, per_host=per_host, deadline=deadline, stop=stop)
+    # Saves that began before the deadline finish, and count as found
+    with writes:
+        writes.wait_for(lambda: not writing[0])
+    results = [(True, saved[i]) if not ok and i in saved else (ok, value) for i, (ok, value) in enumerate(results)]
+    hits, misses = [], []
+    for (key, platform_name, website), (ok, value) in zip(rows, results):
+        entry = {"row": key, "platform": platform_name, "website": website}
+        if ok:
+            entry.update(value)
+            hits.append(entry)
+        else:
+            entry["error"] = str(value) or type(value).__name__
+            misses.append(entry)
+    cache = getattr(session, 'cache', None)
+    return HarvestReport(hits, misses, elapsed, cache.stats() if cache is not None else None)
+
+
+def favicon_column(columns):
+    return 'Favicon' if 'Favicon' in columns else 'favicon'
+
+
+def harvest_csv(csv_path=CSV_FILE, favicon_dir=FAVICON_DIR, only_missing=False, platforms=None,
+                write=True, store_path=None, **kwargs):
+    catalog = open_catalog(csv_path, store_path)
+    column = favicon_column(catalog.columns)
+    if platforms:
+        positions = sorted({pos for name in platforms for pos in catalog.rows_named(name)})
+    else:
+        positions = range(len(catalog))
+    rows = []
+    for idx in positions:
+        row = catalog.row(idx)
+        name = str(row.get('Platform Name', ''))
+        website = str(row.get('Official Website', ''))
+        if only_missing:
+            current = str(row.get(column, '')).strip()
+            if current and os.path.exists(os.path.join(favicon_dir, current)):
+                continue
+        if website.strip():
+            rows.append((idx, name, website))
+    report = harvest(rows, favicon_dir, **kwargs)
+    if write and report.hits:
+        with catalog.batch():
+            for hit in report.hits:
+                catalog.set(hit["row"], column, hit["filename"])
+    catalog.close()
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch favicons for every platform in ref_links.csv")
+    parser.add_argument("--csv", default=CSV_FILE)
+    parser.add_argument("--store", help="Working store to edit instead (default: the validator's, if imported)")
+    parser.add_argument("--favicon-dir", default=FAVICON_DIR)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--per-host", type=int, default=2, help="Concurrent requests per host (default: %(default)s)")
+    parser.add_argument("--deadline", type=float, default=120, help="Overall time budget in seconds (default: %(default)s)")
+    parser.add_argument("--timeout", type=float, default=6, help="Per-request timeout in seconds (default: %(default)s)")
+    parser.add_argument("--platform", action="append", help="Only this platform (repeatable)")
+    parser.add_argument("--only-missing", action="store_true", help="Skip rows whose favicon file already exists")
+    parser.add_argument("--no-write", action="store_true", help="Save images but leave the CSV untouched")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the on-disk HTTP cache")
+    parser.add_argument("--report", help="Write a JSON report of hits and misses to this path")
+    parser.add_argument("--metrics", help="Write per-request timings to this JSON or CSV file")
+    args = parser.parse_args(argv)
+
+    report = harvest_csv(args.csv, args.favicon_dir, args.only_missing, args.platform, not args.no_write,
+                         args.store, workers=args.workers, per_host=args.per_host, deadline=args.deadline,
+                         timeout=args.timeout, use_cache=not args.no_cache)
+    for miss in report.misses:
+        print(f"MISS {miss['platform']} ({miss['website']}): {miss['error']}")
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report.to_dict(), f, indent=2, default=str)
+    print(report.summary())
+    if args.metrics:
+        metrics.METRICS.dump(args.metrics)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
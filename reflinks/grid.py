@@ -0,0 +1,324 @@
+"""Table view of the whole catalog for the validator.
+
+`CatalogModel` exposes the catalog to a QTableView without copying it: a
+column's values are read from the catalog the first time a visible cell needs
+them, rows are handed to the view in chunks as it scrolls (``fetchMore``), and
+logo / favicon thumbnails are only decoded for the cells Qt actually paints,
+on the thread pool through a `reflinks.pixmaps.PixmapCache`. Sorting and
+filtering rearrange a list of catalog positions inside the model, with plain
+Python sort keys, so they stay fast at tens of thousands of rows where a
+QSortFilterProxyModel would call back into Python for every comparison.
+
+`CatalogGrid` is the window around it: a filter box, a "needs review" toggle
+and the table. Clicking a row emits `row_activated` with its catalog
+position, which the validator opens in the single-row editor.
+"""
+import os
+import time
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, QTimer, pyqtSignal
+from PyQt5.QtWidgets import (
+    QAbstractItemView, QCheckBox, QHBoxLayout, QHeaderView, QLabel, QLineEdit, QTableView, QVBoxLayout, QWidget
+)
+
+from reflinks import linkcheck
+from reflinks.catalog import normalize_name, normalize_website
+from reflinks.config import FAVICON_DIR, LOGO_DIR
+from reflinks.favicons import favicon_column
+from reflinks.pixmaps import PixmapCache
+from reflinks.review import ROW, WEBSITE
+
+LOGO, FAVICON, NAME, CATEGORY, STATUS, REVIEWED, LINKS, WEBSITE_COLUMN = range(8)
+HEADERS = ("Logo", "Favicon", "Platform", "Category", "Status", "Reviewed", "Links", "Website")
+TEXT_COLUMNS = {NAME: 'Platform Name', CATEGORY: 'Category', STATUS: 'Status', WEBSITE_COLUMN: 'Official Website'}
+THUMB_SIZES = {LOGO: (32, 32), FAVICON: (20, 20)}
+ROW_HEIGHT = 36
+FETCH_CHUNK = 2000
+LINK_RANK = {'✅': 1, '⚠️': 2, '❌': 3}
+
+
+class CatalogModel(QAbstractTableModel):
+    def __init__(self, catalog, review, link_health, queue=None, pixmaps=None, parent=None):
+        super().__init__(parent)
+        self.catalog = catalog
+        self.review = review
+        self.link_health = link_health
+        self.queue = queue
+        self.pixmaps = pixmaps or PixmapCache(capacity=1024)
+        self.pixmaps.loaded.connect(self._on_thumbnail)
+        self._failed = set()
+        self._repaint = QTimer(self)
+        self._repaint.setSingleShot(True)
+        self._repaint.timeout.connect(self._thumbnails_changed)
+        self._filter_text = ''
+        self._needs_review = False
+        self._sort = None
+        self._clear()
+        self._order = list(range(len(catalog)))
+        self._sort_order()
+        self._fetched = min(len(self._order), FETCH_CHUNK)
+
+    def _clear(self):
+        self._values = {}
+        self._keys = {}
+        self._search = None
+        self._statuses = None
+
+    # Data, loaded on first use
+
+    def _column(self, column):
+        values = self._values.get(column)
+        if values is None:
+            values = self._values[column] = self.catalog.column(column)
+        return values
+
+    def _key(self, pos):
+        # Review marks and link health are stored by (name, website); the duplicate counter is not needed
+        key = self._keys.get(pos)
+        if key is None:
+            key = self._keys[pos] = (normalize_name(self._column('Platform Name')[pos]),
+                                     normalize_website(self._column('Official Website')[pos]))
+        return key
+
+    def _link_icon(self, pos):
+        if self._statuses is None:
+            self._statuses = self.link_health.statuses()
+        statuses = self._statuses.get(self._key(pos))
+        return linkcheck.health_icon(statuses.values()) if statuses else ''
+
+    def _thumbnail_column(self, column):
+        return self._column('Logo' if column == LOGO else favicon_column(self.catalog.columns))
+
+    def _thumbnail_path(self, column, pos):
+        name = self._thumbnail_column(column)[pos].strip()
+        return os.path.join(LOGO_DIR if column == LOGO else FAVICON_DIR, name) if name else ''
+
+    def _thumbnail(self, column, pos):
+        path = self._thumbnail_path(column, pos)
+        if not path or path in self._failed:
+            return None
+        size = THUMB_SIZES[column]
+        pixmap = self.pixmaps.peek(path, size)
+        if pixmap is None:
+            self.pixmaps.prefetch([(path, size)])
+        return pixmap
+
+    def _on_thumbnail(self, key, image):
+        if image is None:
+            self._failed.add(key[0])
+        # Coalesce the repaints of a burst of finished decodes
+        if not self._repaint.isActive():
+            self._repaint.start(30)
+
+    def _thumbnails_changed(self):
+        if self._fetched:
+            self.dataChanged.emit(self.index(0, LOGO), self.index(self._fetched - 1, FAVICON), [Qt.DecorationRole])
+
+    # QAbstractTableModel
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._fetched
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._fetched < len(self._order)
+
+    def fetchMore(self, parent=QModelIndex()):
+        count = min(FETCH_CHUNK, len(self._order) - self._fetched)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._fetched, self._fetched + count - 1)
+        self._fetched += count
+        self.endInsertRows()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return None
+
+    def position(self, row):
+        """The catalog position shown in table row `row`."""
+        return self._order[row]
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        pos, column = self._order[index.row()], index.column()
+        if role == Qt.DisplayRole:
+            if column in TEXT_COLUMNS:
+                return self._column(TEXT_COLUMNS[column])[pos]
+            if column == REVIEWED:
+                verified_at = self.review.verified_at(self._key(pos), ROW)
+                if verified_at is None:
+                    return ''
+                text = time.strftime('%Y-%m-%d', time.localtime(verified_at))
+                return text + " (stale)" if self.queue is not None and pos in self.queue else text
+            if column == LINKS:
+                icon = self._link_icon(pos)
+                if not icon and self.review.is_verified(self._key(pos), WEBSITE):
+                    icon = '✅'
+                return icon
+        elif role == Qt.DecorationRole and column in THUMB_SIZES:
+            return self._thumbnail(column, pos)
+        elif role == Qt.ToolTipRole and column in THUMB_SIZES:
+            return os.path.basename(self._thumbnail_path(column, pos)) or None
+        elif role == Qt.TextAlignmentRole and column in (LOGO, FAVICON, LINKS):
+            return Qt.AlignCenter
+        return None
+
+    # Sorting and filtering
+
+    def _sort_key(self, column):
+        if column in TEXT_COLUMNS:
+            values = self._column(TEXT_COLUMNS[column])
+            return lambda pos: values[pos].casefold()
+        if column == REVIEWED:
+            return lambda pos: self.review.verified_at(self._key(pos), ROW) or 0
+        if column == LINKS:
+            return lambda pos: LINK_RANK.get(self._link_icon(pos), 0)
+        # Thumbnail columns: rows without an image first
+        values = self._thumbnail_column(column)
+        return lambda pos: bool(values[pos].strip())
+
+    def _sort_order(self):
+        if self._sort is None:
+            self._order.sort()
+        else:
+            column, order = self._sort
+            self._order.sort(key=self._sort_key(column), reverse=order == Qt.DescendingOrder)
+        # Table row of each catalog position, the inverse of _order
+        self._rows = {pos: row for row, pos in enumerate(self._order)}
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        # Column -1 is the view asking for the catalog's own order
+        self._sort = (column, order) if column >= 0 else None
+        self.beginResetModel()
+        self._sort_order()
+        self.endResetModel()
+
+    def _matches(self):
+        if self._search is None:
+            columns = [self._column(c) for c in ('Platform Name', 'Category', 'Official Website', 'Status')]
+            self._search = ['\n'.join(values).casefold() for values in zip(*columns)]
+        text = self._filter_text.casefold()
+        positions = range(len(self.catalog))
+        if text:
+            positions = [pos for pos in positions if text in self._search[pos]]
+        if self._needs_review and self.queue is not None:
+            positions = [pos for pos in positions if pos in self.queue]
+        return list(positions)
+
+    def set_filter(self, text=None, needs_review=None):
+        if text is not None:
+            self._filter_text = text.strip()
+        if needs_review is not None:
+            self._needs_review = needs_review
+        self._refilter()
+
+    def _refilter(self):
+        self.beginResetModel()
+        self._order = self._matches()
+        self._sort_order()
+        self._fetched = min(len(self._order), FETCH_CHUNK)
+        self.endResetModel()
+
+    def reload(self):
+        """Re-read everything from the catalog, e.g. after it was merged with external changes."""
+        self._clear()
+        self._refilter()
+
+    def refresh_row(self, pos):
+        """Pick up edits to one catalog row without rebuilding the model."""
+        for column, values in self._values.items():
+            values[pos] = self.catalog.get(pos, column)
+        self._keys.pop(pos, None)
+        self._statuses = None
+        self._search = None
+        self._failed.clear()
+        row = self._rows.get(pos)
+        if row is not None and row < self._fetched:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(HEADERS) - 1))
+
+    def row_of(self, pos):
+        """The table row showing catalog position `pos`, or None if it is filtered out."""
+        return self._rows.get(pos)
+
+    def visible_count(self):
+        """Number of catalog rows that pass the filter, fetched or not."""
+        return len(self._order)
+
+
+class CatalogGrid(QWidget):
+    row_activated = pyqtSignal(int)
+
+    def __init__(self, catalog, review, link_health, queue=None, parent=None):
+        super().__init__(parent, Qt.Window)
+        self.setWindowTitle("Catalog")
+        self.resize(1000, 700)
+        self.model = CatalogModel(catalog, review, link_health, queue, parent=self)
+        layout = QVBoxLayout()
+        filter_layout = QHBoxLayout()
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filter by name, category, website or status")
+        self.filter_edit.setClearButtonEnabled(True)
+        filter_layout.addWidget(self.filter_edit)
+        self.review_check = QCheckBox("Needs review only")
+        filter_layout.addWidget(self.review_check)
+        self.count_label = QLabel("")
+        filter_layout.addWidget(self.count_label)
+        layout.addLayout(filter_layout)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        # Start in catalog order; enabling sorting would otherwise sort by the first column
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.table.setSortingEnabled(True)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setWordWrap(False)
+        # Fixed row heights keep scrolling O(visible rows); never size to contents
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(ROW_HEIGHT)
+        self.table.verticalHeader().setVisible(False)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.Interactive)
+        for column, width in ((LOGO, 48), (FAVICON, 56), (NAME, 200), (CATEGORY, 130), (STATUS, 160),
+                              (REVIEWED, 130), (LINKS, 50)):
+            header.resizeSection(column, width)
+        header.setStretchLastSection(True)
+        self.table.clicked.connect(self._on_clicked)
+        self.table.activated.connect(self._on_clicked)
+        layout.addWidget(self.table)
+        self.setLayout(layout)
+
+        # Filter once typing pauses instead of on every keystroke
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.timeout.connect(self.apply_filter)
+        self.filter_edit.textChanged.connect(lambda _: self._filter_timer.start(200))
+        self.review_check.toggled.connect(lambda _: self.apply_filter())
+        self.model.modelReset.connect(self._update_count)
+        self._update_count()
+
+    def apply_filter(self):
+        self.model.set_filter(self.filter_edit.text(), self.review_check.isChecked())
+
+    def _update_count(self):
+        self.count_label.setText(f"{self.model.visible_count()} of {len(self.model.catalog)} rows")
+
+    def _on_clicked(self, index):
+        self.row_activated.emit(self.model.position(index.row()))
+
+    def select_position(self, pos):
+        """Scroll to and select catalog row `pos`, if it passes the filter."""
+        row = self.model.row_of(pos)
+        if row is None:
+            return
+        while row >= self.model.rowCount() and self.model.canFetchMore():
+            self.model.fetchMore()
+        index = self.model.index(row, NAME)
+        self.table.selectRow(row)
+        self.table.scrollTo(index)
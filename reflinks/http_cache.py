@@ -0,0 +1,208 @@
+"""On-disk HTTP cache with ETag / Last-Modified revalidation.
+
+`CachingSession` wraps a requests session and is a drop-in for the ``get``
+calls made by the favicon and logo fetchers. A cached URL is revalidated with
+If-None-Match / If-Modified-Since, so an unchanged asset comes back as a bodyless
+304 and is served from disk. Bodies live in ``<cache_dir>/bodies``; the index is
+a small SQLite file. Once the bodies exceed `max_bytes` the least recently
+used entries are evicted.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from reflinks.config import CACHE_DIR
+from reflinks.net import make_session
+
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+class CachedResponse:
+    """The subset of `requests.Response` the fetchers use."""
+
+    def __init__(self, url, status_code, content, headers, from_cache=False):
+        self.url = url
+        from requests.structures import CaseInsensitiveDict
+        self.status_code = status_code
+        self.content = content
+        self.headers = CaseInsensitiveDict(headers)
+        self.from_cache = from_cache
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    @property
+    def encoding(self):
+        content_type = self.headers.get('content-type', '')
+        if 'charset=' in content_type:
+            return content_type.split('charset=')[-1].split(';')[0].strip()
+        return None
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}")
+
+
+class HttpCache:
+    def __init__(self, cache_dir=os.path.join(CACHE_DIR, "http"), max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.body_dir = os.path.join(cache_dir, "bodies")
+        self.max_bytes = max_bytes
+        os.makedirs(self.body_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(cache_dir, "index.sqlite"), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " url TEXT PRIMARY KEY, body TEXT, size INTEGER, etag TEXT, last_modified TEXT,"
+            " content_type TEXT, stored_at REAL, last_access REAL)"
+        )
+        self._db.commit()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    def _body_path(self, url):
+        return os.path.join(self.body_dir, hashlib.sha256(url.encode('utf-8')).hexdigest())
+
+    def lookup(self, url):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, etag, last_modified, content_type FROM entries WHERE url = ?", (url,)
+            ).fetchone()
+        if row and not os.path.exists(row[0]):
+            self.forget(url)
+            return None
+        return row
+
+    def load(self, url, body_path):
+        """The cached body, or None if eviction removed it since `lookup`."""
+        try:
+            with open(body_path, "rb") as f:
+                content = f.read()
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            self._db.execute("UPDATE entries SET last_access = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+        return content
+
+    def store(self, url, content, etag, last_modified, content_type):
+        body_path = self._body_path(url)
+        tmp_path = f"{body_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, body_path)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, body_path, len(content), etag, last_modified, content_type, now, now),
+            )
+            self._db.commit()
+        self.evict()
+
+    def forget(self, url):
+        with self._lock:
+            self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+            self._db.commit()
+        try:
+            os.remove(self._body_path(url))
+        except OSError:
+            pass
+
+    def total_bytes(self):
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in `max_bytes`."""
+        with self._lock:
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            doomed = []
+            for url, body_path, size in self._db.execute(
+                    "SELECT url, body, size FROM entries ORDER BY last_access"):
+                if total <= self.max_bytes:
+                    break
+                doomed.append((url, body_path))
+                total -= size
+            self._db.executemany("DELETE FROM entries WHERE url = ?", [(url,) for url, _ in doomed])
+            self._db.commit()
+        for _, body_path in doomed:
+            try:
+                os.remove(body_path)
+            except OSError:
+                pass
+
+    def record(self, hit, saved=0):
+        with self._lock:
+            if hit:
+                self.hits += 1
+                self.bytes_saved += saved
+            else:
+                self.misses += 1
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate(), 3),
+            "bytes_saved": self.bytes_saved,
+            "bytes_stored": self.total_bytes(),
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class CachingSession:
+    """A requests session whose GETs go through an `HttpCache`."""
+
+    def __init__(self, cache=None, session=None):
+        self.cache = cache if cache is not None else HttpCache()
+        self.session = session if session is not None else make_session()
+        self.headers = self.session.headers
+
+    def get(self, url, timeout=None, **kwargs):
+        entry = self.cache.lookup(url)
+        headers = dict(kwargs.pop('headers', None) or {})
+        if entry:
+            _, etag, last_modified, _ = entry
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        r = self.session.get(url, timeout=timeout, headers=headers, **kwargs)
+        if r.status_code == 304 and entry:
+            content = self.cache.load(url, entry[0])
+            if content is not None:
+                self.cache.record(True, len(content))
+                return CachedResponse(url, 200, content, {'content-type': entry[3] or ''}, from_cache=True)
+            # Evicted by another thread after the lookup: a miss, fetch the body again
+            headers.pop('If-None-Match', None)
+            headers.pop('If-Modified-Since', None)
+            r = self.session.get(url, timeout=timeout, headers=headers, **kwargs)
+            entry = None
+        self.cache.record(False)
+        etag, last_modified = r.headers.get('ETag'), r.headers.get('Last-Modified')
+        if r.status_code == 200 and (etag or last_modified):
+            self.cache.store(url, r.content, etag, last_modified, r.headers.get('content-type', ''))
+        elif entry:
+            # The server stopped sending validators or the asset is gone
+            self.cache.forget(url)
+        return r
+
+
+def make_cached_session(pool_size=32, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+    cache = HttpCache(cache_dir, max_bytes) if cache_dir else HttpCache(max_bytes=max_bytes)
+    return CachingSession(cache, make_session(pool_size))
@@ -0,0 +1,184 @@
+"""Shared ingest pipeline for logos and favicons.
+
+Every image the validator saves goes through `ingest`, which applies EXIF
+orientation, drops metadata, downsizes to the configured maximum for its kind
+and writes an optimized file, plus an optional WebP copy and a fixed-size
+thumbnail under ``thumbs/``. `normalize_dir` applies the same treatment to the
+existing asset directories in parallel:
+
+    python -m reflinks.images --logos --favicons
+"""
+import argparse
+import io
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from reflinks import metrics
+from reflinks.config import FAVICON_DIR, LOGO_DIR
+
+# Logos are shown at 100x100 and favicons at 32x32; keep 2x for high-DPI screens
+IMAGE_SETTINGS = {
+    "logo": {"max_size": (256, 256), "thumb_size": (100, 100)},
+    "favicon": {"max_size": (64, 64), "thumb_size": (32, 32)},
+}
+THUMB_DIR_NAME = "thumbs"
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.ico', '.webp', '.gif')
+
+
+def _open(source):
+    from PIL import Image
+    if isinstance(source, Image.Image):
+        return source
+    if isinstance(source, (bytes, bytearray)):
+        return Image.open(io.BytesIO(source))
+    return Image.open(source)
+
+
+def normalize(img, max_size):
+    """Return an upright, metadata-free copy of `img` no larger than `max_size`."""
+    from PIL import Image, ImageOps
+    img = ImageOps.exif_transpose(img)
+    has_alpha = img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info)
+    img = img.convert('RGBA' if has_alpha else 'RGB')
+    img.thumbnail(max_size, Image.LANCZOS)
+    # Copying the pixels into a fresh image leaves EXIF, ICC and text chunks behind
+    clean = Image.new(img.mode, img.size)
+    clean.paste(img)
+    return clean
+
+
+def thumbnail(img, size):
+    """Fit `img` into a transparent `size` square, centred."""
+    from PIL import Image
+    thumb = img.convert('RGBA')
+    thumb.thumbnail(size, Image.LANCZOS)
+    canvas = Image.new('RGBA', size, (0, 0, 0, 0))
+    canvas.paste(thumb, ((size[0] - thumb.width) // 2, (size[1] - thumb.height) // 2))
+    return canvas
+
+
+def encode(img, ext):
+    buf = io.BytesIO()
+    ext = ext.lower()
+    if ext in ('.jpg', '.jpeg'):
+        img.convert('RGB').save(buf, format='JPEG', quality=85, optimize=True, progressive=True)
+    elif ext == '.webp':
+        img.save(buf, format='WEBP', quality=85, method=6)
+    else:
+        img.save(buf, format='PNG', optimize=True)
+    return buf.getvalue()
+
+
+def _write(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def thumb_path(path):
+    directory, filename = os.path.split(path)
+    return os.path.join(directory, THUMB_DIR_NAME, os.path.splitext(filename)[0] + '.png')
+
+
+def _write_extras(img, path, kind, webp):
+    if webp and not path.lower().endswith('.webp'):
+        _write(os.path.splitext(path)[0] + '.webp', encode(img, '.webp'))
+    thumb = thumb_path(path)
+    os.makedirs(os.path.dirname(thumb), exist_ok=True)
+    _write(thumb, encode(thumbnail(img, IMAGE_SETTINGS[kind]["thumb_size"]), '.png'))
+
+
+def ingest(source, dest_path, kind="logo", webp=True):
+    """Normalize `source` (a path, bytes or PIL image) and save it to `dest_path`.
+
+    The format follows the extension of `dest_path` (PNG unless .jpg/.jpeg/.webp).
+    Returns the number of bytes written for the main file.
+    """
+    settings = IMAGE_SETTINGS[kind]
+    with metrics.span("image.ingest", kind=kind) as span:
+        img = normalize(_open(source), settings["max_size"])
+        ext = os.path.splitext(dest_path)[1] or '.png'
+        os.makedirs(os.path.dirname(dest_path) or '.', exist_ok=True)
+        data = encode(img, ext)
+        _write(dest_path, data)
+        _write_extras(img, dest_path, kind, webp)
+        span["bytes"] = len(data)
+    return len(data)
+
+
+def normalize_file(path, kind, webp=True, dry_run=False):
+    """Normalize one existing asset in place. Returns ``(path, bytes_before, bytes_after)``."""
+    before = after = os.path.getsize(path)
+    img = normalize(_open(path), IMAGE_SETTINGS[kind]["max_size"])
+    data = None
+    # Only formats we can write back under the same name are re-encoded; others just get extras
+    if os.path.splitext(path)[1].lower() in ('.png', '.jpg', '.jpeg'):
+        data = encode(img, os.path.splitext(path)[1])
+        # Keep the original when re-encoding would not make it smaller
+        after = min(before, len(data))
+    if not dry_run:
+        if data is not None and len(data) < before:
+            _write(path, data)
+        _write_extras(img, path, kind, webp)
+    return path, before, after
+
+
+def _normalize_job(args):
+    path, kind, webp, dry_run = args
+    try:
+        return normalize_file(path, kind, webp, dry_run) + (None,)
+    except Exception as e:
+        return path, 0, 0, str(e)
+
+
+def list_assets(directory):
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(IMAGE_EXTENSIONS) and not name.lower().endswith('.webp')
+    )
+
+
+def normalize_dir(directory, kind, workers=None, webp=True, dry_run=False):
+    """Normalize every image in `directory` across `workers` processes."""
+    jobs = [(path, kind, webp, dry_run) for path in list_assets(directory)]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        return list(pool.map(_normalize_job, jobs, chunksize=4))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Downsize and recompress logos and favicons")
+    parser.add_argument("--logos", action="store_true", help=f"Normalize {LOGO_DIR}")
+    parser.add_argument("--favicons", action="store_true", help=f"Normalize {FAVICON_DIR}")
+    parser.add_argument("--logo-dir", default=LOGO_DIR)
+    parser.add_argument("--favicon-dir", default=FAVICON_DIR)
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per core)")
+    parser.add_argument("--no-webp", action="store_true", help="Skip the WebP copies")
+    parser.add_argument("--dry-run", action="store_true", help="Report savings without writing anything")
+    args = parser.parse_args(argv)
+    if not args.logos and not args.favicons:
+        args.logos = args.favicons = True
+
+    targets = []
+    if args.logos:
+        targets.append((args.logo_dir, "logo"))
+    if args.favicons:
+        targets.append((args.favicon_dir, "favicon"))
+    failed = 0
+    for directory, kind in targets:
+        results = normalize_dir(directory, kind, args.workers, not args.no_webp, args.dry_run)
+        before = sum(r[1] for r in results)
+        after = sum(r[2] for r in results)
+        for path, _, _, error in results:
+            if error:
+                failed += 1
+                print(f"Failed: {path}: {error}")
+        print(f"{directory}: {len(results)} files, {before / 1024:.0f} KB -> {after / 1024:.0f} KB")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
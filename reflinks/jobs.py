@@ -0,0 +1,125 @@
+"""Background jobs for the validator.
+
+Blocking work (HTTP fetches, OpenAI calls) is wrapped in a `Job` and run on a
+QThreadPool. Its outcome comes back through Qt signals, which are delivered on
+the UI thread, so callbacks may touch widgets. Cancelling a job that has not
+started yet removes it from the queue. A job that is already running finishes,
+but its result is thrown away.
+"""
+import itertools
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class _JobSignals(QObject):
+    progress = pyqtSignal(int, int, int)
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+    ended = pyqtSignal(int)
+
+
+class Job(QRunnable):
+    def __init__(self, job_id, name, fn, args, kwargs, with_progress):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.job_id = job_id
+        self.name = name
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.with_progress = with_progress
+        self.cancelled = False
+        self.signals = _JobSignals()
+
+    def report_progress(self, done, total):
+        if self.cancelled:
+            raise JobCancelled()
+        self.signals.progress.emit(self.job_id, done, total)
+
+    def run(self):
+        try:
+            if self.cancelled:
+                return
+            kwargs = dict(self.kwargs)
+            if self.with_progress:
+                kwargs['progress'] = self.report_progress
+            result = self.fn(*self.args, **kwargs)
+            self.signals.finished.emit(self.job_id, result)
+        except JobCancelled:
+            pass
+        except Exception as e:
+            self.signals.failed.emit(self.job_id, str(e))
+        finally:
+            self.signals.ended.emit(self.job_id)
+
+
+class JobQueue(QObject):
+    """Runs jobs on a thread pool and routes their results to callbacks."""
+
+    # Emitted with the names of the jobs still running whenever that set changes
+    active_changed = pyqtSignal(list)
+    progress = pyqtSignal(int, str, int, int)
+
+    def __init__(self, max_threads=8, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self._ids = itertools.count(1)
+        self._jobs = {}
+        # Cancelled jobs that were already running; kept alive until their thread lets go
+        self._retired = {}
+
+    def submit(self, name, fn, *args, on_done=None, on_error=None, with_progress=False, **kwargs):
+        """Queue ``fn(*args, **kwargs)``; returns the job id."""
+        job = Job(next(self._ids), name, fn, args, kwargs, with_progress)
+        self._jobs[job.job_id] = (job, on_done, on_error)
+        job.signals.finished.connect(self._on_finished)
+        job.signals.failed.connect(self._on_failed)
+        job.signals.ended.connect(lambda job_id: self._retired.pop(job_id, None))
+        job.signals.progress.connect(lambda job_id, done, total: self.progress.emit(job_id, name, done, total))
+        self.pool.start(job)
+        self.active_changed.emit(self.active())
+        return job.job_id
+
+    def active(self):
+        return [job.name for job, _, _ in self._jobs.values()]
+
+    def is_running(self, name):
+        return name in self.active()
+
+    def cancel(self, job_id):
+        entry = self._jobs.pop(job_id, None)
+        if entry is None:
+            return False
+        job = entry[0]
+        job.cancelled = True
+        if not self.pool.tryTake(job):
+            self._retired[job_id] = job
+        self.active_changed.emit(self.active())
+        return True
+
+    def cancel_all(self):
+        for job_id in list(self._jobs):
+            self.cancel(job_id)
+
+    def _take(self, job_id):
+        entry = self._jobs.pop(job_id, None)
+        self.active_changed.emit(self.active())
+        return entry
+
+    def _on_finished(self, job_id, result):
+        entry = self._take(job_id)
+        if entry and entry[1]:
+            entry[1](result)
+
+    def _on_failed(self, job_id, message):
+        entry = self._take(job_id)
+        if entry and entry[2]:
+            entry[2](message)
+
+    def wait(self, msecs=-1):
+        return self.pool.waitForDone(msecs)
@@ -0,0 +1,325 @@
+"""Concurrent health checks for the Official Website and Referral Link columns.
+
+Every URL is requested with redirects followed by hand, so the whole chain is
+recorded. The final response is classified as:
+
+- ``ok``
+- ``dead``: DNS or connection failure, 404 or 410.
+- ``parked``: a domain-parking host, or a "domain for sale" page.
+- ``blocked``: 401, 403 or 429, which is usually bot protection rather than a dead site.
+- ``error``: any other 4xx/5xx, or too many redirects.
+- ``timeout``
+- ``ref_dropped``: the referral code of a Referral Link no longer appears in the final URL.
+
+Results are stored per row in `LinkHealth`, next to the catalog. A sweep
+checks each distinct URL once:
+
+    python -m reflinks.linkcheck --per-host 2 --report links.json
+"""
+import argparse
+import json
+import re
+import sqlite3
+import sys
+import time
+from urllib.parse import parse_qsl, unquote, urljoin, urlparse
+
+from reflinks.config import CSV_FILE, STATE_FILE
+from reflinks.net import host_of, make_session, normalize_url, run_all
+from reflinks.store import open_catalog
+
+LINK_COLUMNS = {"website": "Official Website", "referral": "Referral Link"}
+MAX_REDIRECTS = 10
+PEEK_BYTES = 16384
+OK, DEAD, PARKED, BLOCKED, ERROR, TIMEOUT, REF_DROPPED = (
+    "ok", "dead", "parked", "blocked", "error", "timeout", "ref_dropped")
+# Statuses that only warn: the link still leads somewhere usable
+WARNING_STATUSES = {BLOCKED, REF_DROPPED}
+PARKING_HOSTS = (
+    "sedoparking.com", "sedo.com", "bodis.com", "parkingcrew.net", "dan.com", "afternic.com",
+    "hugedomains.com", "above.com", "parklogic.com", "undeveloped.com", "domainmarket.com",
+)
+PARKED_PATTERN = re.compile(
+    rb"domain (?:name )?(?:is|may be) for sale|buy this domain|this domain is parked|parked free|"
+    rb"parkingcrew|sedoparking|domain has expired",
+    re.IGNORECASE,
+)
+# Referral codes look like VTY1Y59W or abc_123: no spaces, and a digit or capital letter somewhere
+CODE_PATTERN = re.compile(r"^(?=.*[0-9A-Z])[A-Za-z0-9_-]{4,64}$")
+
+
+def referral_codes(url):
+    """The parts of `url` that look like a referral code (query values, else the last path segment)."""
+    parsed = urlparse(normalize_url(url))
+    codes = [value for _, value in parse_qsl(parsed.query) if CODE_PATTERN.match(value)]
+    if not codes:
+        segment = unquote(parsed.path.rstrip('/').rsplit('/', 1)[-1])
+        if CODE_PATTERN.match(segment):
+            codes.append(segment)
+    return codes
+
+
+def codes_kept(url, final_url):
+    """True/False whether every referral code in `url` survives into `final_url`; None if it has none."""
+    codes = referral_codes(url)
+    if not codes:
+        return None
+    final = unquote(final_url).casefold()
+    return all(code.casefold() in final for code in codes)
+
+
+def _is_parked(final_url, body):
+    host = host_of(final_url)
+    if any(host == parking or host.endswith('.' + parking) for parking in PARKING_HOSTS):
+        return True
+    return bool(body) and PARKED_PATTERN.search(body) is not None
+
+
+def _request(session, url, method, timeout):
+    if method == "head":
+        response = session.head(url, allow_redirects=False, timeout=timeout)
+        # Plenty of servers reject or mishandle HEAD; ask again with GET
+        if response.status_code not in (403, 405, 501):
+            return response
+        response.close()
+    return session.get(url, allow_redirects=False, timeout=timeout, stream=True)
+
+
+def _peek(response):
+    if 'html' not in response.headers.get('content-type', ''):
+        return b''
+    try:
+        return next(response.iter_content(PEEK_BYTES), b'')
+    except Exception:
+        return b''
+    finally:
+        response.close()
+
+
+def classify(http_status, final_url, body=b''):
+    if http_status in (404, 410):
+        return DEAD
+    if http_status in (401, 403, 429):
+        return BLOCKED
+    if http_status is None or http_status >= 400:
+        return ERROR
+    if _is_parked(final_url, body):
+        return PARKED
+    return OK
+
+
+def as_referral(result):
+    """Copy of `result` with the referral-code check applied."""
+    result = dict(result)
+    if result["http_status"] is not None:
+        result["code_kept"] = codes_kept(result["url"], result["final_url"])
+        if result["status"] == OK and result["code_kept"] is False:
+            result["status"] = REF_DROPPED
+    return result
+
+
+def check_url(session, url, timeout=8, method="get"):
+    """Request `url`, following redirects one hop at a time. Returns a result dict."""
+    import requests
+    url = normalize_url(url)
+    result = {"url": url, "status": None, "http_status": None, "final_url": url, "chain": [],
+              "latency_ms": None, "error": "", "code_kept": None, "checked_at": time.time()}
+    if not url:
+        result.update(status=DEAD, error="no URL")
+        return result
+    current = url
+    start = time.monotonic()
+    try:
+        for _ in range(MAX_REDIRECTS + 1):
+            response = _request(session, current, method, timeout)
+            result["chain"].append([response.status_code, current])
+            location = response.headers.get('location')
+            if response.is_redirect and location:
+                response.close()
+                current = urljoin(current, location)
+                continue
+            result["latency_ms"] = round((time.monotonic() - start) * 1000, 1)
+            result["http_status"] = response.status_code
+            result["final_url"] = current
+            body = _peek(response) if response.request.method == "GET" else b''
+            response.close()
+            result["status"] = classify(response.status_code, current, body)
+            return result
+        result.update(status=ERROR, error=f"more than {MAX_REDIRECTS} redirects")
+    except requests.Timeout as e:
+        result.update(status=TIMEOUT, error=str(e))
+    except requests.ConnectionError as e:
+        result.update(status=DEAD, error=str(e))
+    except requests.RequestException as e:
+        result.update(status=ERROR, error=str(e))
+    result["latency_ms"] = round((time.monotonic() - start) * 1000, 1)
+    return result
+
+
+class LinkHealth:
+    """Last check result per row and column, keyed by the catalog row key."""
+
+    def __init__(self, path=STATE_FILE):
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS link_health ("
+            " name TEXT, website TEXT, link TEXT, url TEXT, status TEXT, http_status INTEGER, final_url TEXT,"
+            " chain TEXT, latency_ms REAL, error TEXT, code_kept INTEGER, checked_at REAL,"
+            " PRIMARY KEY (name, website, link))"
+        )
+        self._db.commit()
+
+    def record(self, key, link, result):
+        self.record_many([(key, link, result)])
+
+    def record_many(self, entries):
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO link_health VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(key[0], key[1], link, r["url"], r["status"], r["http_status"], r["final_url"],
+                  json.dumps(r["chain"]), r["latency_ms"], r["error"],
+                  None if r["code_kept"] is None else int(r["code_kept"]), r["checked_at"])
+                 for key, link, r in entries],
+            )
+
+    def get(self, key):
+        """``{link: result}`` for the row with `key`."""
+        rows = self._db.execute(
+            "SELECT link, url, status, http_status, final_url, chain, latency_ms, error, code_kept, checked_at"
+            " FROM link_health WHERE name = ? AND website = ?", (key[0], key[1]),
+        ).fetchall()
+        health = {}
+        for link, url, status, http_status, final_url, chain, latency_ms, error, kept, checked_at in rows:
+            health[link] = {"url": url, "status": status, "http_status": http_status, "final_url": final_url,
+                            "chain": json.loads(chain), "latency_ms": latency_ms, "error": error,
+                            "code_kept": None if kept is None else bool(kept), "checked_at": checked_at}
+        return health
+
+    def statuses(self):
+        """``{(name, website): {link: status}}`` for every checked row, in one query."""
+        statuses = {}
+        for name, website, link, status in self._db.execute("SELECT name, website, link, status FROM link_health"):
+            statuses.setdefault((name, website), {})[link] = status
+        return statuses
+
+    def close(self):
+        self._db.close()
+
+
+def check_links(links, workers=32, per_host=2, host_interval=0.1, timeout=8, deadline=None, method="get",
+                session=None):
+    """Check ``{(row, link): url}`` concurrently; each distinct URL is requested once.
+
+    Returns ``({(row, link): result}, elapsed)``.
+    """
+    if session is None:
+        session = make_session(workers)
+    urls = list(dict.fromkeys(normalize_url(url) for url in links.values()))
+    results, elapsed = run_all(urls, lambda url: check_url(session, url, timeout, method),
+                               workers=workers, per_host=per_host, deadline=deadline, host_interval=host_interval)
+    by_url = {}
+    for url, (ok, value) in zip(urls, results):
+        if not ok:
+            value = {"url": url, "status": TIMEOUT, "http_status": None, "final_url": url, "chain": [],
+                     "latency_ms": None, "error": str(value) or type(value).__name__, "code_kept": None,
+                     "checked_at": time.time()}
+        by_url[url] = value
+    checked = {}
+    for (row, link), url in links.items():
+        result = by_url[normalize_url(url)]
+        checked[(row, link)] = as_referral(result) if link == "referral" else dict(result)
+    return checked, elapsed
+
+
+def check_csv(csv_path=CSV_FILE, links=("website", "referral"), platforms=None, state_path=STATE_FILE, **kwargs):
+    """Check the links of every row (or of `platforms`) and store the results."""
+    catalog = open_catalog(csv_path)
+    if platforms:
+        positions = sorted({pos for name in platforms for pos in catalog.rows_named(name)})
+    else:
+        positions = range(len(catalog))
+    wanted = {}
+    for idx in positions:
+        for link in links:
+            url = str(catalog.get(idx, LINK_COLUMNS[link])).strip()
+            if url and url != 'nan':
+                wanted[(idx, link)] = url
+    results, elapsed = check_links(wanted, **kwargs)
+    if state_path:
+        health = LinkHealth(state_path)
+        health.record_many([(catalog.row_key(idx), link, result) for (idx, link), result in results.items()])
+        health.close()
+    report = [dict(result, row=idx, platform=catalog.get(idx, 'Platform Name'), link=link)
+              for (idx, link), result in sorted(results.items())]
+    catalog.close()
+    return report, elapsed
+
+
+def health_icon(statuses):
+    """The icon the validator shows for a row's link statuses."""
+    statuses = set(statuses)
+    if statuses <= {OK}:
+        return '✅'
+    if statuses <= {OK} | WARNING_STATUSES:
+        return '⚠️'
+    return '❌'
+
+
+def describe(result):
+    """One-line summary of a result for the UI."""
+    text = result["status"]
+    if result.get("http_status"):
+        text += f" ({result['http_status']}"
+        if result.get("latency_ms") is not None:
+            text += f", {result['latency_ms']:.0f} ms"
+        hops = len(result.get("chain", [])) - 1
+        if hops > 0:
+            text += f", {hops} redirect{'s' if hops > 1 else ''}"
+        text += ")"
+    elif result.get("error"):
+        text += f": {result['error'][:80]}"
+    return text
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the Official Website and Referral Link of every row")
+    parser.add_argument("--csv", default=CSV_FILE)
+    parser.add_argument("--links", default="website,referral", help="Comma-separated: website, referral")
+    parser.add_argument("--platform", action="append", help="Only this platform (repeatable)")
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--per-host", type=int, default=2, help="Concurrent requests per host (default: %(default)s)")
+    parser.add_argument("--interval", type=float, default=0.1,
+                        help="Minimum seconds between requests to one host (default: %(default)s)")
+    parser.add_argument("--timeout", type=float, default=8, help="Per-request timeout in seconds (default: %(default)s)")
+    parser.add_argument("--deadline", type=float, default=120, help="Overall time budget in seconds (default: %(default)s)")
+    parser.add_argument("--method", choices=["get", "head"], default="get",
+                        help="GET peeks at the page to spot parked domains; HEAD is lighter (default: %(default)s)")
+    parser.add_argument("--no-save", action="store_true", help="Do not store the results")
+    parser.add_argument("--report", help="Write every result as JSON to this path")
+    args = parser.parse_args(argv)
+
+    links = [link.strip() for link in args.links.split(',') if link.strip()]
+    for link in links:
+        if link not in LINK_COLUMNS:
+            parser.error(f"Unknown link column: {link}")
+    report, elapsed = check_csv(args.csv, links, args.platform, None if args.no_save else STATE_FILE,
+                                workers=args.workers, per_host=args.per_host, host_interval=args.interval,
+                                timeout=args.timeout, deadline=args.deadline, method=args.method)
+    counts = {}
+    for entry in report:
+        counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+        if entry["status"] != OK:
+            print(f"{entry['status'].upper():12} {entry['platform']} [{entry['link']}] {entry['url']} -> "
+                  f"{entry['final_url']} {entry['error'][:100]}")
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"elapsed": round(elapsed, 3), "results": report}, f, indent=2)
+    latencies = sorted(e["latency_ms"] for e in report if e["latency_ms"] is not None)
+    median = f", median latency {latencies[len(latencies) // 2]:.0f} ms" if latencies else ""
+    print(f"Checked {len(report)} links in {elapsed:.1f}s: "
+          + ", ".join(f"{count} {status}" for status, count in sorted(counts.items())) + median)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+"""Shared OpenAI client layer.
+
+`get_client` hands out one `LLMClient` per API key, endpoint and settings. Its
+underlying `openai.OpenAI` client keeps connections open across calls and
+threads. Each client paces requests with a token bucket that is sized from the
+``x-ratelimit-*`` response headers, and retries 429 / 5xx / connection errors
+with jittered exponential backoff, honouring ``Retry-After``. Per-model
+request differences (temperature support, token parameter name, structured
+output) live in `MODEL_CAPABILITIES` instead of ``if model == ...`` branches.
+Completed replies are kept in a `reflinks.llm_cache.LLMCache`.
+"""
+import importlib.util
+import inspect
+import random
+import re
+import threading
+import time
+
+from reflinks import llm_cache, metrics
+
+DEFAULT_CAPABILITIES = {"temperature": True, "token_param": "max_tokens", "structured_output": False}
+MODEL_CAPABILITIES = {
+    "gpt-4": {"temperature": True, "token_param": "max_tokens", "structured_output": False},
+    "gpt-4o": {"temperature": True, "token_param": "max_tokens", "structured_output": True},
+    "o4-mini": {"temperature": False, "token_param": "max_completion_tokens", "structured_output": True},
+    "gpt-3.5-turbo": {"temperature": True, "token_param": "max_tokens", "structured_output": False},
+}
+# openai is imported by the first LLMClient; this only checks that it is installed
+OPENAI_AVAILABLE = importlib.util.find_spec("openai") is not None
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+
+def capabilities(model):
+    return MODEL_CAPABILITIES.get(model, DEFAULT_CAPABILITIES)
+
+
+def parse_duration(value):
+    """Parse OpenAI reset durations such as ``"1s"``, ``"6m0s"`` or ``"250ms"`` into seconds."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    total = 0.0
+    matches = re.findall(r'([\d.]+)(ms|h|m|s)', value)
+    if not matches:
+        return None
+    for number, unit in matches:
+        total += float(number) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[unit]
+    return total
+
+
+class TokenBucket:
+    """Blocking token bucket; ``rate=None`` means unlimited."""
+
+    def __init__(self, rate=None, capacity=None):
+        self._lock = threading.Lock()
+        self.rate = rate
+        self.capacity = capacity or (max(1.0, rate) if rate else None)
+        self.tokens = self.capacity or 0.0
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def set_rate(self, rate, capacity=None):
+        with self._lock:
+            self._refill()
+            self.rate = rate
+            self.capacity = capacity or max(1.0, rate)
+            self.tokens = min(self.tokens, self.capacity)
+
+    def pause(self, seconds):
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                elif not self.rate:
+                    return
+                else:
+                    self._refill()
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class LLMClient:
+    def __init__(self, api_key, base_url=None, max_retries=5, requests_per_minute=None, timeout=60, cache=None):
+        import openai
+        self._openai = openai
+        self.base_url = base_url or ''
+        self.cache = cache
+        kwargs = dict(api_key=api_key, max_retries=0, timeout=timeout)
+        if base_url:
+            kwargs['base_url'] = base_url
+        self.client = openai.OpenAI(**kwargs)
+        self.max_retries = max_retries
+        self.bucket = TokenBucket(requests_per_minute / 60.0 if requests_per_minute else None)
+        self._fixed_rate = bool(requests_per_minute)
+        self.usage = {"requests": 0, "retries": 0, "cache_hits": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        self._usage_lock = threading.Lock()
+
+    def build_params(self, model, prompt, max_tokens, temperature=None, response_format=None):
+        caps = capabilities(model)
+        params = dict(model=model, messages=[{"role": "user", "content": prompt}])
+        params[caps["token_param"]] = max_tokens
+        if temperature is not None and caps["temperature"]:
+            params['temperature'] = temperature
+        if response_format:
+            if response_format.get("type") == "json_schema" and not caps["structured_output"]:
+                response_format = {"type": "json_object"}
+            params['response_format'] = response_format
+        return params
+
+    def _observe(self, headers):
+        """Adapt pacing to the rate-limit headers of a response."""
+        if not headers:
+            return
+        limit = headers.get('x-ratelimit-limit-requests')
+        if limit and not self._fixed_rate:
+            try:
+                self.bucket.set_rate(float(limit) / 60.0)
+            except ValueError:
+                pass
+        for kind in ('requests', 'tokens'):
+            remaining = headers.get(f'x-ratelimit-remaining-{kind}')
+            if remaining is not None and remaining.strip() in ('0', '0.0'):
+                reset = parse_duration(headers.get(f'x-ratelimit-reset-{kind}'))
+                if reset:
+                    self.bucket.pause(reset)
+
+    def _backoff(self, attempt, error):
+        retry_after = None
+        response = getattr(error, 'response', None)
+        if response is not None:
+            headers = response.headers
+            if headers.get('retry-after-ms'):
+                retry_after = parse_duration(headers['retry-after-ms'] + 'ms')
+            else:
+                retry_after = parse_duration(headers.get('retry-after'))
+            self._observe(headers)
+        if retry_after is None:
+            retry_after = min(30.0, 0.5 * 2 ** attempt)
+        # Jitter keeps parallel workers from retrying in lockstep
+        return retry_after + random.uniform(0, retry_after * 0.5)
+
+    def _retryable(self, error):
+        if isinstance(error, (self._openai.APIConnectionError, self._openai.APITimeoutError)):
+            return True
+        status = getattr(error, 'status_code', None)
+        return status in RETRY_STATUSES
+
+    def create(self, **params):
+        """``chat.completions.create`` with pacing and retries; returns the completion."""
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            try:
+                raw = self.client.chat.completions.with_raw_response.create(**params)
+            except Exception as e:
+                if attempt >= self.max_retries or not self._retryable(e):
+                    raise
+                delay = self._backoff(attempt, e)
+                attempt += 1
+                with self._usage_lock:
+                    self.usage["retries"] += 1
+                time.sleep(delay)
+                continue
+            self._observe(raw.headers)
+            completion = raw.parse()
+            with self._usage_lock:
+                self.usage["requests"] += 1
+                if getattr(completion, 'usage', None):
+                    self.usage["prompt_tokens"] += completion.usage.prompt_tokens or 0
+                    self.usage["completion_tokens"] += completion.usage.completion_tokens or 0
+            return completion
+
+    def chat(self, model, prompt, max_tokens, temperature=None, response_format=None, fresh=False):
+        """Return the reply text, from the result cache when possible.
+
+        `fresh` skips the cache lookup (a new variant is requested and then
+        stored in place of the old one).
+        """
+        params = self.build_params(model, prompt, max_tokens, temperature, response_format)
+        with metrics.span("llm.chat", model=model, cached=False) as span:
+            key = None
+            if self.cache is not None:
+                key = llm_cache.cache_key(params, self.base_url)
+                if not fresh:
+                    content = self.cache.get(key)
+                    if content is not None:
+                        with self._usage_lock:
+                            self.usage["cache_hits"] += 1
+                        span["cached"] = True
+                        return content
+            completion = self.create(**params)
+            if getattr(completion, 'usage', None):
+                span["prompt_tokens"] = completion.usage.prompt_tokens or 0
+                span["completion_tokens"] = completion.usage.completion_tokens or 0
+            content = completion.choices[0].message.content
+            if key is not None and content:
+                self.cache.put(key, content, model)
+            return content
+
+    def validate(self):
+        self.client.models.list()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+_default_cache = None
+
+
+def default_cache():
+    global _default_cache
+    with _clients_lock:
+        if _default_cache is None:
+            _default_cache = llm_cache.LLMCache()
+        return _default_cache
+
+
+def get_client(api_key, base_url=None, use_cache=True, **kwargs):
+    """Return the shared client for this key, endpoint and settings, creating it on first use.
+
+    `kwargs` (``requests_per_minute``, ``max_retries``, ``timeout``) are part of
+    the key, so a caller asking for a different pace gets a client with that pace.
+    """
+    cache = default_cache() if use_cache else None
+    settings = inspect.signature(LLMClient).bind_partial(api_key, base_url, **kwargs)
+    settings.apply_defaults()
+    key = tuple(sorted((name, value) for name, value in settings.arguments.items() if name != 'cache'))
+    with _clients_lock:
+        client = _clients.get((key, use_cache))
+        if client is None:
+            client = LLMClient(api_key, base_url, cache=cache, **kwargs)
+            _clients[(key, use_cache)] = client
+        return client
@@ -0,0 +1,94 @@
+"""Persistent cache of OpenAI completions.
+
+A result is stored under a SHA-256 of the endpoint and the exact request
+parameters (model, final prompt, token limit, temperature, response format).
+Re-running a generation for a row whose name, website and prompt have not
+changed is answered from here instead of being billed again. Entries expire
+after `ttl` seconds, and the least recently used ones are dropped beyond
+`max_entries`.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from reflinks.config import CACHE_DIR
+
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 20000
+
+
+def cache_key(params, namespace=''):
+    payload = json.dumps(params, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(f"{namespace}\n{payload}".encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, path=os.path.join(CACHE_DIR, "llm.sqlite"), ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS completions ("
+            " key TEXT PRIMARY KEY, model TEXT, content TEXT, created REAL, last_access REAL)"
+        )
+        self._db.commit()
+        self._puts = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT content, created FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is None or (self.ttl and now - row[1] > self.ttl):
+                if row is not None:
+                    self._db.execute("DELETE FROM completions WHERE key = ?", (key,))
+                    self._db.commit()
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE completions SET last_access = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, content, model=''):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?, ?)", (key, model, content, now, now)
+            )
+            self._db.commit()
+            self._puts += 1
+            # Eviction scans the table, so only do it every so often
+            if self._puts % 100 == 1:
+                self._evict_locked(now)
+
+    def _evict_locked(self, now):
+        if self.ttl:
+            self._db.execute("DELETE FROM completions WHERE created < ?", (now - self.ttl,))
+        if self.max_entries:
+            self._db.execute(
+                "DELETE FROM completions WHERE key IN ("
+                " SELECT key FROM completions ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+        self._db.commit()
+
+    def evict(self):
+        with self._lock:
+            self._evict_locked(time.time())
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM completions")
+            self._db.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
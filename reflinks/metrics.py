@@ -0,0 +1,138 @@
+"""Lightweight timing spans for the validator and the CLI tools.
+
+Code that is worth measuring runs inside ``with metrics.span(name, **attrs)``;
+the span records how long the block took, whether it raised, and any
+attributes set on it (row counts, HTTP status, token counts). Spans go into
+the process-wide `METRICS` recorder, which keeps per-name totals for the whole
+session plus the most recent individual spans. It is thread-safe, since HTTP
+fetches, OpenAI calls and image decodes run on worker threads.
+
+Names are dotted by area: ``catalog.*`` (CSV load and save), ``image.*``
+(decode, scale, ingest), ``http.*`` (every request made through
+`reflinks.net.make_session`), ``llm.*`` (every OpenAI call, with
+``prompt_tokens`` / ``completion_tokens``) and ``ui.*`` (validator actions).
+`Metrics.dump` writes the summary and the spans as JSON, or the spans as CSV.
+"""
+import csv
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+MAX_SPANS = 20000
+# Durations kept per name for percentiles
+MAX_SAMPLES = 2000
+# Numeric attributes summed per name in the summary
+TOTALED_ATTRS = ("prompt_tokens", "completion_tokens", "bytes", "rows")
+SUMMARY_FIELDS = ("name", "count", "errors", "total_s", "mean_ms", "p50_ms", "p95_ms", "max_ms") + TOTALED_ATTRS
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Metrics:
+    def __init__(self, max_spans=MAX_SPANS):
+        self._lock = threading.Lock()
+        self._spans = deque(maxlen=max_spans)
+        self._totals = {}
+        self.started_at = time.time()
+
+    def record(self, name, duration, error=None, **attrs):
+        """Add a finished span of `duration` seconds."""
+        span = {"name": name, "start": time.time() - duration, "duration_s": duration,
+                "ok": error is None, "error": error}
+        span.update((key, value) for key, value in attrs.items() if key not in span)
+        with self._lock:
+            self._spans.append(span)
+            totals = self._totals.get(name)
+            if totals is None:
+                totals = self._totals[name] = {"count": 0, "errors": 0, "total_s": 0.0, "max_s": 0.0,
+                                               "samples": deque(maxlen=MAX_SAMPLES),
+                                               **{attr: 0 for attr in TOTALED_ATTRS}}
+            totals["count"] += 1
+            totals["errors"] += error is not None
+            totals["total_s"] += duration
+            totals["max_s"] = max(totals["max_s"], duration)
+            totals["samples"].append(duration)
+            for attr in TOTALED_ATTRS:
+                value = attrs.get(attr)
+                if isinstance(value, (int, float)):
+                    totals[attr] += value
+        return span
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """Time the block. Yields a dict; keys set on it are stored with the span."""
+        start = time.perf_counter()
+        error = None
+        try:
+            yield attrs
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start, error, **attrs)
+
+    def timed(self, name):
+        """Decorator: every call of the function is a span called `name`."""
+        def decorate(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def spans(self):
+        with self._lock:
+            return list(self._spans)
+
+    def summary(self):
+        """One dict per span name (see `SUMMARY_FIELDS`), slowest total first."""
+        with self._lock:
+            items = [(name, dict(totals, samples=list(totals["samples"]))) for name, totals in self._totals.items()]
+        rows = []
+        for name, totals in items:
+            samples = totals["samples"]
+            rows.append({
+                "name": name, "count": totals["count"], "errors": totals["errors"],
+                "total_s": round(totals["total_s"], 6),
+                "mean_ms": round(totals["total_s"] / totals["count"] * 1000, 3),
+                "p50_ms": round(_percentile(samples, 0.5) * 1000, 3),
+                "p95_ms": round(_percentile(samples, 0.95) * 1000, 3),
+                "max_ms": round(totals["max_s"] * 1000, 3),
+                **{attr: totals[attr] for attr in TOTALED_ATTRS},
+            })
+        rows.sort(key=lambda row: row["total_s"], reverse=True)
+        return rows
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+            self._totals.clear()
+            self.started_at = time.time()
+
+    def dump(self, path):
+        """Write the metrics to `path`: spans as CSV for ``.csv``, otherwise summary and spans as JSON."""
+        spans = self.spans()
+        if path.lower().endswith('.csv'):
+            extra = sorted({key for span in spans for key in span} - {"name", "start", "duration_s", "ok", "error"})
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, ["name", "start", "duration_s", "ok", "error"] + extra)
+                writer.writeheader()
+                writer.writerows(spans)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"started_at": self.started_at, "dumped_at": time.time(),
+                           "summary": self.summary(), "spans": spans}, f, indent=1, default=str)
+        return len(spans)
+
+
+METRICS = Metrics()
+span = METRICS.span
+record = METRICS.record
+timed = METRICS.timed
@@ -0,0 +1,113 @@
+"""Shared HTTP plumbing: a pooled requests session and an asyncio fan-out helper.
+
+`run_all` drives blocking fetch functions from an asyncio loop on a bounded
+thread pool, with a per-host concurrency cap and one overall deadline. The
+blocking calls share a single keep-alive session, so a sweep over the whole
+catalog reuses connections instead of opening one per request. Every
+request made through `make_session` is timed as a `reflinks.metrics` span.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from reflinks import metrics
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+
+def make_session(pool_size=32):
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    session.request = _timed(session.request)
+    return session
+
+
+def _timed(request):
+    # Every request made through the session becomes an ``http.<method>`` span
+    def timed_request(method, url, *args, **kwargs):
+        with metrics.span(f"http.{method.lower()}", host=host_of(url)) as span:
+            response = request(method, url, *args, **kwargs)
+            span["status"] = response.status_code
+            return response
+    return timed_request
+
+
+def normalize_url(url):
+    url = (url or "").strip()
+    if url and not url.startswith("http"):
+        url = "https://" + url
+    return url
+
+
+def host_of(url):
+    return urlparse(normalize_url(url)).netloc.lower()
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+async def _run_all(items, func, key, workers, per_host, deadline, host_interval, stop):
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=max(1, workers))
+    host_limits = {}
+    host_next = {}
+    start = time.monotonic()
+
+    async def run_one(item):
+        host = key(item)
+        if host not in host_limits:
+            host_limits[host] = asyncio.Semaphore(per_host)
+        async with host_limits[host]:
+            if host_interval:
+                # Space out request starts to the same host
+                now = loop.time()
+                slot = max(now, host_next.get(host, now))
+                host_next[host] = slot + host_interval
+                if slot > now:
+                    await asyncio.sleep(slot - now)
+            return await loop.run_in_executor(executor, func, item)
+
+    tasks = [asyncio.ensure_future(run_one(item)) for item in items]
+    results = [None] * len(tasks)
+    try:
+        if tasks:
+            done, pending = await asyncio.wait(tasks, timeout=deadline)
+            if pending and stop is not None:
+                stop.set()
+            for task in pending:
+                task.cancel()
+        for i, task in enumerate(tasks):
+            if task.cancelled() or not task.done():
+                results[i] = (False, DeadlineExceeded(f"deadline of {deadline}s exceeded"))
+            elif task.exception() is not None:
+                results[i] = (False, task.exception())
+            else:
+                results[i] = (True, task.result())
+    finally:
+        # Threads already running a request finish in the background; queued ones are dropped
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results, time.monotonic() - start
+
+
+def run_all(items, func, key=host_of, workers=16, per_host=2, deadline=None, host_interval=0, stop=None):
+    """Call ``func(item)`` for every item concurrently.
+
+    At most `workers` calls run at once, and at most `per_host` share the
+    same ``key(item)``; calls with the same key also start at least
+    `host_interval` seconds apart. Calls still unfinished after `deadline` seconds are
+    reported as `DeadlineExceeded`. Returns ``(results, elapsed)`` where
+    results holds one ``(ok, value_or_exception)`` pair per item, in order.
+
+    A call that is already running when the deadline passes cannot be
+    interrupted and keeps going in the background. If `func` has side effects,
+    pass a `threading.Event` as `stop`. It is set at the deadline, and `func`
+    should check it before writing anything.
+    """
+    return asyncio.run(_run_all(list(items), func, key, workers, per_host, deadline, host_interval, stop))
@@ -0,0 +1,280 @@
+"""Perceptual-hash index over the logos and favicons.
+
+Every image gets a 64-bit DCT hash (transparent areas flattened onto white),
+so resized or re-encoded copies of the same picture end up a few bits apart.
+Hashes are stored per file content (the SHA-256 from `reflinks.assets`) and
+only new images are decoded. Comparisons run on numpy arrays of hashes,
+block by block, instead of pair by pair.
+
+Two kinds of findings are reported:
+
+- rows of different platforms whose logo (or favicon) is the same picture,
+  which usually means one of them got the wrong image; pairs that
+  `reflinks.dedupe` considers the same platform are marked as such;
+- per row, an unused favicon on disk that matches its logo (or an unused logo
+  that matches its favicon) clearly better than what the row has. ``--apply``
+  fills empty or broken Logo / Favicon cells from these proposals.
+
+    python -m reflinks.phash
+    python -m reflinks.phash --apply
+"""
+import argparse
+import os
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from reflinks import dedupe
+from reflinks.assets import Manifest, list_images
+from reflinks.config import CACHE_DIR, CSV_FILE, FAVICON_DIR, LOGO_DIR
+from reflinks.favicons import favicon_column
+from reflinks.store import open_catalog
+
+HASH_SIZE = 8
+DCT_SIZE = 32
+# Hamming distances (out of 64 bits)
+DUPLICATE_DISTANCE = 4
+MATCH_DISTANCE = 6
+MARGIN = 6
+BLOCK_ROWS = 1024
+
+
+def _dct_matrix(n):
+    import numpy as np
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    return np.cos(np.pi * (2 * i + 1) * k / (2 * n))
+
+
+def image_hash(path):
+    """64-bit perceptual hash of the image at `path`."""
+    import numpy as np
+    from PIL import Image
+    img = Image.open(path).convert('RGBA')
+    background = Image.new('RGBA', img.size, (255, 255, 255, 255))
+    gray = Image.alpha_composite(background, img).convert('L').resize((DCT_SIZE, DCT_SIZE), Image.LANCZOS)
+    dct = _dct_matrix(DCT_SIZE)
+    coefficients = dct @ np.asarray(gray, dtype=np.float64) @ dct.T
+    low = coefficients[:HASH_SIZE, :HASH_SIZE].ravel()
+    bits = low > np.median(low)
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def _hash_job(path):
+    try:
+        return path, image_hash(path), None
+    except Exception as e:
+        return path, None, str(e)
+
+
+class HashStore:
+    """Perceptual hashes keyed by content SHA-256, next to the asset manifest."""
+
+    def __init__(self, path=os.path.join(CACHE_DIR, "assets.sqlite")):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.execute("CREATE TABLE IF NOT EXISTS phash (sha256 TEXT PRIMARY KEY, hash TEXT)")
+        self._db.commit()
+        self.computed = 0
+        self.errors = {}
+
+    def hashes(self, paths, workers=None):
+        """``{path: hash}`` for the images in `paths` that could be decoded."""
+        manifest = Manifest(self.path)
+        try:
+            digests = manifest.scan(paths, prune=False)
+        finally:
+            manifest.close()
+        known = dict(self._db.execute("SELECT sha256, hash FROM phash"))
+        todo = {}
+        for path, (_, sha) in digests.items():
+            if sha not in known:
+                todo.setdefault(sha, path)
+        if todo:
+            if len(todo) > 16:
+                with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+                    results = list(pool.map(_hash_job, todo.values(), chunksize=8))
+            else:
+                results = [_hash_job(path) for path in todo.values()]
+            by_path = {path: sha for sha, path in todo.items()}
+            new = []
+            for path, value, error in results:
+                if error:
+                    self.errors[path] = error
+                else:
+                    new.append((by_path[path], f"{value:016x}"))
+            with self._db:
+                self._db.executemany("INSERT OR REPLACE INTO phash VALUES (?, ?)", new)
+            known.update(new)
+            self.computed += len(new)
+        return {path: int(known[sha], 16) for path, (_, sha) in digests.items() if sha in known}
+
+    def close(self):
+        self._db.close()
+
+
+def as_array(values):
+    import numpy as np
+    return np.array(values, dtype=np.uint64)
+
+
+def hamming(a, b):
+    """Pairwise Hamming distances between two uint64 arrays, shape ``(len(a), len(b))``."""
+    import numpy as np
+    x = a[:, None] ^ b[None, :]
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(x).astype(np.int16)
+    # numpy < 2.0: count bits byte by byte
+    table = np.array([bin(i).count('1') for i in range(256)], dtype=np.int16)
+    return table[x.view(np.uint8)].reshape(x.shape + (8,)).sum(axis=-1)
+
+
+def close_pairs(hashes, max_distance=DUPLICATE_DISTANCE, block=BLOCK_ROWS):
+    """``[(i, j, distance)]`` with ``i < j`` for every pair within `max_distance`."""
+    import numpy as np
+    pairs = []
+    for start in range(0, len(hashes), block):
+        # Only the upper triangle: later hashes were already compared with earlier blocks
+        distances = hamming(hashes[start:start + block], hashes[start:])
+        rows, cols = np.nonzero(distances <= max_distance)
+        for i, j in zip(rows, cols):
+            if i < j:
+                pairs.append((int(i + start), int(j + start), int(distances[i, j])))
+    return pairs
+
+
+def nearest(queries, candidates, block=BLOCK_ROWS):
+    """For each query hash, ``(index, distance)`` of the closest candidate."""
+    import numpy as np
+    best_index = np.zeros(len(queries), dtype=np.int64)
+    best_distance = np.full(len(queries), 65, dtype=np.int16)
+    if not len(candidates):
+        return best_index, best_distance
+    for start in range(0, len(queries), block):
+        distances = hamming(queries[start:start + block], candidates)
+        best_index[start:start + block] = distances.argmin(axis=1)
+        best_distance[start:start + block] = distances.min(axis=1)
+    return best_index, best_distance
+
+
+def row_hashes(values, directory, hashes):
+    """``(positions, hashes)`` of the rows whose cell names an image in `hashes`."""
+    positions, found = [], []
+    for pos, value in enumerate(values):
+        value = value.strip()
+        path = os.path.join(directory, value) if value else None
+        if path in hashes:
+            positions.append(pos)
+            found.append(hashes[path])
+    return positions, as_array(found)
+
+
+def analyze(catalog, logo_dir=LOGO_DIR, favicon_dir=FAVICON_DIR, store=None, workers=None,
+            duplicate_distance=DUPLICATE_DISTANCE, match_distance=MATCH_DISTANCE):
+    """Look for shared pictures across platforms and propose logo/favicon pairs.
+
+    Returns ``{"duplicates": [...], "proposals": [...], "stats": {...}}``.
+    """
+    store = store or HashStore()
+    names = catalog.column('Platform Name')
+    columns = {"logo": ('Logo', logo_dir), "favicon": (favicon_column(catalog.columns), favicon_dir)}
+    files = {kind: list_images(directory)[0] for kind, (_, directory) in columns.items()}
+    hashes = store.hashes(files["logo"] + files["favicon"], workers)
+
+    clusters, _ = dedupe.find_clusters(names, catalog.column('Official Website'))
+    same_platform = {pos: n for n, cluster in enumerate(clusters) for pos in cluster["rows"]}
+
+    report = {"duplicates": [], "proposals": []}
+    assigned = {}
+    for kind, (column, directory) in columns.items():
+        values = catalog.column(column)
+        positions, row_hash = row_hashes(values, directory, hashes)
+        assigned[kind] = (column, values, dict(zip(positions, row_hash.tolist())))
+        for i, j, distance in close_pairs(row_hash, duplicate_distance):
+            a, b = positions[i], positions[j]
+            if names[a] == names[b]:
+                continue
+            report["duplicates"].append({
+                "kind": kind, "rows": [a, b], "platforms": [names[a], names[b]],
+                "files": [values[a], values[b]], "distance": distance,
+                "same_platform": a in same_platform and same_platform.get(a) == same_platform.get(b),
+            })
+
+    for kind, other in (("logo", "favicon"), ("favicon", "logo")):
+        _, _, own = assigned[kind]
+        other_column, other_values, other_own = assigned[other]
+        # Only images no row uses yet; proposing another platform's image would just move the problem
+        used = {value.strip() for value in other_values}
+        candidates = [path for path in files[other] if path in hashes and os.path.basename(path) not in used]
+        if not own or not candidates:
+            continue
+        positions = sorted(own)
+        index, distance = nearest(as_array([own[pos] for pos in positions]),
+                                  as_array([hashes[path] for path in candidates]))
+        for pos, i, d in zip(positions, index.tolist(), distance.tolist()):
+            if d > match_distance:
+                continue
+            current = other_values[pos].strip()
+            if pos in other_own:
+                current_distance = int(hamming(as_array([own[pos]]), as_array([other_own[pos]]))[0, 0])
+                if d + MARGIN > current_distance:
+                    continue
+                reason = f"matches the {kind} better than {current} ({current_distance} bits)"
+            else:
+                reason = "missing" if current else "empty"
+            report["proposals"].append({"row": pos, "platform": names[pos], "column": other_column,
+                                        "current": current, "proposed": os.path.basename(candidates[i]),
+                                        "distance": d, "reason": reason})
+    report["proposals"].sort(key=lambda p: (p["row"], p["column"]))
+    report["stats"] = {"images": len(hashes), "computed": store.computed, "errors": store.errors}
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find logos and favicons shared between platforms and propose matches")
+    parser.add_argument("--csv", default=CSV_FILE, help="CSV file (default: %(default)s)")
+    parser.add_argument("--store", help="SQLite working store to use instead of the CSV, if it exists")
+    parser.add_argument("--logo-dir", default=LOGO_DIR)
+    parser.add_argument("--favicon-dir", default=FAVICON_DIR)
+    parser.add_argument("--cache", default=os.path.join(CACHE_DIR, "assets.sqlite"))
+    parser.add_argument("--workers", type=int, help="Worker processes for hashing (default: one per core)")
+    parser.add_argument("--distance", type=int, default=DUPLICATE_DISTANCE,
+                        help="Max differing bits for two images to count as the same (default: %(default)s)")
+    parser.add_argument("--match-distance", type=int, default=MATCH_DISTANCE,
+                        help="Max differing bits for a logo/favicon proposal (default: %(default)s)")
+    parser.add_argument("--apply", action="store_true", help="Fill empty or broken Logo / Favicon cells from proposals")
+    args = parser.parse_args(argv)
+
+    catalog = open_catalog(args.csv, args.store)
+    store = HashStore(args.cache)
+    try:
+        report = analyze(catalog, args.logo_dir, args.favicon_dir, store, args.workers,
+                         args.distance, args.match_distance)
+        for dup in report["duplicates"]:
+            note = " (likely the same platform)" if dup["same_platform"] else ""
+            print(f"same {dup['kind']}: {dup['platforms'][0]!r} {dup['files'][0]} ~ "
+                  f"{dup['platforms'][1]!r} {dup['files'][1]}, {dup['distance']} bits{note}")
+        for p in report["proposals"]:
+            print(f"row {p['row'] + 1} {p['platform']!r}: {p['column']} {p['current'] or '(empty)'} -> "
+                  f"{p['proposed']} ({p['distance']} bits; {p['reason']})")
+        for path, error in report["stats"]["errors"].items():
+            print(f"Could not decode {path}: {error}")
+        suspicious = sum(not d["same_platform"] for d in report["duplicates"])
+        print(f"{report['stats']['images']} images ({report['stats']['computed']} hashed): "
+              f"{len(report['duplicates'])} shared pictures ({suspicious} across different platforms), "
+              f"{len(report['proposals'])} proposals")
+        if args.apply:
+            fill = [p for p in report["proposals"] if p["reason"] in ("missing", "empty")]
+            with catalog.batch():
+                for p in fill:
+                    catalog.set(p["row"], p["column"], p["proposed"])
+            print(f"Filled {len(fill)} cells")
+    finally:
+        store.close()
+        catalog.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
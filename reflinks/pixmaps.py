@@ -0,0 +1,126 @@
+"""Pre-scaled pixmap cache for the validator's logo and favicon labels.
+
+Entries are keyed by path, modification time and display size, so replacing a
+file on disk invalidates its entry. When `reflinks.images` has written an
+up-to-date thumbnail next to the asset, it is decoded instead of the full-size
+file. `prefetch` decodes and scales images on a QThreadPool of its own and hands
+them back to the UI thread, where they become pixmaps; `loaded` fires once
+they are in the cache.
+"""
+import os
+from collections import OrderedDict
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap
+
+from reflinks import metrics
+from reflinks.images import thumb_path
+
+
+def _cache_key(path, size):
+    try:
+        return path, os.stat(path).st_mtime_ns, size
+    except OSError:
+        return None
+
+
+def load_scaled(path, size):
+    """Decode `path` (or its thumbnail) into a QImage scaled to fit `size`."""
+    source = path
+    thumb = thumb_path(path)
+    try:
+        if os.stat(thumb).st_mtime_ns >= os.stat(path).st_mtime_ns:
+            source = thumb
+    except OSError:
+        pass
+    with metrics.span("image.decode", thumb=source != path) as span:
+        image = QImage(source)
+        span["decoded"] = not image.isNull()
+    if image.isNull():
+        return None
+    with metrics.span("image.scale", width=image.width(), height=image.height()):
+        return image.scaled(size[0], size[1], Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+
+class _Signals(QObject):
+    loaded = pyqtSignal(object, object)
+
+
+class _Loader(QRunnable):
+    def __init__(self, key, signals):
+        super().__init__()
+        self.key = key
+        self.signals = signals
+
+    def run(self):
+        path, _, size = self.key
+        self.signals.loaded.emit(self.key, load_scaled(path, size))
+
+
+class PixmapCache:
+    def __init__(self, capacity=256, pool=None):
+        self.capacity = capacity
+        # Not the global pool: Qt's own image conversions wait on it while the UI
+        # thread holds the GIL, and a loader parked there waiting for the GIL deadlocks
+        self.pool = pool or QThreadPool()
+        self._pixmaps = OrderedDict()
+        self._pending = set()
+        self._signals = _Signals()
+        self._signals.loaded.connect(self._on_loaded)
+        # Connected after _on_loaded, so listeners find the pixmap already cached
+        self.loaded = self._signals.loaded
+        self.hits = 0
+        self.misses = 0
+
+    def _put(self, key, pixmap):
+        self._pixmaps[key] = pixmap
+        self._pixmaps.move_to_end(key)
+        while len(self._pixmaps) > self.capacity:
+            self._pixmaps.popitem(last=False)
+
+    def _on_loaded(self, key, image):
+        self._pending.discard(key)
+        if image is not None and key not in self._pixmaps:
+            self._put(key, QPixmap.fromImage(image))
+
+    def get(self, path, size):
+        """Return a pixmap of `path` scaled to fit `size`, or None if it cannot be loaded."""
+        if not path:
+            return None
+        key = _cache_key(path, size)
+        if key is None:
+            return None
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self.hits += 1
+            self._pixmaps.move_to_end(key)
+            return pixmap
+        self.misses += 1
+        image = load_scaled(path, size)
+        if image is None:
+            return None
+        pixmap = QPixmap.fromImage(image)
+        self._put(key, pixmap)
+        return pixmap
+
+    def peek(self, path, size):
+        """The cached pixmap of `path` at `size`, or None; never decodes."""
+        key = _cache_key(path, size) if path else None
+        pixmap = self._pixmaps.get(key) if key is not None else None
+        if pixmap is not None:
+            self._pixmaps.move_to_end(key)
+        return pixmap
+
+    def prefetch(self, items):
+        """Warm the cache for ``(path, size)`` pairs in the background."""
+        for path, size in items:
+            if not path:
+                continue
+            key = _cache_key(path, size)
+            if key is None or key in self._pixmaps or key in self._pending:
+                continue
+            self._pending.add(key)
+            self.pool.start(_Loader(key, self._signals))
+
+    def clear(self):
+        self._pixmaps.clear()
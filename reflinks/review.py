@@ -0,0 +1,156 @@
+"""Persistent review progress for the validator.
+
+`ReviewState` records, per catalog row key, which checks have been done and
+when. A saved row counts as reviewed, and a passing website check verifies
+the website. It also records the row the last session ended on. Everything
+lives in the state database next to the catalog, so a session resumes where
+the previous one stopped.
+
+`ReviewQueue` is a sorted index of the rows that still need attention: never
+reviewed, or reviewed longer ago than `max_age`. "Next unreviewed" is then a
+binary search instead of a walk over the catalog:
+
+    python -m reflinks.review --list 20
+"""
+import argparse
+import bisect
+import json
+import sqlite3
+import sys
+import time
+
+from reflinks.config import CSV_FILE, STATE_FILE
+from reflinks.store import open_catalog
+
+ROW = "row"
+WEBSITE = "website"
+DEFAULT_MAX_AGE = 90 * 24 * 3600
+
+
+class ReviewState:
+    def __init__(self, path=STATE_FILE):
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS verification ("
+            " name TEXT, website TEXT, item TEXT, verified_at REAL, PRIMARY KEY (name, website, item))"
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS session (key TEXT PRIMARY KEY, value TEXT)")
+        self._db.commit()
+        # Small enough to keep in memory; lookups happen on every navigation
+        self._marks = {}
+        for name, website, item, verified_at in self._db.execute("SELECT * FROM verification"):
+            self._marks.setdefault((name, website), {})[item] = verified_at
+
+    def verified_at(self, key, item=ROW):
+        return self._marks.get(tuple(key[:2]), {}).get(item)
+
+    def is_verified(self, key, item=ROW, max_age=None):
+        verified_at = self.verified_at(key, item)
+        return verified_at is not None and (max_age is None or time.time() - verified_at <= max_age)
+
+    def mark(self, key, item=ROW, when=None):
+        when = time.time() if when is None else when
+        self._marks.setdefault(tuple(key[:2]), {})[item] = when
+        with self._db:
+            self._db.execute("INSERT OR REPLACE INTO verification VALUES (?, ?, ?, ?)", (key[0], key[1], item, when))
+
+    def unmark(self, key, item=ROW):
+        self._marks.get(tuple(key[:2]), {}).pop(item, None)
+        with self._db:
+            self._db.execute("DELETE FROM verification WHERE name = ? AND website = ? AND item = ?",
+                             (key[0], key[1], item))
+
+    def rekey(self, old_key, new_key):
+        """Carry the marks of a row over to its new key after its name or website changed."""
+        old, new = tuple(old_key[:2]), tuple(new_key[:2])
+        if old == new or old not in self._marks:
+            return
+        self._marks.setdefault(new, {}).update(self._marks.pop(old))
+        with self._db:
+            self._db.execute("UPDATE OR REPLACE verification SET name = ?, website = ? WHERE name = ? AND website = ?",
+                             new + old)
+
+    def save_position(self, key, idx):
+        with self._db:
+            self._db.execute("INSERT OR REPLACE INTO session VALUES ('position', ?)",
+                             (json.dumps({"key": list(key), "index": idx}),))
+
+    def last_position(self):
+        """``(key, index)`` of the row the last session ended on, or ``(None, 0)``."""
+        row = self._db.execute("SELECT value FROM session WHERE key = 'position'").fetchone()
+        if row is None:
+            return None, 0
+        position = json.loads(row[0])
+        return tuple(position["key"]), position["index"]
+
+    def close(self):
+        self._db.close()
+
+
+class ReviewQueue:
+    """Sorted positions of the rows that need attention."""
+
+    def __init__(self, catalog, state, max_age=DEFAULT_MAX_AGE):
+        self.catalog = catalog
+        self.state = state
+        self.max_age = max_age
+        self.rebuild()
+
+    def needs_attention(self, pos):
+        return not self.state.is_verified(self.catalog.row_key(pos), ROW, self.max_age)
+
+    def rebuild(self):
+        self._pending = [pos for pos in range(len(self.catalog)) if self.needs_attention(pos)]
+
+    def update(self, pos):
+        """Re-evaluate one row after it was reviewed or edited."""
+        i = bisect.bisect_left(self._pending, pos)
+        present = i < len(self._pending) and self._pending[i] == pos
+        if self.needs_attention(pos):
+            if not present:
+                self._pending.insert(i, pos)
+        elif present:
+            del self._pending[i]
+
+    def next_after(self, pos):
+        """The first pending row after `pos`, wrapping around; None when everything is reviewed."""
+        if not self._pending:
+            return None
+        i = bisect.bisect_right(self._pending, pos)
+        return self._pending[i] if i < len(self._pending) else self._pending[0]
+
+    def pending(self):
+        return list(self._pending)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def __contains__(self, pos):
+        i = bisect.bisect_left(self._pending, pos)
+        return i < len(self._pending) and self._pending[i] == pos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show review progress for ref_links.csv")
+    parser.add_argument("--csv", default=CSV_FILE)
+    parser.add_argument("--state", default=STATE_FILE)
+    parser.add_argument("--max-age-days", type=float, default=DEFAULT_MAX_AGE / 86400,
+                        help="Reviews older than this need attention again (default: %(default)s)")
+    parser.add_argument("--list", type=int, default=0, metavar="N", help="Print the first N rows that need attention")
+    args = parser.parse_args(argv)
+
+    catalog = open_catalog(args.csv)
+    state = ReviewState(args.state)
+    queue = ReviewQueue(catalog, state, args.max_age_days * 86400)
+    print(f"{len(catalog) - len(queue)}/{len(catalog)} rows reviewed, {len(queue)} need attention")
+    for pos in queue.pending()[:args.list]:
+        verified_at = state.verified_at(catalog.row_key(pos))
+        when = time.strftime('%Y-%m-%d', time.localtime(verified_at)) if verified_at else "never"
+        print(f"{pos + 1:5}  {catalog.get(pos, 'Platform Name')}  (last reviewed: {when})")
+    state.close()
+    catalog.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
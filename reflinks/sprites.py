@@ -0,0 +1,171 @@
+"""Sprite sheets of the logo and favicon thumbnails for the frontend.
+
+Packs the thumbnail of every logo and favicon named in ref_links.csv into a
+few fixed-grid sheets and writes ``sprites.json``, which maps each CSV file
+name to its sheet and offset:
+
+    {"logos": {"cell": [100, 100], "sheets": ["logos-0.3f2a9c1b7d.png"],
+               "icons": {"logo_Coinbase.png": {"sheet": 0, "x": 0, "y": 0}}},
+     "favicons": {...}}
+
+Sheet names carry a hash of their contents, so they can be served with a
+long cache lifetime; a page then needs a handful of requests instead of one
+per image. Thumbnails written by `reflinks.images` are reused, others are
+rendered the same way on the fly. Identical icons share one cell.
+
+    python -m reflinks.sprites
+    python -m reflinks.sprites --format webp --per-sheet 400
+"""
+import argparse
+import hashlib
+import io
+import json
+import math
+import os
+import sys
+
+from reflinks import images
+from reflinks.config import CSV_FILE, FAVICON_DIR, LOGO_DIR, SPRITE_DIR
+from reflinks.favicons import favicon_column
+from reflinks.store import open_catalog
+
+ICONS_PER_SHEET = 256
+MAP_FILE = "sprites.json"
+HASH_LENGTH = 10
+
+
+def load_thumbnail(path, kind):
+    """The thumbnail of `path` as an RGBA image, from ``thumbs/`` when it is up to date."""
+    from PIL import Image
+    size = images.IMAGE_SETTINGS[kind]["thumb_size"]
+    thumb = images.thumb_path(path)
+    if os.path.exists(thumb) and os.path.getmtime(thumb) >= os.path.getmtime(path):
+        img = Image.open(thumb).convert('RGBA')
+        if img.size == size:
+            return img
+    img = images.normalize(Image.open(path), images.IMAGE_SETTINGS[kind]["max_size"])
+    return images.thumbnail(img, size)
+
+
+def referenced_files(values, directory):
+    """Distinct file names from a CSV column that exist in `directory`, in first-use order."""
+    seen = {}
+    for value in values:
+        value = value.strip()
+        if value and value not in seen and os.path.isfile(os.path.join(directory, value)):
+            seen[value] = os.path.join(directory, value)
+    return seen
+
+
+def pack(thumbs, cell, per_sheet):
+    """Lay out `thumbs` (``{name: image}``) on grid sheets.
+
+    Returns ``(sheets, icons)``: the sheet images and ``{name: (sheet, x, y)}``.
+    Names with identical pixels share a cell.
+    """
+    from PIL import Image
+    cells, icons = {}, {}
+    unique = []
+    for name, img in thumbs.items():
+        digest = hashlib.sha1(img.tobytes()).digest()
+        if digest not in cells:
+            cells[digest] = len(unique)
+            unique.append(img)
+        icons[name] = cells[digest]
+    sheets, positions = [], []
+    for start in range(0, len(unique), per_sheet):
+        batch = unique[start:start + per_sheet]
+        columns = math.ceil(math.sqrt(len(batch)))
+        rows = math.ceil(len(batch) / columns)
+        sheet = Image.new('RGBA', (columns * cell[0], rows * cell[1]), (0, 0, 0, 0))
+        for i, img in enumerate(batch):
+            x, y = (i % columns) * cell[0], (i // columns) * cell[1]
+            sheet.paste(img, (x, y))
+            positions.append((len(sheets), x, y))
+        sheets.append(sheet)
+    return sheets, {name: positions[index] for name, index in icons.items()}
+
+
+def _write(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def write_sheet(sheet, out_dir, prefix, fmt):
+    """Encode `sheet` and save it under a content-hashed name. Returns the file name."""
+    buf = io.BytesIO()
+    if fmt == 'webp':
+        sheet.save(buf, format='WEBP', lossless=True, method=6)
+    else:
+        sheet.save(buf, format='PNG', optimize=True)
+    data = buf.getvalue()
+    name = f"{prefix}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}.{fmt}"
+    path = os.path.join(out_dir, name)
+    if not os.path.exists(path):
+        _write(path, data)
+    return name
+
+
+def build(catalog, out_dir=SPRITE_DIR, logo_dir=LOGO_DIR, favicon_dir=FAVICON_DIR,
+          per_sheet=ICONS_PER_SHEET, fmt='png'):
+    """Write the sheets and ``sprites.json`` to `out_dir`; remove sheets of earlier builds.
+
+    Returns ``(sprite_map, errors)``, errors keyed by the image that could not be read.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    sprite_map, written, errors = {}, set(), {}
+    for kind, group, column, directory in (("logo", "logos", 'Logo', logo_dir),
+                                           ("favicon", "favicons", favicon_column(catalog.columns), favicon_dir)):
+        thumbs = {}
+        for name, path in referenced_files(catalog.column(column), directory).items():
+            try:
+                thumbs[name] = load_thumbnail(path, kind)
+            except Exception as e:
+                errors[path] = str(e)
+        cell = images.IMAGE_SETTINGS[kind]["thumb_size"]
+        sheets, icons = pack(thumbs, cell, per_sheet)
+        names = [write_sheet(sheet, out_dir, f"{group}-{i}", fmt) for i, sheet in enumerate(sheets)]
+        written.update(names)
+        sprite_map[group] = {
+            "cell": list(cell),
+            "sheets": names,
+            "icons": {name: {"sheet": s, "x": x, "y": y} for name, (s, x, y) in sorted(icons.items())},
+        }
+    _write(os.path.join(out_dir, MAP_FILE), json.dumps(sprite_map, indent=1, sort_keys=True).encode('utf-8'))
+    for name in os.listdir(out_dir):
+        if name.startswith(("logos-", "favicons-")) and name not in written:
+            os.remove(os.path.join(out_dir, name))
+    return sprite_map, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pack logo and favicon thumbnails into content-hashed sprite sheets")
+    parser.add_argument("--csv", default=CSV_FILE, help="CSV file (default: %(default)s)")
+    parser.add_argument("--store", help="SQLite working store to use instead of the CSV, if it exists")
+    parser.add_argument("--out", default=SPRITE_DIR, help="Output directory (default: %(default)s)")
+    parser.add_argument("--logo-dir", default=LOGO_DIR)
+    parser.add_argument("--favicon-dir", default=FAVICON_DIR)
+    parser.add_argument("--per-sheet", type=int, default=ICONS_PER_SHEET, help="Icons per sheet (default: %(default)s)")
+    parser.add_argument("--format", choices=["png", "webp"], default="png")
+    args = parser.parse_args(argv)
+
+    catalog = open_catalog(args.csv, args.store)
+    try:
+        sprite_map, errors = build(catalog, args.out, args.logo_dir, args.favicon_dir, args.per_sheet, args.format)
+    finally:
+        catalog.close()
+    for path, error in errors.items():
+        print(f"Skipped {path}: {error}")
+    for group, entry in sprite_map.items():
+        size = sum(os.path.getsize(os.path.join(args.out, name)) for name in entry["sheets"])
+        cells = len({(i["sheet"], i["x"], i["y"]) for i in entry["icons"].values()})
+        print(f"{group}: {len(entry['icons'])} icons ({cells} distinct) in {len(entry['sheets'])} sheets, "
+              f"{size / 1024:.0f} KB")
+    print(f"Wrote {os.path.join(args.out, MAP_FILE)}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
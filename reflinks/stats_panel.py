@@ -0,0 +1,87 @@
+"""Stats window for the validator: where the session's time and tokens went.
+
+Shows the `reflinks.metrics` summary as a table, one row per span name,
+refreshed every second while the window is open, and exports the metrics as
+JSON (summary and spans) or CSV (spans).
+"""
+import time
+
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import (
+    QFileDialog, QHBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget
+)
+
+from reflinks import metrics
+
+COLUMNS = (("Operation", "name"), ("Count", "count"), ("Errors", "errors"), ("Total s", "total_s"),
+           ("Mean ms", "mean_ms"), ("p95 ms", "p95_ms"), ("Max ms", "max_ms"),
+           ("Prompt tokens", "prompt_tokens"), ("Completion tokens", "completion_tokens"))
+
+
+class StatsPanel(QWidget):
+    def __init__(self, recorder=None, parent=None):
+        super().__init__(parent, Qt.Window)
+        self.recorder = recorder or metrics.METRICS
+        self.setWindowTitle("Session Stats")
+        self.resize(760, 420)
+        layout = QVBoxLayout()
+        self.totals_label = QLabel("")
+        layout.addWidget(self.totals_label)
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels([title for title, _ in COLUMNS])
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        layout.addWidget(self.table)
+        buttons = QHBoxLayout()
+        for text, slot in (("Export JSON", self.export_json), ("Export CSV", self.export_csv), ("Reset", self.reset)):
+            button = QPushButton(text)
+            button.clicked.connect(slot)
+            buttons.addWidget(button)
+        layout.addLayout(buttons)
+        self.setLayout(layout)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        self.refresh()
+        self.timer.start(1000)
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        summary = self.recorder.summary()
+        self.table.setRowCount(len(summary))
+        for r, row in enumerate(summary):
+            for c, (_, key) in enumerate(COLUMNS):
+                value = row[key]
+                item = QTableWidgetItem(f"{value:.3f}" if isinstance(value, float) else str(value))
+                if c:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(r, c, item)
+        self.table.resizeColumnsToContents()
+        elapsed = time.time() - self.recorder.started_at
+        prompt = sum(row["prompt_tokens"] for row in summary)
+        completion = sum(row["completion_tokens"] for row in summary)
+        self.totals_label.setText(
+            f"Session: {elapsed / 60:.1f} min, {sum(row['count'] for row in summary)} operations timed, "
+            f"{prompt} prompt + {completion} completion tokens"
+        )
+
+    def _export(self, caption, pattern):
+        path, _ = QFileDialog.getSaveFileName(self, caption, "", pattern)
+        if path:
+            count = self.recorder.dump(path)
+            self.totals_label.setText(f"Exported {count} spans to {path}")
+
+    def export_json(self):
+        self._export("Export Metrics", "JSON (*.json)")
+
+    def export_csv(self):
+        self._export("Export Metrics", "CSV (*.csv)")
+
+    def reset(self):
+        self.recorder.reset()
+        self.refresh()
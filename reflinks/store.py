@@ -0,0 +1,362 @@
+"""SQLite working store for ref_links.csv.
+
+Once imported, the store is the validator's source of truth: opening it reads
+only the row count and the two key columns, other columns are fetched when
+first asked for, and a row is a single indexed lookup. Edits are committed to
+the store; ref_links.csv, which the React frontend reads, is regenerated from
+it on close or on demand. Each record keeps the exact text it was imported
+from, so an export copies untouched rows byte for byte and only re-serializes
+edited ones. Edited rows also keep that text as their base. If another writer
+(backend/scripts/updateCSV.js) changed ref_links.csv in the meantime, the
+export re-imports it under the file lock and re-applies the store's edits
+field by field first, exactly as `Catalog.flush` does. Fields both sides
+changed keep the store's value and are listed in `conflicts`.
+
+    python -m reflinks.store import
+    python -m reflinks.store export
+    python -m reflinks.store status
+
+The store is optional: `open_catalog` falls back to the plain CSV `Catalog`
+until ``import`` has created it.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+
+from reflinks import metrics
+from reflinks.catalog import Catalog, KEY_COLUMNS, file_lock, read_csv, serialize_record, to_text, write_atomic
+from reflinks.config import CSV_FILE, STORE_FILE
+
+
+def _col(i):
+    return f"c{i}"
+
+
+class StoreCatalog(Catalog):
+    """`Catalog` backed by a SQLite file instead of an in-memory DataFrame."""
+
+    def __init__(self, path, csv_path=CSV_FILE):
+        self.csv_path = csv_path
+        self._db = sqlite3.connect(path)
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        super().__init__(path)
+
+    def _meta(self, key, default=None):
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def _set_meta(self, **values):
+        self._db.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                             [(key, json.dumps(value)) for key, value in values.items()])
+
+    def _csv_stat(self):
+        try:
+            st = os.stat(self.csv_path)
+        except OSError:
+            return None
+        return [st.st_mtime_ns, st.st_size]
+
+    def csv_changed(self):
+        """True if ref_links.csv was modified since the last import or export."""
+        stat = self._csv_stat()
+        return stat is not None and stat != self._meta('csv_stat')
+
+    def pending_export(self):
+        """Number of records that differ from ref_links.csv (all of them after a schema change)."""
+        if self._meta('columns') != self._meta('csv_columns'):
+            return self._meta('rows', 0)
+        return self._db.execute("SELECT COUNT(*) FROM rows WHERE raw IS NULL").fetchone()[0]
+
+    def load(self):
+        if self._meta('columns') is None:
+            self.import_csv()
+        self._open()
+        if self.csv_changed():
+            if self.pending_export():
+                with file_lock(self.csv_path):
+                    self.conflicts.extend(self._merge_from_disk())
+                self.flush()
+            else:
+                self.import_csv()
+                self._open()
+
+    def _open(self):
+        self._columns = self._meta('columns')
+        self._header = self._meta('csv_columns')
+        self._len = self._meta('rows', 0)
+        self.lineterminator = self._meta('lineterminator', '\n')
+        self._loaded = {}
+        self._df = None
+        self._dirty = set()
+        self._batch_depth = 0
+        self._build_index()
+
+    def _import(self):
+        header, rows, raw, raw_header, lineterminator = read_csv(self.csv_path)
+        names = [_col(i) for i in range(len(header))]
+        self._db.execute("DROP TABLE IF EXISTS rows")
+        self._db.execute(f"CREATE TABLE rows (pos INTEGER PRIMARY KEY, raw TEXT, base TEXT"
+                         f"{''.join(f', {n} TEXT' for n in names)})")
+        self._db.executemany(
+            f"INSERT INTO rows VALUES (?, ?, ?{', ?' * len(names)})",
+            ([pos, raw[pos], raw[pos], *row] for pos, row in enumerate(rows)),
+        )
+        self._set_meta(columns=header, csv_columns=header, raw_header=raw_header,
+                       lineterminator=lineterminator, rows=len(rows), csv_stat=self._csv_stat())
+        return len(rows)
+
+    def import_csv(self):
+        """Replace the store's contents with ref_links.csv."""
+        with self._db:
+            return self._import()
+
+    def __len__(self):
+        return self._len
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    @property
+    def df(self):
+        """The whole catalog as a DataFrame, read on first access."""
+        if self._df is None:
+            import pandas as pd
+            names = ', '.join(_col(i) for i in range(len(self._columns)))
+            rows = self._db.execute(f"SELECT {names} FROM rows ORDER BY pos").fetchall() if names else []
+            self._df = pd.DataFrame(rows, columns=self._columns, dtype=object)
+        return self._df
+
+    def column(self, column):
+        if column not in self._columns:
+            return [''] * len(self)
+        if self._df is not None:
+            return self._df[column].tolist()
+        values = self._loaded.get(column)
+        if values is None:
+            cursor = self._db.execute(f"SELECT {_col(self._columns.index(column))} FROM rows ORDER BY pos")
+            values = self._loaded[column] = [value for (value,) in cursor]
+        return list(values)
+
+    def row(self, idx):
+        names = ', '.join(_col(i) for i in range(len(self._columns)))
+        values = self._db.execute(f"SELECT {names} FROM rows WHERE pos = ?", (idx,)).fetchone()
+        if values is None:
+            raise IndexError(idx)
+        return dict(zip(self._columns, values))
+
+    @property
+    def dirty(self):
+        return bool(self._dirty) or self._db.in_transaction
+
+    def ensure_column(self, column, default=''):
+        if column in self._columns:
+            return
+        name = _col(len(self._columns))
+        self._db.execute(f"ALTER TABLE rows ADD COLUMN {name} TEXT")
+        self._db.execute(f"UPDATE rows SET {name} = ?", (default,))
+        self._columns.append(column)
+        self._set_meta(columns=self._columns)
+        if self._df is not None:
+            self._df[column] = default
+            self._df[column] = self._df[column].astype(object)
+
+    def rename_column(self, old, new):
+        if old not in self._columns or new in self._columns:
+            raise KeyError(f"Cannot rename column {old!r} to {new!r}")
+        self._columns[self._columns.index(old)] = new
+        self._set_meta(columns=self._columns)
+        if old in self._loaded:
+            self._loaded[new] = self._loaded.pop(old)
+        if self._df is not None:
+            self._df.rename(columns={old: new}, inplace=True)
+
+    def drop_column(self, column):
+        if column not in self._columns:
+            return
+        i = self._columns.index(column)
+        # Table columns are numbered by position; shift the later ones down
+        self._db.execute(f"ALTER TABLE rows DROP COLUMN {_col(i)}")
+        for j in range(i + 1, len(self._columns)):
+            self._db.execute(f"ALTER TABLE rows RENAME COLUMN {_col(j)} TO {_col(j - 1)}")
+        del self._columns[i]
+        self._set_meta(columns=self._columns)
+        self._loaded.pop(column, None)
+        if self._df is not None:
+            del self._df[column]
+
+    def get(self, idx, column, default=''):
+        if column not in self._columns:
+            return default
+        if self._df is not None:
+            return self._df.at[idx, column]
+        if column in self._loaded:
+            return self._loaded[column][idx]
+        name = _col(self._columns.index(column))
+        row = self._db.execute(f"SELECT {name} FROM rows WHERE pos = ?", (idx,)).fetchone()
+        if row is None:
+            raise IndexError(idx)
+        return row[0]
+
+    def _assign(self, idx, column, value):
+        self.ensure_column(column)
+        value = to_text(value)
+        if self.get(idx, column) != value:
+            name = _col(self._columns.index(column))
+            # A NULL raw record marks the row for re-serialization on export; base keeps the CSV text
+            self._db.execute(f"UPDATE rows SET {name} = ?, raw = NULL WHERE pos = ?", (value, idx))
+            if column in self._loaded:
+                self._loaded[column][idx] = value
+            if self._df is not None:
+                self._df.at[idx, column] = value
+            self._dirty.add(idx)
+            if column in KEY_COLUMNS:
+                self._index_stale = True
+
+    # Hooks for Catalog._merge_from_disk
+
+    def changed_on_disk(self):
+        return self.csv_changed()
+
+    def _edited(self):
+        return [pos for (pos,) in self._db.execute("SELECT pos FROM rows WHERE raw IS NULL ORDER BY pos")]
+
+    def _base_record(self, pos):
+        row = self._db.execute("SELECT base FROM rows WHERE pos = ?", (pos,)).fetchone()
+        return row[0] if row else ''
+
+    def _append_row(self, values):
+        pos = self._len
+        names = ''.join(f', {_col(i)}' for i in range(len(self._columns)))
+        self._db.execute(f"INSERT INTO rows (pos, raw, base{names}) VALUES (?, NULL, ''{', ?' * len(self._columns)})",
+                         (pos, *values))
+        self._len += 1
+        self._set_meta(rows=self._len)
+        self._loaded = {}
+        self._df = None
+        self._dirty.add(pos)
+        self._index_stale = True
+        return pos
+
+    def _reload(self):
+        # Re-import and re-apply the edits in one transaction, committed by the next flush
+        if not self._db.in_transaction:
+            self._db.execute("BEGIN")
+        self._import()
+        self._open()
+
+    def flush(self):
+        """Commit pending edits to the store. Returns the number of rows changed."""
+        written = len(self._dirty)
+        if self._db.in_transaction:
+            with metrics.span("catalog.save", rows=written):
+                self._db.commit()
+        self._dirty.clear()
+        return written
+
+    def export_csv(self, path=None):
+        """Write the catalog as CSV (ref_links.csv by default). Returns the number of rows re-serialized.
+
+        When ref_links.csv changed since the last import or export, its changes
+        are merged into the store first; conflicts are added to `conflicts`.
+        """
+        self.flush()
+        target = path or self.csv_path
+        with metrics.span("catalog.export") as span, file_lock(target):
+            if target == self.csv_path and self.csv_changed():
+                self.conflicts.extend(self._merge_from_disk())
+                self.flush()
+            rewrite_all = self._columns != self._meta('csv_columns')
+            names = ''.join(f', {_col(i)}' for i in range(len(self._columns)))
+            records, updates = [], []
+            for pos, raw, *values in self._db.execute(f"SELECT pos, raw{names} FROM rows ORDER BY pos"):
+                if raw is None or rewrite_all:
+                    raw = serialize_record(['' if v is None else v for v in values], self.lineterminator)
+                    updates.append((raw, raw, pos))
+                records.append(raw)
+            header = serialize_record(self._columns, self.lineterminator) if rewrite_all else self._meta('raw_header')
+            write_atomic(target, header, records)
+            span["rows"] = len(updates)
+            if target == self.csv_path:
+                # The CSV now matches the store; keep the new text as each record's source
+                with self._db:
+                    self._db.executemany("UPDATE rows SET raw = ?, base = ? WHERE pos = ?", updates)
+                    self._set_meta(raw_header=header, csv_columns=self._columns, csv_stat=self._csv_stat())
+                self._header = list(self._columns)
+        return len(updates)
+
+    def sync(self):
+        """Merge changes another writer made to ref_links.csv into the store.
+
+        Returns None if the file is unchanged, otherwise the list of conflicts.
+        """
+        if not self.csv_changed():
+            return None
+        with file_lock(self.csv_path):
+            conflicts = self._merge_from_disk()
+            self.flush()
+        return conflicts
+
+    def close(self):
+        """Commit, bring ref_links.csv up to date and close the database."""
+        self.flush()
+        if self.pending_export():
+            self.export_csv()
+        self._db.close()
+
+
+def open_catalog(csv_path=CSV_FILE, store_path=None):
+    """Open the working store at `store_path` if it exists, otherwise the CSV itself.
+
+    `store_path` defaults to `STORE_FILE` when `csv_path` is the validator's own CSV.
+    """
+    if store_path is None and os.path.abspath(csv_path) == os.path.abspath(CSV_FILE):
+        store_path = STORE_FILE
+    if store_path and os.path.exists(store_path):
+        return StoreCatalog(store_path, csv_path)
+    return Catalog(csv_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import ref_links.csv into the SQLite working store, or export it back")
+    parser.add_argument("command", choices=["import", "export", "status"])
+    parser.add_argument("--csv", default=CSV_FILE, help="CSV file (default: %(default)s)")
+    parser.add_argument("--store", default=STORE_FILE, help="Store file (default: %(default)s)")
+    parser.add_argument("--out", help="Export to this path instead of the CSV file")
+    parser.add_argument("--force", action="store_true", help="Import even if the store has unexported edits")
+    args = parser.parse_args(argv)
+
+    existed = os.path.exists(args.store)
+    if args.command != "import" and not existed:
+        parser.error(f"No store at {args.store}; run `import` first")
+    # Opening a new store imports the CSV
+    store = StoreCatalog(args.store, args.csv)
+    try:
+        if args.command == "import" and not existed:
+            print(f"Imported {len(store)} rows from {args.csv}")
+        elif args.command == "import":
+            pending = store.pending_export()
+            if pending and not args.force:
+                print(f"{pending} rows have not been exported yet; pass --force to discard them")
+                return 1
+            print(f"Imported {store.import_csv()} rows from {args.csv}")
+        elif args.command == "export":
+            written = store.export_csv(args.out)
+            print(f"Exported {len(store)} rows to {args.out or args.csv} ({written} re-serialized)")
+            for conflict in store.conflicts:
+                print(f"kept the store's {conflict['column'] or 'row'} for {conflict['platform']!r} "
+                      f"over the CSV's change")
+        else:
+            print(f"{args.store}: {len(store)} rows, {len(store.columns)} columns")
+            print(f"Unexported rows: {store.pending_export()}")
+            print(f"CSV changed since last sync: {'yes' if store.csv_changed() else 'no'}")
+    finally:
+        store.flush()
+        store._db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""Shared fixtures: a throwaway workspace and local HTTP stand-ins.
+
+`reflinks.config` reads ``REFLINKS_WORKSPACE`` when it is first imported, so
+it is pointed at a temporary directory here, before any test imports
+reflinks. Caches and state databases then never touch a real checkout.
+"""
+import csv
+import json
+import os
+import sys
+import tempfile
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+os.environ["REFLINKS_WORKSPACE"] = tempfile.mkdtemp(prefix="reflinks-tests-")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _start(handler):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def write_csv(path, header, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(header)
+        writer.writerows(rows)
+    return str(path)
+
+
+def completion(content, prompt_tokens=10, completion_tokens=5, model="gpt-4o"):
+    """A chat.completions response body."""
+    return {
+        "id": "stub", "object": "chat.completion", "created": 0, "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                  "total_tokens": prompt_tokens + completion_tokens},
+    }
+
+
+class OpenAIStub:
+    """Local stand-in for the chat completions endpoint.
+
+    Replies come from `script` (``(status, headers, body)`` tuples, consumed in
+    order) and then from `reply(request)`, which by default answers combined
+    requests with a valid JSON object and every other prompt with plain text.
+    Every request body is kept in `requests`.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.script = deque()
+        self.reply = self.default_reply
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stub._lock:
+                    stub.requests.append(request)
+                    status, headers, body = stub.script.popleft() if stub.script else (200, {}, stub.reply(request))
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = _start(Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    @staticmethod
+    def default_reply(request):
+        prompt = request["messages"][-1]["content"]
+        if "response_format" in request:
+            return completion(json.dumps({"description": "A stub platform.",
+                                          "features": ["Low fees", "Fast swaps", "Staking rewards", "Mobile app"],
+                                          "capsules": ["Fast", "Cheap", "Secure"]}))
+        if "comma-separated" in prompt:
+            return completion("Low fees, Fast swaps, Staking")
+        return completion("A stub platform.")
+
+
+@pytest.fixture
+def openai_stub():
+    stub = OpenAIStub()
+    yield stub
+    stub.server.shutdown()
+
+
+@pytest.fixture
+def page_server(tmp_path):
+    """Serve the files under ``tmp_path / "site"``.
+
+    Yields ``(root, base_url, requests)``; `requests` collects ``(path, headers)``
+    for every GET.
+    """
+    root = tmp_path / "site"
+    root.mkdir()
+    requests = []
+
+    class Handler(SimpleHTTPRequestHandler):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=str(root), **kwargs)
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            requests.append((self.path, dict(self.headers)))
+            super().do_GET()
+
+    server = _start(Handler)
+    yield root, f"http://127.0.0.1:{server.server_address[1]}", requests
+    server.shutdown()
@@ -0,0 +1,32 @@
+from conftest import write_csv
+from reflinks import assets
+from reflinks.catalog import Catalog
+
+HEADER = ["Platform Name", "Official Website", "Logo", "Favicon"]
+PNG = b"\x89PNG\r\n\x1a\n"
+
+
+def test_apply_keeps_files_named_by_convention(tmp_path):
+    logos, favicons = tmp_path / "logos", tmp_path / "favicons"
+    logos.mkdir()
+    favicons.mkdir()
+    for directory, name, body in [
+        (logos, "logo_Alpha.png", b"alpha logo"),
+        (favicons, "fav_Gate_io.png", PNG + b"gate"),       # validator's safe_platform_name
+        (favicons, "fav_magic_eden.png", PNG + b"magic"),   # frontend's getFaviconPath
+        (favicons, "fav_lyra.png", PNG + b"lyra"),
+        (favicons, "fav_Unused.png", PNG + b"unused"),
+    ]:
+        (directory / name).write_bytes(body)
+    path = write_csv(tmp_path / "ref_links.csv", HEADER, [
+        ["Alpha", "alpha.io", "logo_Alpha.png", ""],
+        # The CSV names other files, but the frontend still loads these by name
+        ["Gate.io", "gate.io", "", "fav_lyra.png"],
+        ["Magic  Eden!", "magiceden.io", "", "fav_lyra.png"],
+    ])
+    catalog = Catalog(path)
+    report = assets.sweep(catalog, str(logos), str(favicons), assets.Manifest(str(tmp_path / "manifest.sqlite")),
+                          src_dir=None)
+    assert [item["path"] for item in report["orphans"]] == [str(favicons / "fav_Unused.png")]
+    assets.apply_plan(catalog, report["plan"])
+    assert sorted(p.name for p in favicons.iterdir()) == ["fav_Gate_io.png", "fav_lyra.png", "fav_magic_eden.png"]
@@ -0,0 +1,128 @@
+import os
+import stat
+
+import pytest
+
+from reflinks import catalog as catalog_module
+from reflinks.catalog import Catalog
+
+# Quoting, spacing and CRLF line ends that csv.writer would not reproduce
+SOURCE = (
+    'Platform Name,Official Website,Description\r\n'
+    '"Alpha",https://alpha.io,"Swaps, staking"\r\n'
+    'Beta,beta.io,  padded  \r\n'
+    'Gamma,gamma.io,"Multi\r\nline"\r\n'
+    'Delta,delta.io,No newline at the end'
+)
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / "ref_links.csv"
+    path.write_bytes(SOURCE.encode("utf-8"))
+    return str(path)
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read().decode("utf-8")
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    calls = []
+    write_atomic = catalog_module.write_atomic
+    monkeypatch.setattr(catalog_module, "write_atomic", lambda *args: calls.append(args[0]) or write_atomic(*args))
+    return calls
+
+
+def test_parse(path):
+    catalog = Catalog(path)
+    assert len(catalog) == 4 and catalog.lineterminator == "\r\n"
+    assert catalog.row(0) == {"Platform Name": "Alpha", "Official Website": "https://alpha.io",
+                              "Description": "Swaps, staking"}
+    assert catalog.get(2, "Description") == "Multi\r\nline"
+    assert catalog.get(0, "Missing", "default") == "default"
+    assert not catalog.dirty
+
+
+def test_unedited_rows_are_written_back_verbatim(path):
+    catalog = Catalog(path)
+    catalog.set(1, "Description", "Trimmed")
+    assert read(path) == SOURCE.replace("Beta,beta.io,  padded  \r\n", "Beta,beta.io,Trimmed\r\n") + "\r\n"
+    assert not catalog.dirty
+
+
+def test_only_dirty_rows_are_serialized(path, writes):
+    catalog = Catalog(path)
+    catalog.set(0, "Description", "Swaps, staking")
+    assert writes == [] and not catalog.dirty
+    with catalog.batch():
+        catalog.set(0, "Description", "Swaps")
+        catalog.set(3, "Description", "Done")
+    assert catalog.flush() == 0
+    assert writes == [path]
+    reread = Catalog(path)
+    assert [reread.get(pos, "Description") for pos in range(4)] == ["Swaps", "  padded  ", "Multi\r\nline", "Done"]
+
+
+def test_nested_batches_write_once(path, writes):
+    catalog = Catalog(path)
+    with catalog.batch():
+        catalog.update(0, {"Description": "One", "Official Website": "alpha.xyz"})
+        with catalog.batch():
+            catalog.set(1, "Description", "Two")
+        assert writes == [] and catalog.dirty
+    assert writes == [path]
+    assert Catalog(path).row(0)["Official Website"] == "alpha.xyz"
+
+
+def test_schema_change_rewrites_every_row(path):
+    catalog = Catalog(path)
+    catalog.ensure_column("Status", "new")
+    assert catalog.dirty
+    assert catalog.flush() == 4
+    reread = Catalog(path)
+    assert reread.columns == ["Platform Name", "Official Website", "Description", "Status"]
+    assert reread.column("Status") == ["new"] * 4
+    assert reread.get(2, "Description") == "Multi\r\nline"
+
+
+def test_atomic_replace_keeps_the_file_on_failure(path, monkeypatch):
+    os.chmod(path, 0o640)
+    catalog = Catalog(path)
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(catalog_module.os, "replace", fail)
+    with pytest.raises(OSError):
+        catalog.set(0, "Description", "Lost")
+    assert read(path) == SOURCE
+    directory = os.path.dirname(path)
+    assert sorted(os.listdir(directory)) == ["ref_links.csv"]  # no temp file, no lock left behind
+
+    monkeypatch.undo()
+    assert catalog.flush() == 1
+    assert Catalog(path).get(0, "Description") == "Lost"
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+
+
+def test_row_keys_follow_rows(path):
+    catalog = Catalog(path)
+    key = catalog.row_key(0)
+    assert key == ("alpha", "alpha.io", 0)
+    assert catalog.locate(key) == 0
+    assert catalog.rows_named("  ALPHA ") == [0]
+    catalog.set(0, "Official Website", "https://alpha.xyz")
+    assert catalog.locate(key) is None
+    assert catalog.locate(("alpha", "alpha.xyz", 0)) == 0
+    assert catalog.locate(("alpha", "alpha.xyz", 1)) is None
+
+
+def test_df_view_tracks_edits(path):
+    catalog = Catalog(path)
+    df = catalog.df
+    catalog.set(2, "Description", "Single line")
+    assert df.at[2, "Description"] == "Single line"
+    assert list(catalog.df.columns) == catalog.columns
@@ -0,0 +1,23 @@
+from conftest import write_csv
+from reflinks import clean
+from reflinks.catalog import Catalog
+
+HEADER = ["Platform Name", "Official Website", "scraping_page", "capsules"]
+
+
+def test_check_fails_only_on_fixable_cells(tmp_path, capsys):
+    path = write_csv(tmp_path / "ref_links.csv", HEADER, [
+        ["Alpha", "alpha.io", "nan", "A,B"],
+        ["Beta", "beta.io", "None", "A,B,C,D"],
+    ])
+    assert clean.main(["--check", "--csv", path]) == 1
+    assert clean.main(["--csv", path]) == 0
+    catalog = Catalog(path)
+    assert catalog.get(0, "scraping_page") == ""
+    # A literal "None" is a value, not a placeholder
+    assert catalog.get(1, "scraping_page") == "None"
+    # Too many capsules is left for a manual edit and only warned about
+    assert catalog.get(1, "capsules") == "A,B,C,D"
+    capsys.readouterr()
+    assert clean.main(["--check", "--csv", path]) == 0
+    assert "warning: 1 cells need a manual edit" in capsys.readouterr().out
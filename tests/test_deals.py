@@ -0,0 +1,149 @@
+import os
+
+import pytest
+
+pytest.importorskip("bs4")
+
+from conftest import write_csv
+from reflinks import deals
+from reflinks.catalog import Catalog
+from reflinks.http_cache import make_cached_session
+
+HEADER = ["Platform Name", "Official Website", "scraping_page", deals.DEAL_COLUMN]
+
+PROMO_PAGE = """<html><head><title>Alpha</title></head><body>
+<h1>Trade crypto with Alpha</h1>
+<p>Sign up today and get a 20% trading fee discount.</p>
+<div class="promo-banner">Welcome bonus: up to 500 USDT for new users</div>
+</body></html>"""
+
+PLAIN_PAGE = """<html><head><meta name="description" content="Alpha is a crypto exchange."></head>
+<body><h1>About Alpha</h1><p>We have been running since 2017.</p></body></html>"""
+
+
+def test_extract_deal_prefers_selectors():
+    assert deals.extract_deal(PROMO_PAGE, [".promo-banner"]) == "Welcome bonus: up to 500 USDT for new users"
+    # The first selector that matches wins; selectors that match nothing are skipped
+    assert deals.extract_deal(PROMO_PAGE, ["#missing", ".promo-banner", "h1"]).startswith("Welcome bonus")
+    # Without a selector match the first offer-like element is used
+    assert deals.extract_deal(PROMO_PAGE, ["#missing"]) == "Sign up today and get a 20% trading fee discount."
+
+
+def test_extract_deal_meta_and_nothing():
+    page = '<html><head><meta property="og:description" content="Get 10% off your first trade"></head></html>'
+    assert deals.extract_deal(page) == "Get 10% off your first trade"
+    assert deals.extract_deal(PLAIN_PAGE) == ""
+    assert deals.extract_deal('<div class="promo"> </div>' + PLAIN_PAGE, [".promo"]) == ""
+
+
+def test_selectors_for_name_or_host():
+    selectors = {"alpha": [".promo-banner"], "beta.example": ["#offer"]}
+    assert deals.selectors_for(selectors, "Alpha", "https://alpha.example/promo") == [".promo-banner"]
+    assert deals.selectors_for(selectors, "Beta", "https://www.beta.example/") == ["#offer"]
+    assert deals.selectors_for(selectors, "Gamma", "https://gamma.example/") == []
+
+
+@pytest.fixture
+def site(page_server):
+    root, base_url, requests = page_server
+
+    def serve(path, html):
+        target = root / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(html, encoding="utf-8")
+
+    return serve, base_url, requests
+
+
+def run(path, state, base_url, **kwargs):
+    catalog = Catalog(path)
+    session = make_cached_session(4, cache_dir=os.path.join(os.path.dirname(path), "http"))
+    results, _ = deals.refresh(catalog, state, session, selectors={}, base_url=base_url,
+                               host_interval=0, timeout=5, **kwargs)
+    return {r["platform"]: r for r in results}, Catalog(path)
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_refresh_revalidates_and_skips_unchanged_pages(site, tmp_path, monkeypatch):
+    serve, base_url, requests = site
+    serve("alpha.example/promo", PROMO_PAGE)
+    path = write_csv(tmp_path / "ref_links.csv", HEADER,
+                     [["Alpha", "alpha.example", "https://alpha.example/promo", ""]])
+    state = deals.DealState(str(tmp_path / "deals.sqlite"))
+
+    results, catalog = run(path, state, base_url)
+    assert results["Alpha"]["status"] == deals.UPDATED and not results["Alpha"]["from_cache"]
+    assert catalog.get(0, deals.DEAL_COLUMN) == "Sign up today and get a 20% trading fee discount."
+    assert catalog.columns == HEADER
+    checked_at = state.get(catalog.row_key(0))["checked_at"]
+
+    # Someone edits the deal by hand; an unchanged page must not overwrite it
+    catalog.set(0, deals.DEAL_COLUMN, "Hand-written deal")
+    before = read(path)
+
+    def fail(*args):
+        raise AssertionError("an unchanged page was parsed again")
+
+    monkeypatch.setattr(deals, "extract_deal", fail)
+    results, catalog = run(path, state, base_url)
+    # The second request is conditional and the server answers 304
+    assert "If-Modified-Since" in requests[-1][1]
+    assert results["Alpha"]["status"] == deals.UNCHANGED and results["Alpha"]["from_cache"]
+    assert read(path) == before
+    assert state.get(catalog.row_key(0))["checked_at"] >= checked_at
+
+    # --force parses the page even though it has not changed
+    monkeypatch.undo()
+    results, catalog = run(path, state, base_url, force=True)
+    assert results["Alpha"]["status"] == deals.UPDATED
+    assert catalog.get(0, deals.DEAL_COLUMN) == "Sign up today and get a 20% trading fee discount."
+    state.close()
+
+
+def test_refresh_page_without_deal_keeps_previous_deal(site, tmp_path):
+    serve, base_url, _ = site
+    serve("alpha.example/index.html", PLAIN_PAGE)
+    path = write_csv(tmp_path / "ref_links.csv", HEADER,
+                     [["Alpha", "alpha.example", "https://alpha.example/", "Old deal"]])
+    before = read(path)
+    state = deals.DealState(str(tmp_path / "deals.sqlite"))
+
+    results, catalog = run(path, state, base_url)
+    assert results["Alpha"]["status"] == deals.NO_DEAL
+    # The deal text stays as it was; the check is only recorded in the state database
+    assert read(path) == before
+    recorded = state.get(catalog.row_key(0))
+    assert recorded["status"] == deals.NO_DEAL and recorded["checked_at"]
+    state.close()
+
+
+def test_refresh_fetch_error_leaves_row_untouched(site, tmp_path):
+    _, base_url, _ = site
+    path = write_csv(tmp_path / "ref_links.csv", HEADER,
+                     [["Alpha", "alpha.example", "https://alpha.example/gone", "Old deal"]])
+    before = read(path)
+    state = deals.DealState(str(tmp_path / "deals.sqlite"))
+
+    results, catalog = run(path, state, base_url)
+    assert results["Alpha"]["status"] == deals.ERROR
+    assert "404" in results["Alpha"]["error"]
+    assert catalog.get(0, deals.DEAL_COLUMN) == "Old deal"
+    assert read(path) == before
+    state.close()
+
+
+def test_refresh_unreachable_server_leaves_row_untouched(tmp_path):
+    path = write_csv(tmp_path / "ref_links.csv", HEADER,
+                     [["Alpha", "alpha.example", "https://alpha.example/promo", "Old deal"]])
+    before = read(path)
+    state = deals.DealState(str(tmp_path / "deals.sqlite"))
+
+    # Nothing listens on port 9 of the loopback interface
+    results, _ = run(path, state, "http://127.0.0.1:9")
+    assert results["Alpha"]["status"] == deals.ERROR
+    assert read(path) == before
+    state.close()
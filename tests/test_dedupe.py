@@ -0,0 +1,13 @@
+from reflinks import dedupe
+
+
+def test_oversized_blocks_are_reported():
+    names = [f"Swap {word}" for word in ("Alpha", "Bravo", "Charlie", "Delta", "Echo", "Foxtrot")] + ["Magic Eden", "magic eden"]
+    websites = [f"https://site{i}.io" for i in range(6)] + ["https://magiceden.io", "https://www.magiceden.io/"]
+    clusters, stats = dedupe.find_clusters(names, websites, max_block=4)
+    assert [cluster["rows"] for cluster in clusters] == [[6, 7]]
+    # "swap" is shared by six rows, over the limit of four
+    assert stats["skipped_blocks"] == 1 and stats["skipped_pairs"] == 15
+
+    _, stats = dedupe.find_clusters(names, websites)
+    assert stats["skipped_blocks"] == 0 and stats["skipped_pairs"] == 0
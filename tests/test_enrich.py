@@ -0,0 +1,159 @@
+import json
+import time
+
+import pandas as pd
+import pytest
+
+from conftest import completion, write_csv
+from reflinks import catalog as catalog_module
+from reflinks import enrich, llm
+from reflinks.catalog import Catalog
+
+HEADER = ["Platform Name", "Official Website", "Description", "Features", "capsules"]
+
+
+def make_client(stub, **kwargs):
+    return llm.LLMClient("test-key", base_url=stub.base_url, cache=None, **kwargs)
+
+
+def test_parse_combined_valid():
+    content = json.dumps({"description": "  A DEX on Solana. ",
+                          "features": ["Low fees", "Fast, cheap swaps", "Low fees", "\"Quoted\""],
+                          "capsules": ["DEX", "Solana", "Fast", "Extra"]})
+    assert enrich.parse_combined(content, 3) == {
+        "description": "A DEX on Solana.",
+        "features": "Low fees,Fast  cheap swaps,Quoted",
+        "capsules": "DEX,Solana,Fast",
+    }
+
+
+@pytest.mark.parametrize("reply, message", [
+    ({"description": "A DEX.", "features": ["Low fees"]}, "invalid features/capsules"),
+    ({"description": "A DEX.", "features": [], "capsules": ["DEX"]}, "invalid features/capsules"),
+    ({"description": "A DEX.", "features": ["Low fees"], "capsules": [3]}, "invalid features/capsules"),
+    ({"features": ["Low fees"], "capsules": ["DEX"]}, "no description"),
+    ({"description": " ", "features": ["Low fees"], "capsules": ["DEX"]}, "no description"),
+])
+def test_parse_combined_partial(reply, message):
+    with pytest.raises(ValueError, match=message):
+        enrich.parse_combined(json.dumps(reply), 2)
+
+
+@pytest.mark.parametrize("content, message", [
+    ("not json at all", "valid JSON"),
+    ('{"description": "cut off', "valid JSON"),
+    (None, "valid JSON"),
+    ('["description", "features"]', "not a JSON object"),
+])
+def test_parse_combined_malformed(content, message):
+    with pytest.raises(ValueError, match=message):
+        enrich.parse_combined(content, 2)
+
+
+def test_enrich_rows_per_field(openai_stub):
+    df = pd.DataFrame([["Alpha", "alpha.io", "", "", ""], ["Beta", "beta.io", "", "", ""]], columns=HEADER)
+    client = make_client(openai_stub)
+    results, errors = enrich.enrich_rows(df, ["description", "features"], client, "gpt-4o", workers=2)
+    assert errors == {}
+    assert results == {(0, "description"): "A stub platform.", (1, "description"): "A stub platform.",
+                       (0, "features"): "Low fees,Fast swaps,Staking", (1, "features"): "Low fees,Fast swaps,Staking"}
+    assert len(openai_stub.requests) == 4
+    assert client.usage["requests"] == 4
+    assert client.usage["prompt_tokens"] == 40
+
+
+def test_enrich_rows_combined_reports_malformed_rows(openai_stub):
+    df = pd.DataFrame([["Alpha", "alpha.io", "", "", ""], ["Broken", "broken.io", "", "", ""]], columns=HEADER)
+
+    def reply(request):
+        if "Broken" in request["messages"][-1]["content"]:
+            return completion('{"description": "Half a reply"')
+        return openai_stub.default_reply(request)
+
+    openai_stub.reply = reply
+    results, errors = enrich.enrich_rows(df, list(enrich.COMBINED_FIELDS), make_client(openai_stub), "gpt-4o",
+                                         combined=True)
+    # One request per row, each asking for structured output
+    assert len(openai_stub.requests) == 2
+    assert all(r["response_format"]["type"] == "json_schema" for r in openai_stub.requests)
+    assert results[(0, "description")] == "A stub platform."
+    assert results[(0, "capsules")].count(",") <= 2
+    assert set(errors) == {(1, "description"), (1, "features"), (1, "capsules")}
+    assert "valid JSON" in errors[(1, "description")]
+
+
+def test_enrich_csv_through_stub(openai_stub, tmp_path):
+    path = write_csv(tmp_path / "ref_links.csv", HEADER, [
+        ["Alpha", "alpha.io", "", "", ""],
+        ["Beta", "beta.io", "Already written.", "", ""],
+    ])
+    report = enrich.enrich_csv(path, ["description"], "test-key", model="gpt-4o", only_missing=True,
+                               base_url=openai_stub.base_url, use_cache=False)
+    assert report["rows"] == 1 and report["generated"] == 1 and report["errors"] == {}
+    catalog = Catalog(path)
+    assert catalog.get(0, "Description") == "A stub platform."
+    assert catalog.get(1, "Description") == "Already written."
+
+
+def test_retry_after_is_honoured(openai_stub):
+    openai_stub.script.append((429, {"Retry-After": "0.3"}, {"error": {"message": "slow down"}}))
+    client = make_client(openai_stub)
+    start = time.monotonic()
+    assert client.chat("gpt-4o", "Write a sentence.", 20) == "A stub platform."
+    assert time.monotonic() - start >= 0.3
+    assert len(openai_stub.requests) == 2
+    assert client.usage["retries"] == 1 and client.usage["requests"] == 1
+
+
+def test_retry_after_ms_and_server_errors(openai_stub):
+    openai_stub.script.extend([
+        (503, {"retry-after-ms": "50"}, {"error": {"message": "overloaded"}}),
+        (500, {"retry-after-ms": "50"}, {"error": {"message": "oops"}}),
+    ])
+    client = make_client(openai_stub)
+    assert client.chat("gpt-4o", "Write a sentence.", 20) == "A stub platform."
+    assert client.usage["retries"] == 2
+
+
+def test_retries_give_up(openai_stub):
+    openai_stub.script.extend([(429, {"Retry-After": "0"}, {"error": {"message": "slow down"}})] * 3)
+    client = make_client(openai_stub, max_retries=2)
+    with pytest.raises(Exception) as raised:
+        client.chat("gpt-4o", "Write a sentence.", 20)
+    assert getattr(raised.value, "status_code", None) == 429
+    assert len(openai_stub.requests) == 3
+
+
+def test_client_errors_are_not_retried(openai_stub):
+    openai_stub.script.append((400, {}, {"error": {"message": "bad request"}}))
+    client = make_client(openai_stub)
+    with pytest.raises(Exception) as raised:
+        client.chat("gpt-4o", "Write a sentence.", 20)
+    assert getattr(raised.value, "status_code", None) == 400
+    assert len(openai_stub.requests) == 1 and client.usage["retries"] == 0
+
+
+def test_apply_results_writes_once(tmp_path, monkeypatch):
+    path = write_csv(tmp_path / "ref_links.csv", HEADER, [
+        ["Alpha", "alpha.io", "", "", ""],
+        ["Beta", "beta.io", "", "", ""],
+    ])
+    catalog = Catalog(path)
+    writes = []
+    write_atomic = catalog_module.write_atomic
+    monkeypatch.setattr(catalog_module, "write_atomic", lambda *args: writes.append(args[0]) or write_atomic(*args))
+    enrich.apply_results(catalog, {(0, "description"): "One.", (0, "features"): "A,B",
+                                   (1, "description"): "Two.", (1, "capsules"): "X,Y"})
+    assert writes == [path]
+    reread = Catalog(path)
+    assert [reread.get(0, "Description"), reread.get(0, "Features")] == ["One.", "A,B"]
+    assert [reread.get(1, "Description"), reread.get(1, "capsules")] == ["Two.", "X,Y"]
+
+
+def test_get_client_is_shared_per_settings(openai_stub):
+    client = llm.get_client("test-key", openai_stub.base_url, use_cache=False)
+    assert llm.get_client("test-key", openai_stub.base_url, use_cache=False, requests_per_minute=None) is client
+    paced = llm.get_client("test-key", openai_stub.base_url, use_cache=False, requests_per_minute=120)
+    assert paced is not client
+    assert paced.bucket.rate == 2.0 and client.bucket.rate is None
+    assert llm.get_client("test-key", openai_stub.base_url, use_cache=False, requests_per_minute=120) is paced
@@ -0,0 +1,32 @@
+import os
+
+from reflinks.http_cache import make_cached_session
+
+
+def test_revalidated_hit_and_body_evicted_after_lookup(page_server, tmp_path):
+    root, base_url, requests = page_server
+    (root / "page.html").write_text("<p>cached</p>", encoding="utf-8")
+    session = make_cached_session(2, cache_dir=str(tmp_path / "http"))
+    url = f"{base_url}/page.html"
+
+    assert session.get(url, timeout=5).content == b"<p>cached</p>"
+    r = session.get(url, timeout=5)
+    assert r.from_cache and r.content == b"<p>cached</p>"
+    assert "If-Modified-Since" in requests[-1][1]
+
+    # Eviction in another thread removes the body between the lookup and the load
+    lookup = session.cache.lookup
+
+    def racing_lookup(url):
+        entry = lookup(url)
+        if entry:
+            os.remove(entry[0])
+        return entry
+
+    session.cache.lookup = racing_lookup
+    r = session.get(url, timeout=5)
+    assert r.status_code == 200 and r.content == b"<p>cached</p>" and not getattr(r, "from_cache", False)
+    # The conditional request got a 304, so the body was fetched again without validators
+    assert len(requests) == 4 and "If-Modified-Since" not in requests[-1][1]
+    assert session.cache.misses == 2 and session.cache.hits == 1
+    session.cache.close()
@@ -0,0 +1,135 @@
+import os
+import threading
+import time
+
+from conftest import write_csv
+from reflinks.catalog import Catalog, file_lock
+from reflinks.store import StoreCatalog
+
+HEADER = ["Platform Name", "Official Website", "Description", "Features"]
+ROWS = [
+    ["Alpha", "alpha.io", "Alpha base.", "Swaps"],
+    ["Beta", "beta.io", "Beta base.", "Lending"],
+]
+
+
+def external_write(path, rows):
+    """Rewrite the CSV as another writer would, under the shared lock."""
+    with file_lock(path):
+        stat = os.stat(path)
+        write_csv(path, HEADER, rows)
+        # Make sure the rewrite is visible even on coarse mtime clocks
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_external_write_racing_an_edit_keeps_both(tmp_path):
+    path = write_csv(tmp_path / "ref_links.csv", HEADER, ROWS)
+    catalog = Catalog(path)
+    locked, release = threading.Event(), threading.Event()
+
+    def other_writer():
+        with file_lock(path):
+            locked.set()
+            release.wait(5)
+            stat = os.stat(path)
+            write_csv(path, HEADER, [["Alpha", "alpha.io", "Alpha base.", "Swaps,Staking"], ROWS[1],
+                                     ["Gamma", "gamma.io", "New row.", ""]])
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    thread = threading.Thread(target=other_writer)
+    with catalog.batch():
+        catalog.set(0, "Description", "Alpha edited.")
+        catalog.set(1, "Features", "Lending,Borrowing")
+        thread.start()
+        locked.wait(5)
+        threading.Timer(0.2, release.set).start()
+    # The flush waited for the other writer's lock, then merged its rewrite
+    thread.join()
+    assert catalog.conflicts == []
+    reread = Catalog(path)
+    assert [reread.row(pos) for pos in range(len(reread))] == [
+        {"Platform Name": "Alpha", "Official Website": "alpha.io", "Description": "Alpha edited.",
+         "Features": "Swaps,Staking"},
+        {"Platform Name": "Beta", "Official Website": "beta.io", "Description": "Beta base.",
+         "Features": "Lending,Borrowing"},
+        {"Platform Name": "Gamma", "Official Website": "gamma.io", "Description": "New row.", "Features": ""},
+    ]
+
+
+def test_same_field_conflict_is_reported(tmp_path):
+    path = write_csv(tmp_path / "ref_links.csv", HEADER, ROWS)
+    catalog = Catalog(path)
+    with catalog.batch():
+        catalog.set(0, "Description", "Ours.")
+        external_write(path, [["Alpha", "alpha.io", "Theirs.", "Swaps"], ROWS[1]])
+    assert catalog.conflicts == [{"row": 0, "platform": "Alpha", "column": "Description",
+                                  "base": "Alpha base.", "ours": "Ours.", "theirs": "Theirs."}]
+    assert Catalog(path).get(0, "Description") == "Ours."
+
+
+def test_row_removed_by_other_writer_is_kept(tmp_path):
+    path = write_csv(tmp_path / "ref_links.csv", HEADER, ROWS)
+    catalog = Catalog(path)
+    with catalog.batch():
+        catalog.set(1, "Description", "Beta edited.")
+        external_write(path, [ROWS[0]])
+    assert [c["platform"] for c in catalog.conflicts] == ["Beta"]
+    reread = Catalog(path)
+    assert reread.column("Platform Name") == ["Alpha", "Beta"]
+    assert reread.get(1, "Description") == "Beta edited."
+
+
+def test_sync_merges_without_writing(tmp_path):
+    path = write_csv(tmp_path / "ref_links.csv", HEADER, ROWS)
+    catalog = Catalog(path)
+    assert catalog.sync() is None
+    external_write(path, [ROWS[0], ["Beta", "beta.io", "Beta theirs.", "Lending"]])
+    assert catalog.sync() == []
+    assert catalog.get(1, "Description") == "Beta theirs."
+    assert not catalog.dirty
+
+
+def test_stale_lock_is_taken_over(tmp_path):
+    path = write_csv(tmp_path / "ref_links.csv", HEADER, ROWS)
+    lock = f"{path}.lock"
+    with open(lock, "w") as f:
+        f.write("{}")
+    old = time.time() - 3600
+    os.utime(lock, (old, old))
+    catalog = Catalog(path)
+    catalog.set(0, "Description", "Written.")
+    assert Catalog(path).get(0, "Description") == "Written."
+    assert not os.path.exists(lock)
+
+
+def test_store_export_merges_external_write(tmp_path):
+    path = write_csv(tmp_path / "ref_links.csv", HEADER, ROWS)
+    store = StoreCatalog(str(tmp_path / "store.sqlite"), path)
+    store.set(0, "Description", "Alpha from the store.")
+    external_write(path, [["Alpha", "alpha.io", "Alpha base.", "Swaps,Staking"],
+                          ["Beta", "beta.io", "Beta theirs.", "Lending"]])
+    store.export_csv()
+    assert store.conflicts == []
+    reread = Catalog(path)
+    assert [reread.get(0, "Description"), reread.get(0, "Features")] == ["Alpha from the store.", "Swaps,Staking"]
+    assert reread.get(1, "Description") == "Beta theirs."
+    assert not store.pending_export()
+    store.close()
+
+
+def test_store_sync_and_reopen(tmp_path):
+    path = write_csv(tmp_path / "ref_links.csv", HEADER, ROWS)
+    store_path = str(tmp_path / "store.sqlite")
+    store = StoreCatalog(store_path, path)
+    store.set(1, "Features", "Lending,Borrowing")
+    external_write(path, [["Alpha", "alpha.io", "Alpha theirs.", "Swaps"], ROWS[1]])
+    assert store.sync() == []
+    assert [store.get(0, "Description"), store.get(1, "Features")] == ["Alpha theirs.", "Lending,Borrowing"]
+    store._db.close()
+
+    # A store reopened after another external write merges it on load
+    external_write(path, [["Alpha", "alpha.io", "Alpha again.", "Swaps"], ROWS[1]])
+    store = StoreCatalog(store_path, path)
+    assert [store.get(0, "Description"), store.get(1, "Features")] == ["Alpha again.", "Lending,Borrowing"]
+    store.close()
+    assert Catalog(path).get(1, "Features") == "Lending,Borrowing"